@@ -12,10 +12,15 @@ Date: 2025-09-25
 
 from netmiko import ConnectHandler
 from tools import getScriptName, setupLogging, get_netmiko_creds, save_file_and_set_permissions
+from parsers import extract_version
+import argparse
+import bisect
 import logging
 import csv
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 import sys
 import os
 
@@ -29,10 +34,68 @@ except ImportError:
     sys.exit(1)
 
 
+@lru_cache(maxsize=None)
+def parse_version(version):
+    """Parse a dotted version into a tuple of ints, e.g. 17.3.8 -> (17, 3, 8).
+
+    Non-numeric components keep their digits (15.2.4.S7 -> (15, 2, 4, 7)).
+    Raises ValueError if there are fewer than two numeric components.
+    """
+    parts = []
+    for part in version.split('.'):
+        digits = re.sub(r'\D', '', part)
+        if digits:
+            parts.append(int(digits))
+    if len(parts) < 2:
+        raise ValueError(f"Unparseable version: {version}")
+    return tuple(parts)
+
+
+class KnownGoodIndex:
+    """Known good versions pre-parsed and sorted per device type and train.
+
+    Built once from known_good_versions.csv; lookups are bisects instead of
+    re-parsing every known good version for every device.
+    """
+
+    def __init__(self, known_good_versions):
+        self.by_type = {}    # device_type -> sorted [(tuple, version_str)]
+        self.by_train = {}   # (device_type, major, minor) -> sorted [(tuple, version_str)]
+        for device_type, versions in known_good_versions.items():
+            parsed = []
+            for version in versions:
+                try:
+                    parsed.append((parse_version(version), version))
+                except ValueError:
+                    continue
+            parsed.sort()
+            self.by_type[device_type] = parsed
+            for entry in parsed:
+                self.by_train.setdefault((device_type,) + entry[0][:2], []).append(entry)
+
+    @staticmethod
+    def _nearest_newer(entries, current):
+        """Nearest entry >= current, or the newest entry if current is above all"""
+        i = bisect.bisect_left(entries, (current,))
+        return entries[i][1] if i < len(entries) else entries[-1][1]
+
+    def lookup(self, current_version, device_type):
+        """Known good version for *current_version* (see find_matching_known_good_version)"""
+        entries = self.by_type.get(device_type)
+        if not entries:
+            return "Not Configured"
+        current = parse_version(current_version)
+        train = self.by_train.get((device_type,) + current[:2])
+        return self._nearest_newer(train or entries, current)
+
+
 class DeviceVersionChecker:
     """Class to handle device version checking and reporting"""
     
-    def __init__(self):
+    # Maximum concurrent connections
+    MAX_WORKERS = 20
+    
+    def __init__(self, max_workers=None):
         self.script_name = getScriptName()
         setupLogging()
         self.logger = logging.getLogger(__name__)
@@ -49,7 +112,9 @@ class DeviceVersionChecker:
         
         self.devices = []
         self.known_good_versions = {}
+        self.known_good_index = KnownGoodIndex({})
         self.results = []
+        self.max_workers = max_workers or self.MAX_WORKERS
         
         # Excel styling
         self.yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
@@ -110,6 +175,8 @@ class DeviceVersionChecker:
                     # Add version to the list
                     self.known_good_versions[device_type].append(version)
             
+            self.known_good_index = KnownGoodIndex(self.known_good_versions)
+            
             total_versions = sum(len(versions) for versions in self.known_good_versions.values())
             self.logger.info(f"Loaded {total_versions} known good versions for {len(self.known_good_versions)} device types")
             return True
@@ -127,66 +194,23 @@ class DeviceVersionChecker:
     
     def extract_version_from_output(self, output, device_type):
         """Extract version number from show version output"""
-        # Detect actual device type from output
-        actual_device_type = self.detect_actual_device_type(output)
-        
-        version_patterns = {
-            'cisco_ios': [
-                r'Cisco IOS Software.*Version\s+([0-9]+\.[0-9]+(?:\.[0-9]+)*[A-Z0-9]*)',
-                r'Version\s+([0-9]+\.[0-9]+(?:\.[0-9]+)*[A-Z0-9]*)',
-            ],
-            'cisco_ios_xe': [
-                r'Cisco IOS XE Software.*Version\s+([0-9]+\.[0-9]+\.[0-9]+[A-Z0-9]*)',
-                r'Version\s+([0-9]+\.[0-9]+\.[0-9]+[A-Z0-9]*)',
-            ]
-        }
-        
-        # Use actual device type for pattern matching
-        patterns = version_patterns.get(actual_device_type, version_patterns['cisco_ios'])
-        
-        for pattern in patterns:
-            match = re.search(pattern, output, re.IGNORECASE)
-            if match:
-                version = match.group(1)
-                # Clean up version string (remove trailing letters/codes)
-                clean_version = re.sub(r'[A-Z]+$', '', version)
-                return clean_version, actual_device_type
-        
-        self.logger.warning(f"Could not extract version from output")
-        return "Unknown", actual_device_type
+        version, actual_device_type = extract_version(output)
+        if version == "Unknown":
+            self.logger.warning(f"Could not extract version from output")
+        return version, actual_device_type
 
     def find_matching_known_good_version(self, current_version, actual_device_type):
-        """Find the appropriate known good version based on version train"""
+        """Find the appropriate known good version based on version train
+
+        Prefers the nearest known good version at or above the current one in
+        the same major.minor train; with no train match, the nearest newer
+        known good version for the device type.
+        """
         if current_version == "Unknown":
             return "Unknown"
             
         try:
-            current_parts = [int(x) for x in current_version.split('.')]
-            current_major_minor = f"{current_parts[0]}.{current_parts[1]}"
-            
-            # Get versions for this device type
-            device_versions = self.known_good_versions.get(actual_device_type, [])
-            
-            if not device_versions:
-                return "Not Configured"
-            
-            # First try to find exact version train match (major.minor)
-            for known_version in device_versions:
-                try:
-                    known_parts = [int(x) for x in known_version.split('.')]
-                    known_major_minor = f"{known_parts[0]}.{known_parts[1]}"
-                    
-                    # Check if it's the same version train (major.minor)
-                    if current_major_minor == known_major_minor:
-                        return known_version
-                        
-                except (ValueError, IndexError):
-                    continue
-            
-            # If no exact train match, return the first available version for this device type
-            # This provides a reference point even if not same train
-            return device_versions[0]
-            
+            return self.known_good_index.lookup(current_version, actual_device_type)
         except (ValueError, IndexError) as e:
             self.logger.warning(f"Error finding matching version for {current_version}: {e}")
             return "Not Configured"
@@ -198,8 +222,8 @@ class DeviceVersionChecker:
         
         try:
             # Split versions into components for comparison
-            current_parts = [int(x) for x in current_version.split('.')]
-            good_parts = [int(x) for x in known_good_version.split('.')]
+            current_parts = list(parse_version(current_version))
+            good_parts = list(parse_version(known_good_version))
             
             # Pad shorter version with zeros
             max_len = max(len(current_parts), len(good_parts))
@@ -297,12 +321,13 @@ class DeviceVersionChecker:
             }
 
     def collect_all_versions(self):
-        """Collect version information from all devices"""
-        self.logger.info(f"Starting version collection from {len(self.devices)} devices")
+        """Collect version information from all devices using a bounded thread pool"""
+        self.logger.info(f"Starting version collection from {len(self.devices)} devices "
+                         f"using {self.max_workers} threads")
         
-        for device in self.devices:
-            result = self.connect_and_get_version(device)
-            self.results.append(result)
+        # map() keeps results in device CSV order
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            self.results.extend(executor.map(self.connect_and_get_version, self.devices))
         
         self.logger.info("Version collection completed")
 
@@ -408,13 +433,21 @@ class DeviceVersionChecker:
 
 def main():
     """Main function"""
-    checker = DeviceVersionChecker()
+    parser = argparse.ArgumentParser(description="Check device versions against known good versions")
+    parser.add_argument("--devices", default="devices.csv", help="Device CSV (default: devices.csv)")
+    parser.add_argument("--known-good", default="known_good_versions.csv",
+                        help="Known good versions CSV (default: known_good_versions.csv)")
+    parser.add_argument("--workers", type=int, default=DeviceVersionChecker.MAX_WORKERS,
+                        help=f"Concurrent SSH sessions (default: {DeviceVersionChecker.MAX_WORKERS})")
+    args = parser.parse_args()
+    
+    checker = DeviceVersionChecker(max_workers=args.workers)
     
     # Load configuration files
-    if not checker.load_devices():
+    if not checker.load_devices(args.devices):
         return 1
     
-    if not checker.load_known_good_versions():
+    if not checker.load_known_good_versions(args.known_good):
         return 1
     
     # Collect version information
@@ -1,7 +1,8 @@
-from netmiko import ConnectHandler
+from fleet_snapshot import ConnectHandler, add_snapshot_argument, snapshot_hosts, use_snapshot
 from GetCreds import get_netmiko_creds
 from tools import getScriptName, setupLogging
 from openpyxl import Workbook
+import argparse
 import re
 import logging
 def get_fex_and_native_counts(hostname, netmikoUser, passwd, ws):
@@ -79,6 +80,12 @@ def main():
         # Add more here
     ]
 
+    parser = add_snapshot_argument(argparse.ArgumentParser(description="FEX and native connected-port counts"))
+    args = parser.parse_args()
+    if args.from_snapshot:
+        use_snapshot(args.from_snapshot)
+        switches = snapshot_hosts()
+
     wb = Workbook()
     ws = wb.active
     ws.title = "fex_summary"
@@ -1,12 +1,13 @@
 from netmiko import ConnectHandler
 from getUser import get_netmiko_creds
 from openpyxl import Workbook
+from textfsm_cache import prewarm, send_command_parsed
 import logging
 
 def get_cdp_neighbors(device, ws):
     try:
         connection = ConnectHandler(**device)
-        output = connection.send_command("show cdp neighbors", use_textfsm=True)
+        output = send_command_parsed(connection, "show cdp neighbors")
         connection.disconnect()
 
         if isinstance(output, list):
@@ -26,6 +27,8 @@ def main():
         {"device_type": "cisco_ios", "host": "10.0.0.1", "username": netmikoUser, "password": passwd},
         # Add more devices here
     ]
+    for platform in {d["device_type"] for d in switches}:
+        prewarm(platform, ["show cdp neighbors"])
 
     wb = Workbook()
     ws = wb.active
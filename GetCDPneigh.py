@@ -2,6 +2,7 @@ from netmiko import ConnectHandler
 from getUser import get_netmiko_creds
 from openpyxl import Workbook
 from tools import getScriptName, setupLogging
+from textfsm_cache import prewarm, send_command_parsed
 import logging
 
 def get_cdp_neighbors(device, ws, netmikoUser, passwd):
@@ -12,7 +13,7 @@ def get_cdp_neighbors(device, ws, netmikoUser, passwd):
             username=netmikoUser,
             password=passwd
         )
-        output = conn.send_command("show cdp neighbors", use_textfsm=True)
+        output = send_command_parsed(conn, "show cdp neighbors")
         conn.disconnect()
 
         if isinstance(output, list):
@@ -44,6 +45,7 @@ def main():
     logging.info(f"{scriptName} started")
 
     netmikoUser, passwd = get_netmiko_creds()
+    prewarm("cisco_nxos", ["show cdp neighbors"])
 
     nxos_switches = [
         {"host": "10.0.0.1"},
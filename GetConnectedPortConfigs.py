@@ -20,9 +20,16 @@ plain-text file so it can be sourced into a follow-up script that
 correlates old->new interface names and builds the configuration that
 will be pushed onto the new switch.
 
+By default only the connected ports' config is pulled, with
+"show running-config interface <range>" on compressed ranges (e.g.
+Eth101/1/1-48) batched into a few commands, instead of the full
+running-config.  If that fails or misses ports the switch falls back to
+the full config; --config-mode full forces the old behaviour.
+
 Modeled after pdesc34.py / ExploreFex.py / postCheck.py.
 """
 
+import argparse
 import logging
 import os
 import re
@@ -35,6 +42,8 @@ from openpyxl.styles import Alignment, Font
 from openpyxl.utils import get_column_letter
 
 from tools import get_netmiko_creds, getScriptName, setupLoggingNew
+from parsers import parse_running_config
+from textfsm_cache import prewarm, send_command_parsed
 
 
 # ---------------------------------------------------------------------------
@@ -51,6 +60,10 @@ SWITCHES = [
 # connected in "show interface status".
 EXCLUDE_PREFIXES = ("mgmt", "lo", "vlan", "nve", "po")
 
+# Longest interface list put into one "show running-config interface ..."
+# command; keeps each command well inside the NX-OS CLI line limit.
+MAX_RANGE_CMD_CHARS = 200
+
 # Excel column headers (kept in this order in every per-switch sheet)
 HEADERS = [
     "Switch",
@@ -68,53 +81,94 @@ HEADERS = [
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
-def parse_running_config(run_cfg_text):
-    """
-    Parse the output of `show running-config` into a dict keyed by
-    interface name (exactly as it appears after the `interface ` token)
-    whose value is the raw config block for that interface, including
-    the `interface <name>` header line.
+def is_excluded(interface_name):
+    name = interface_name.lower()
+    return name.startswith(EXCLUDE_PREFIXES)
 
-    Works for NX-OS native slot/port (Eth1/1) and FEX three-tuple
-    (Eth101/1/1) names, as well as port-channels and mgmt interfaces.
-    """
-    configs = {}
-    current_name = None
-    current_lines = []
 
-    iface_re = re.compile(r"^interface\s+(\S+)\s*$", re.IGNORECASE)
+def compress_interface_ranges(interfaces):
+    """
+    Collapse interface names into NX-OS range syntax, grouped by prefix in
+    first-seen order:
 
-    for line in run_cfg_text.splitlines():
-        m = iface_re.match(line)
+        ["Eth101/1/1", "Eth101/1/2", "Eth101/1/3", "Eth1/7"]
+        -> ["Eth101/1/1-3", "Eth1/7"]
+    """
+    groups = defaultdict(list)
+    for intf in interfaces:
+        m = re.match(r"^(.*?)(\d+)$", intf)
         if m:
-            # flush previous
-            if current_name is not None:
-                configs[current_name] = "\n".join(current_lines).rstrip()
-            current_name = m.group(1)
-            current_lines = [line.rstrip()]
-            continue
-
-        if current_name is None:
-            continue
+            groups[m.group(1)].append(int(m.group(2)))
+        else:
+            groups[intf].append(None)
 
-        # Interface block ends at the first non-indented, non-empty line.
-        if line and not line.startswith((" ", "\t")):
-            configs[current_name] = "\n".join(current_lines).rstrip()
-            current_name = None
-            current_lines = []
+    ranges = []
+    for prefix, numbers in groups.items():
+        if numbers == [None]:
+            ranges.append(prefix)
             continue
-
-        current_lines.append(line.rstrip())
-
-    if current_name is not None:
-        configs[current_name] = "\n".join(current_lines).rstrip()
-
-    return configs
+        numbers = sorted(set(numbers))
+        start = prev = numbers[0]
+        for n in numbers[1:] + [None]:
+            if n is not None and n == prev + 1:
+                prev = n
+                continue
+            ranges.append(f"{prefix}{start}" if start == prev else f"{prefix}{start}-{prev}")
+            if n is not None:
+                start = prev = n
+    return ranges
+
+
+def batch_interface_commands(ranges, max_chars=MAX_RANGE_CMD_CHARS):
+    """Pack ranges into as few "show running-config interface" commands as fit."""
+    commands, batch = [], []
+    for r in ranges:
+        if batch and len(", ".join(batch + [r])) > max_chars:
+            commands.append("show running-config interface " + ", ".join(batch))
+            batch = []
+        batch.append(r)
+    if batch:
+        commands.append("show running-config interface " + ", ".join(batch))
+    return commands
+
+
+def lookup_config(configs, intf):
+    """
+    Try a few sensible key variants so we survive "Eth1/1" vs
+    "Ethernet1/1" mismatches between `show interface status` and
+    `show running-config`.
+    """
+    return (
+        configs.get(intf)
+        or configs.get(intf.replace("Eth", "Ethernet"))
+        or configs.get(intf.replace("Ethernet", "Eth"))
+        or ""
+    )
 
 
-def is_excluded(interface_name):
-    name = interface_name.lower()
-    return name.startswith(EXCLUDE_PREFIXES)
+def fetch_connected_configs(conn, hostname, interfaces):
+    """
+    Fetch running-config for just `interfaces` in a few batched range
+    commands.  Returns (configs, bytes_received) or (None, bytes_received)
+    when the switch rejects a command or a port comes back without config,
+    so the caller can fall back to the full running-config.
+    """
+    configs = {}
+    received = 0
+    for command in batch_interface_commands(compress_interface_ranges(interfaces)):
+        output = conn.send_command(command, read_timeout=120)
+        received += len(output)
+        if re.search(r"^\s*% |Syntax error while parsing", output, re.M):
+            logging.warning(f"{hostname}: '{command}' rejected: {output.strip()[:80]}")
+            return None, received
+        configs.update(parse_running_config(output))
+
+    missing = [i for i in interfaces if not lookup_config(configs, i)]
+    if missing:
+        logging.warning(f"{hostname}: no targeted config for {len(missing)} ports "
+                        f"(e.g. {missing[0]})")
+        return None, received
+    return configs, received
 
 
 def init_sheet(wb, title):
@@ -155,11 +209,13 @@ def auto_width_all(wb, config_col_letter="I", config_col_width=80):
 # Per-switch collection
 # ---------------------------------------------------------------------------
 def collect_switch(hostname, netmikoUser, passwd, enable, wb,
-                   summary_tracker, ports_by_switch):
+                   summary_tracker, ports_by_switch, config_mode="targeted"):
     """
     Connect to `hostname`, find every connected interface, grab its
     running-config and write everything onto a worksheet named after the
-    switch.  Updates `summary_tracker` with the per-FEX counts and fills
+    switch.  `config_mode` "targeted" fetches only the connected ports'
+    config (falling back to the full config on failure); "full" always
+    pulls the whole running-config.  Updates `summary_tracker` with the per-FEX counts and fills
     `ports_by_switch[hostname]` with the list of connected interface
     names (used to build the plain-text port list).
     """
@@ -179,51 +235,59 @@ def collect_switch(hostname, netmikoUser, passwd, enable, wb,
             conn.enable()
             conn.send_command("terminal length 0")
 
-            status_rows = conn.send_command(
-                "show interface status", use_textfsm=True, read_timeout=120
-            )
-            run_cfg_text = conn.send_command(
-                "show running-config", read_timeout=300
+            status_rows = send_command_parsed(
+                conn, "show interface status", read_timeout=120
             )
+            if not isinstance(status_rows, list):
+                logging.error(
+                    f"{hostname}: TextFSM parse of 'show interface status' failed; "
+                    "skipping.  Make sure ntc-templates is installed."
+                )
+                return
+
+            connected_rows = [
+                entry for entry in status_rows
+                if (entry.get("status") or "").lower() == "connected"
+                and entry.get("port")
+                and not is_excluded(entry["port"])
+            ]
+
+            configs = None
+            received = 0
+            if config_mode == "targeted" and connected_rows:
+                try:
+                    configs, received = fetch_connected_configs(
+                        conn, hostname, [e["port"] for e in connected_rows]
+                    )
+                except Exception as e:
+                    logging.warning(f"{hostname}: targeted config fetch failed: {e}")
+                if configs is None:
+                    logging.info(f"{hostname}: falling back to full running-config")
+                else:
+                    logging.info(f"{hostname}: targeted config fetch, {received} bytes")
+            if configs is None:
+                run_cfg_text = conn.send_command(
+                    "show running-config", read_timeout=300
+                )
+                logging.info(f"{hostname}: full running-config, {len(run_cfg_text)} bytes")
+                configs = parse_running_config(run_cfg_text)
     except Exception as e:
         logging.error(f"Failed to query {hostname}: {e}")
         return
 
-    if not isinstance(status_rows, list):
-        logging.error(
-            f"{hostname}: TextFSM parse of 'show interface status' failed; "
-            "skipping.  Make sure ntc-templates is installed."
-        )
-        return
-
-    configs = parse_running_config(run_cfg_text)
     ws = init_sheet(wb, hostname)
 
     connected = 0
-    for entry in status_rows:
-        status = (entry.get("status") or "").lower()
-        if status != "connected":
-            continue
-
-        intf = entry.get("port", "")
-        if not intf or is_excluded(intf):
-            continue
-
+    for entry in connected_rows:
+        status = entry["status"].lower()
+        intf = entry["port"]
         desc = entry.get("name", "")
         vlan = entry.get("vlan", "")
         speed = entry.get("speed", "")
         duplex = entry.get("duplex", "")
         iftype = entry.get("type", "")
 
-        # Try a few sensible key variants so we survive "Eth1/1" vs
-        # "Ethernet1/1" mismatches between `show interface status` and
-        # `show running-config`.
-        cfg = (
-            configs.get(intf)
-            or configs.get(intf.replace("Eth", "Ethernet"))
-            or configs.get(intf.replace("Ethernet", "Eth"))
-            or ""
-        )
+        cfg = lookup_config(configs, intf)
 
         ws.append([
             hostname, intf, status, vlan, desc, speed, duplex, iftype, cfg,
@@ -299,12 +363,19 @@ def write_port_list_file(ports_by_switch, path):
 # Main
 # ---------------------------------------------------------------------------
 def main():
+    parser = argparse.ArgumentParser(description="Connected ports and their config per NX-OS switch")
+    parser.add_argument("--config-mode", choices=("targeted", "full"), default="targeted",
+                        help="targeted: 'show running-config interface <ranges>' for connected "
+                             "ports only (default); full: whole running-config")
+    args = parser.parse_args()
+
     timestamp = datetime.now().strftime("%Y%m%d_%H%M")
     script_name = getScriptName()
     setupLoggingNew(log_file=f"{script_name}_{timestamp}.log")
     logging.info(f"{script_name} started")
 
     netmikoUser, passwd, enable = get_netmiko_creds()
+    prewarm("cisco_nxos", ["show interface status"])
 
     wb = Workbook()
     wb.remove(wb.active)  # drop default blank sheet
@@ -316,6 +387,7 @@ def main():
         collect_switch(
             hostname, netmikoUser, passwd, enable,
             wb, summary_tracker, ports_by_switch,
+            config_mode=args.config_mode,
         )
 
     write_summary_sheet(wb, summary_tracker)
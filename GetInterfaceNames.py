@@ -3,6 +3,7 @@ import csv
 from datetime import datetime
 from netmiko import ConnectHandler
 from tools import getScriptName, setupLogging, get_netmiko_creds
+from textfsm_cache import prewarm, send_command_parsed
 
 def collect_interface_names(switch, writer, netmikoUser, passwd):
     device = {
@@ -18,7 +19,7 @@ def collect_interface_names(switch, writer, netmikoUser, passwd):
         conn = ConnectHandler(**device)
         conn.enable()
 
-        output = conn.send_command("show interface description", use_textfsm=True)
+        output = send_command_parsed(conn, "show interface description")
         conn.disconnect()
 
         if isinstance(output, list):
@@ -41,6 +42,7 @@ def main():
     logging.info(f"{scriptName} started")
 
     netmikoUser, passwd, enable = get_netmiko_creds()
+    prewarm("cisco_nxos", ["show interface description"])
 
     nxos_switches = [
         "switch1",
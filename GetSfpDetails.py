@@ -1,7 +1,8 @@
+import argparse
 import openpyxl
 from openpyxl.styles import Font
 from openpyxl.utils import get_column_letter
-from netmiko import ConnectHandler
+from fleet_snapshot import ConnectHandler, add_snapshot_argument, snapshot_hosts, use_snapshot
 from GetCreds import get_netmiko_creds
 from tools import getScriptName, setupLogging, logScriptStart, outputFile
 
@@ -39,6 +40,12 @@ def main():
         "switch2.example.com"
     ]
 
+    parser = add_snapshot_argument(argparse.ArgumentParser(description="SFP product ID and serial numbers"))
+    args = parser.parse_args()
+    if args.from_snapshot:
+        use_snapshot(args.from_snapshot)
+        switchList = snapshot_hosts()
+
     wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = "SFP Details"
@@ -1,7 +1,8 @@
-from netmiko import ConnectHandler
+from fleet_snapshot import ConnectHandler, add_snapshot_argument, snapshot_hosts, use_snapshot
 from GetCreds import get_netmiko_creds
 from tools import getScriptName, setupLogging
 from openpyxl import Workbook
+import argparse
 import logging
 import re
 from collections import defaultdict
@@ -79,6 +80,12 @@ def main():
         "sw21", "sw22", "sw23", "sw24", "sw25"
     ]
 
+    parser = add_snapshot_argument(argparse.ArgumentParser(description="Connected interfaces per FEX"))
+    args = parser.parse_args()
+    if args.from_snapshot:
+        use_snapshot(args.from_snapshot)
+        switches = snapshot_hosts()
+
     wb = Workbook()
     wb.remove(wb.active)  # remove default sheet
     sheet_map = {}
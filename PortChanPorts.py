@@ -1,84 +1,17 @@
-from netmiko import ConnectHandler
+from fleet_snapshot import ConnectHandler, add_snapshot_argument, snapshot_hosts, use_snapshot
 from GetCreds import get_netmiko_creds
 from tools import getScriptName, setupLogging
+from textfsm_cache import prewarm, send_command_parsed
 from datetime import datetime
 from openpyxl import Workbook
 from openpyxl.styles import Font
+import argparse
 import logging
-import re
-
-def parse_portchannel_summary(output):
-    portchannel_map = {}
-    current_pc = None
-    dash_count = 0
-
-    for line in output.splitlines():
-        if re.match(r'^-+$', line.strip()):
-            dash_count += 1
-            continue
-
-        if dash_count < 2:
-            continue
-
-        line = line.strip()
-
-        # Look for a line that starts a new port-channel group like:
-        # "10     Po1(SU)     LACP       Eth1/22(P)  Eth1/33(P)"
-        po_line_match = re.match(r'^\d+\s+(Po\d+\w+)', line)
-        if po_line_match:
-            # Extract Po ID with status, e.g. Po1(SU)
-            current_pc = po_line_match.group(1)
-
-        if current_pc:
-            # Find all interfaces like Eth1/22(P)
-            matches = re.findall(r'(Eth\d+/\d+(?:/\d+)?)[\s]*(\w)', line)
-            for intf, flag in matches:
-                portchannel_map[intf] = f"{current_pc} ({flag})"
-
-    return portchannel_map
-
-
-
-
-def parse_portchannel_summary(output):
-    portchannel_map = {}
-    current_pc = None
-    dash_count = 0
-
-    for line in output.splitlines():
-        if re.match(r'^-+$', line.strip()):
-            dash_count += 1
-            continue
-
-        if dash_count < 2:
-            continue
-
-        line = line.strip()
-
-        # New Po line with optional members
-        po_match = re.match(r'^\d+\s+(Po\d+)', line)
-        if po_match:
-            current_pc = po_match.group(1)
-
-        # Always look for interfaces, even on same line as Po or wrapped line
-        if current_pc:
-            matches = re.findall(r'(Eth\d+/\d+(?:/\d+)?)[\s]*(\w)', line)
-            for intf, status in matches:
-                portchannel_map[intf] = f"{current_pc} ({status})"
-
-    return portchannel_map
-
-
-
-
-
-    
-
-
-
-
+from parsers import parse_portchannel_summary
 
 
+def correlate_neighbors(hostname, netmikoUser, passwd, enable):
+    try:
         conn = ConnectHandler(
             device_type='cisco_nxos',
             host=hostname,
@@ -87,34 +20,28 @@ def parse_portchannel_summary(output):
             secret=enable
         )
         conn.enable()
-        cdp_output = conn.send_command("show cdp neighbors", use_textfsm=True)
+        cdp_output = send_command_parsed(conn, "show cdp neighbors")
         pc_output = conn.send_command("show port-channel summary", use_textfsm=False)
         conn.disconnect()
     except Exception as e:
         logging.error(f"{hostname}: {e}")
         return []
 
+    if isinstance(cdp_output, str):
+        logging.error(f"{hostname}: could not parse 'show cdp neighbors'")
+        return []
+
     portchannel_map = parse_portchannel_summary(pc_output)
-results = []
-for entry in cdp_output:
-    local_intf = entry['local_interface']
-    results.append({
-        'Hostname': hostname,
-        'Local Interface': local_intf,
-        'Port-Channel': portchannel_map.get(local_intf, '---'),
-        'Neighbor': entry['neighbor_name'],
-        'Neighbor Port': entry['neighbor_interface'],
-        'Platform': entry.get('platform', '---')
-    })
     results = []
     for entry in cdp_output:
-        local_intf = entry['local_port']
+        local_intf = entry['local_interface']
         results.append({
             'Hostname': hostname,
             'Local Interface': local_intf,
             'Port-Channel': portchannel_map.get(local_intf, '---'),
-            'Neighbor': entry['destination_host'],
-            'Neighbor Port': entry['port_id']
+            'Neighbor': entry['neighbor_name'],
+            'Neighbor Port': entry['neighbor_interface'],
+            'Platform': entry.get('platform', '---')
         })
     return results
 
@@ -146,9 +73,18 @@ def main():
     scriptName = getScriptName()
     setupLogging(scriptName, timestamp)
 
-    netmikoUser, passwd, enable = get_netmiko_creds()
+    prewarm("cisco_nxos", ["show cdp neighbors"])
     devices = ["switchzz1", "switzz2", "switchAPAC44"]
 
+    parser = add_snapshot_argument(argparse.ArgumentParser(description="CDP neighbours with port-channel membership"))
+    args = parser.parse_args()
+    if args.from_snapshot:
+        use_snapshot(args.from_snapshot)
+        devices = snapshot_hosts()
+        netmikoUser = passwd = enable = None
+    else:
+        netmikoUser, passwd, enable = get_netmiko_creds()
+
     all_rows = []
     for hostname in devices:
         rows = correlate_neighbors(hostname, netmikoUser, passwd, enable)
@@ -6,14 +6,25 @@ This script connects to network devices via SSH using netmiko with threading,
 collects 'show interfaces transceiver' information, parses it using TextFSM
 or regex fallback, and generates an Excel report with a summary page.
 
+The inventory is kept in a local SQLite database.  Each run first sends a
+cheap probe command per device and hashes the result; only devices whose
+probe fingerprint changed since the last run are re-collected and re-parsed.
+The Excel report is always built from the database.
+
+Usage:
+    python TransceiverInventory.py [devices.csv] [--db FILE] [--full]
+
 Author: SuperDan Environment
 """
 
-from netmiko import ConnectHandler
+from fleet_snapshot import ConnectHandler, add_snapshot_argument, use_snapshot
 from tools import getScriptName, setupLogging, get_netmiko_creds
+from parsers import parse_nxos_transceiver, parse_ios_transceiver, parse_inventory
+import argparse
+import hashlib
 import logging
 import csv
-import re
+import sqlite3
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import Counter
@@ -30,12 +41,127 @@ except ImportError:
     print("Error: openpyxl library not found. Please install it with: pip install openpyxl")
     sys.exit(1)
 
-# TextFSM support (optional - will use regex fallback if not available)
-try:
-    import textfsm
-    TEXTFSM_AVAILABLE = True
-except ImportError:
-    TEXTFSM_AVAILABLE = False
+# TextFSM support (optional - shared compiled-template cache, regex fallback)
+from textfsm_cache import TEXTFSM_AVAILABLE
+
+
+# Cheap per-device probes used for change detection.  IOS "show inventory"
+# lists every pluggable with PID/SN; on NX-OS only the interface and serial
+# lines of the transceiver output are fetched instead of the full detail.
+PROBE_COMMANDS = {
+    'cisco_ios': 'show inventory',
+    'cisco_nxos': 'show interface transceiver | include "^Ether|serial number"',
+}
+
+TRANSCEIVER_FIELDS = ['interface', 'cisco_part_number', 'serial_number', 'type', 'cisco_product_id', 'name']
+
+
+def probe_fingerprint(device_type, output):
+    """Hash probe output into a stable fingerprint.
+
+    IOS inventory is reduced to sorted (name, pid, sn) tuples so ordering
+    and description wording do not matter; other output is hashed line by
+    line with whitespace normalised.  Returns None for error output so a
+    rejected probe never looks "unchanged".
+    """
+    if not output.strip() or output.lstrip().startswith('%') or 'Invalid' in output:
+        return None
+    if device_type == 'cisco_ios':
+        items = sorted((i['name'], i['pid'], i['sn']) for i in parse_inventory(output))
+        canonical = "\n".join("|".join(item) for item in items)
+    else:
+        lines = (" ".join(line.split()) for line in output.splitlines())
+        canonical = "\n".join(line for line in lines if line)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class TransceiverStore:
+    """SQLite-backed transceiver inventory with per-device probe fingerprints"""
+
+    def __init__(self, db_file="transceiver_inventory.db"):
+        self.db_file = db_file
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS devices (
+                devicename     TEXT PRIMARY KEY,
+                ipaddr         TEXT,
+                devicetype     TEXT,
+                description    TEXT,
+                fingerprint    TEXT,
+                last_checked   TEXT,
+                last_collected TEXT,
+                last_error     TEXT
+            );
+            CREATE TABLE IF NOT EXISTS transceivers (
+                devicename        TEXT,
+                interface         TEXT,
+                cisco_part_number TEXT,
+                serial_number     TEXT,
+                type              TEXT,
+                cisco_product_id  TEXT,
+                name              TEXT,
+                PRIMARY KEY (devicename, interface)
+            );
+        """)
+        self.conn.commit()
+
+    def get_fingerprint(self, devicename):
+        with self.lock:
+            row = self.conn.execute("SELECT fingerprint FROM devices WHERE devicename = ?",
+                                    (devicename,)).fetchone()
+        return row[0] if row else None
+
+    def _upsert_device(self, device, **fields):
+        self.conn.execute("""
+            INSERT INTO devices (devicename, ipaddr, devicetype, description)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(devicename) DO UPDATE SET
+                ipaddr = excluded.ipaddr, devicetype = excluded.devicetype,
+                description = excluded.description
+        """, (device.get('devicename', ''), device.get('ipaddr', ''),
+              device.get('devicetype', ''), device.get('description', '')))
+        if fields:
+            sets = ", ".join(f"{k} = ?" for k in fields)
+            self.conn.execute(f"UPDATE devices SET {sets} WHERE devicename = ?",
+                              list(fields.values()) + [device.get('devicename', '')])
+
+    def mark_unchanged(self, device):
+        now = datetime.now().isoformat(sep=' ', timespec='seconds')
+        with self.lock:
+            self._upsert_device(device, last_checked=now, last_error='')
+            self.conn.commit()
+
+    def mark_failed(self, device, error):
+        with self.lock:
+            self._upsert_device(device, last_error=error)
+            self.conn.commit()
+
+    def replace_device(self, device, fingerprint, transceivers):
+        """Replace all transceiver rows for one device in a single transaction"""
+        now = datetime.now().isoformat(sep=' ', timespec='seconds')
+        devicename = device.get('devicename', '')
+        with self.lock:
+            self.conn.execute("DELETE FROM transceivers WHERE devicename = ?", (devicename,))
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO transceivers (devicename, {', '.join(TRANSCEIVER_FIELDS)}) "
+                f"VALUES (?, {', '.join('?' * len(TRANSCEIVER_FIELDS))})",
+                [[devicename] + [t.get(f, '') for f in TRANSCEIVER_FIELDS] for t in transceivers])
+            self._upsert_device(device, fingerprint=fingerprint, last_checked=now,
+                                last_collected=now, last_error='')
+            self.conn.commit()
+
+    def load_transceivers(self, devicenames=None):
+        """Return transceiver records (dicts) for *devicenames*, or all devices"""
+        query = f"SELECT devicename, {', '.join(TRANSCEIVER_FIELDS)} FROM transceivers"
+        with self.lock:
+            rows = self.conn.execute(query + " ORDER BY devicename, interface").fetchall()
+        wanted = set(devicenames) if devicenames is not None else None
+        keys = ['devicename'] + TRANSCEIVER_FIELDS
+        return [dict(zip(keys, r)) for r in rows if wanted is None or r[0] in wanted]
+
+    def close(self):
+        self.conn.close()
 
 
 class TransceiverInventory:
@@ -44,16 +170,20 @@ class TransceiverInventory:
     # Maximum concurrent connections
     MAX_WORKERS = 20
     
-    def __init__(self, csv_file="freedevices.csv"):
+    def __init__(self, csv_file="freedevices.csv", db_file="transceiver_inventory.db", full=False,
+                 snapshot=False):
         self.script_name = getScriptName()
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         setupLogging(self.script_name, timestamp)
         self.logger = logging.getLogger(__name__)
         self.csv_file = csv_file
         
-        # Get credentials
+        # Get credentials (none needed when replaying a fleet snapshot)
         try:
-            self.netmiko_user, self.passwd, self.enable = get_netmiko_creds()
+            if snapshot:
+                self.netmiko_user = self.passwd = self.enable = None
+            else:
+                self.netmiko_user, self.passwd, self.enable = get_netmiko_creds()
         except:
             from tools import netmikoUser, passwd, enable
             self.netmiko_user = netmikoUser
@@ -61,9 +191,15 @@ class TransceiverInventory:
             self.enable = enable
         
         self.devices = []
-        self.results = []  # List of transceiver records
+        self.results = []  # List of transceiver records (loaded from the store)
         self.device_errors = []  # Track failed devices
         self.results_lock = threading.Lock()
+        # A snapshot is a point-in-time replay: keep it out of the persistent
+        # store, whose timestamps and change history describe live collections
+        self.store = TransceiverStore(":memory:" if snapshot else db_file)
+        self.full = full  # Ignore fingerprints and re-collect every device
+        self.collected = 0
+        self.unchanged = 0
         
         # Excel styling
         self.header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
@@ -160,135 +296,11 @@ class TransceiverInventory:
 
     def parse_nxos_transceiver(self, output, devicename):
         """Parse NX-OS show interface transceiver output"""
-        transceivers = []
-        
-        # NX-OS format parsing - each interface block
-        current_interface = None
-        current_data = {}
-        
-        for line in output.splitlines():
-            line = line.strip()
-            
-            # Interface line (e.g., "Ethernet1/1")
-            if re.match(r'^(Ethernet\d+/\d+(/\d+)?|port-channel\d+)', line, re.IGNORECASE):
-                # Save previous interface if we have data
-                if current_interface and current_data:
-                    transceivers.append(current_data)
-                
-                current_interface = line.split()[0]
-                current_data = {
-                    'devicename': devicename,
-                    'interface': current_interface,
-                    'cisco_part_number': '',
-                    'serial_number': '',
-                    'type': '',
-                    'cisco_product_id': '',
-                    'name': ''
-                }
-            
-            # Parse various fields
-            elif current_interface:
-                # Type/transceiver type (e.g., "transceiver is present")
-                if 'transceiver is' in line.lower():
-                    match = re.search(r'transceiver is\s+(.+)', line, re.IGNORECASE)
-                    if match:
-                        current_data['type'] = match.group(1).strip()
-                
-                # Cisco part number (e.g., "cisco part number is 10-3172-01")
-                elif 'cisco part number' in line.lower():
-                    match = re.search(r'cisco part number\s+is\s+(\S+)', line, re.IGNORECASE)
-                    if match:
-                        current_data['cisco_part_number'] = match.group(1)
-                
-                # Cisco product id (e.g., "cisco product id is QSFP-100G-SR4-S")
-                elif 'cisco product id' in line.lower():
-                    match = re.search(r'cisco product id\s+is\s+(\S+)', line, re.IGNORECASE)
-                    if match:
-                        current_data['cisco_product_id'] = match.group(1)
-                
-                # Serial number (e.g., "serial number is ABC1234567")
-                elif 'serial number' in line.lower():
-                    match = re.search(r'serial number\s+is\s+(\S+)', line, re.IGNORECASE)
-                    if match:
-                        current_data['serial_number'] = match.group(1)
-                
-                # Name/vendor (e.g., "name is CISCO-FINISAR")
-                elif 'name is' in line.lower():
-                    match = re.search(r'name\s+is\s+(.+)', line, re.IGNORECASE)
-                    if match:
-                        current_data['name'] = match.group(1).strip()
-        
-        # Don't forget the last interface
-        if current_interface and current_data:
-            transceivers.append(current_data)
-        
-        # Filter out entries without meaningful data
-        transceivers = [t for t in transceivers if t.get('cisco_part_number') or t.get('serial_number')]
-        
-        return transceivers
+        return parse_nxos_transceiver(output, devicename)
 
     def parse_ios_transceiver(self, output, devicename):
         """Parse IOS show interface transceiver output"""
-        transceivers = []
-        
-        current_interface = None
-        current_data = {}
-        
-        for line in output.splitlines():
-            line = line.strip()
-            
-            # Interface patterns for IOS
-            interface_match = re.match(r'^(Gi\S+|Te\S+|Fa\S+|Eth\S+|TwoGig\S+|TenGig\S+|TwentyFiveGig\S+|FortyGig\S+|HundredGig\S+)', line, re.IGNORECASE)
-            if interface_match:
-                if current_interface and current_data:
-                    transceivers.append(current_data)
-                
-                current_interface = interface_match.group(1)
-                current_data = {
-                    'devicename': devicename,
-                    'interface': current_interface,
-                    'cisco_part_number': '',
-                    'serial_number': '',
-                    'type': '',
-                    'cisco_product_id': '',
-                    'name': ''
-                }
-            
-            elif current_interface:
-                # Parse various fields - IOS format
-                if 'transceiver type' in line.lower():
-                    match = re.search(r'transceiver type[:\s]+(.+)', line, re.IGNORECASE)
-                    if match:
-                        current_data['type'] = match.group(1).strip()
-                
-                elif 'part number' in line.lower():
-                    match = re.search(r'part number[:\s]+(\S+)', line, re.IGNORECASE)
-                    if match:
-                        current_data['cisco_part_number'] = match.group(1)
-                
-                elif 'product id' in line.lower():
-                    match = re.search(r'product id[:\s]+(\S+)', line, re.IGNORECASE)
-                    if match:
-                        current_data['cisco_product_id'] = match.group(1)
-                
-                elif 'serial' in line.lower():
-                    match = re.search(r'serial[^:]*[:\s]+(\S+)', line, re.IGNORECASE)
-                    if match:
-                        current_data['serial_number'] = match.group(1)
-                
-                elif 'vendor name' in line.lower() or ('name' in line.lower() and 'is' in line.lower()):
-                    match = re.search(r'(?:vendor )?name[:\s]+(.+)', line, re.IGNORECASE)
-                    if match:
-                        current_data['name'] = match.group(1).strip()
-        
-        # Don't forget the last interface
-        if current_interface and current_data:
-            transceivers.append(current_data)
-        
-        # Filter out entries without meaningful data
-        transceivers = [t for t in transceivers if t.get('cisco_part_number') or t.get('serial_number')]
-        
-        return transceivers
+        return parse_ios_transceiver(output, devicename)
 
     def connect_and_collect(self, device):
         """Connect to device and collect transceiver information"""
@@ -323,6 +335,17 @@ class TransceiverInventory:
                 except:
                     pass  # Some devices don't need enable
             
+            # Cheap probe first - skip full collection if nothing changed
+            probe_cmd = PROBE_COMMANDS.get(device_type, PROBE_COMMANDS['cisco_ios'])
+            fingerprint = probe_fingerprint(device_type, conn.send_command(probe_cmd, read_timeout=60))
+            if not self.full and fingerprint and fingerprint == self.store.get_fingerprint(devicename):
+                conn.disconnect()
+                self.store.mark_unchanged(device)
+                self.logger.info(f"{devicename}: optics unchanged, using stored inventory")
+                with self.results_lock:
+                    self.unchanged += 1
+                return {'device': devicename, 'status': 'Unchanged', 'count': 0}
+
             # Run show interface transceiver command
             if device_type == 'cisco_nxos':
                 # NX-OS command - get detail for more info
@@ -337,9 +360,9 @@ class TransceiverInventory:
             
             self.logger.info(f"Found {len(transceivers)} transceivers on {devicename}")
             
-            # Thread-safe append
+            self.store.replace_device(device, fingerprint, transceivers)
             with self.results_lock:
-                self.results.extend(transceivers)
+                self.collected += 1
             
             return {'device': devicename, 'status': 'Success', 'count': len(transceivers)}
             
@@ -347,6 +370,7 @@ class TransceiverInventory:
             error_msg = str(e)
             self.logger.error(f"Failed to connect to {devicename} ({ip_addr}): {error_msg}")
             
+            self.store.mark_failed(device, error_msg)
             with self.results_lock:
                 self.device_errors.append({
                     'devicename': devicename,
@@ -378,7 +402,10 @@ class TransceiverInventory:
                         'error': str(e)
                     })
         
-        self.logger.info(f"Collection complete. Found {len(self.results)} total transceivers")
+        # Report from the store: unchanged and failed devices keep their last known optics
+        self.results = self.store.load_transceivers(d.get('devicename', '') for d in self.devices)
+        self.logger.info(f"Collection complete. Re-collected {self.collected}, unchanged {self.unchanged}, "
+                         f"failed {len(self.device_errors)}. {len(self.results)} total transceivers")
         return results_summary
 
     def generate_excel_report(self, filename=None):
@@ -548,6 +575,8 @@ class TransceiverInventory:
         print(f"  Devices processed:      {total_devices}")
         print(f"  Successful connections: {successful}")
         print(f"  Failed connections:     {len(self.device_errors)}")
+        print(f"  Re-collected (changed): {self.collected}")
+        print(f"  Unchanged (from store): {self.unchanged}")
         print(f"  Total transceivers:     {len(self.results)}")
         
         if self.results:
@@ -564,12 +593,21 @@ class TransceiverInventory:
 
 def main():
     """Main function"""
-    # Check for command line argument for CSV file
-    csv_file = "freedevices.csv"
-    if len(sys.argv) > 1:
-        csv_file = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Incremental transceiver inventory with SQLite store and Excel report")
+    parser.add_argument("csv_file", nargs="?", default="freedevices.csv",
+                        help="Device CSV (default: freedevices.csv)")
+    parser.add_argument("--db", default="transceiver_inventory.db",
+                        help="SQLite inventory store (default: transceiver_inventory.db)")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore change detection and re-collect every device")
+    add_snapshot_argument(parser)
+    args = parser.parse_args()
+    if args.from_snapshot:
+        use_snapshot(args.from_snapshot)
+    csv_file = args.csv_file
     
-    inventory = TransceiverInventory(csv_file=csv_file)
+    inventory = TransceiverInventory(csv_file=csv_file, db_file=args.db, full=args.full,
+                                     snapshot=bool(args.from_snapshot))
     
     # Load devices
     if not inventory.load_devices():
@@ -586,6 +624,7 @@ def main():
     
     # Print summary
     inventory.print_summary()
+    inventory.store.close()
     
     print(f"Report saved as: {report_filename}")
     
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+batch_parse.py - Re-parse archived precheck_/postcheck_ output and logs in bulk
+
+Walks the given directories for precheck_<ts>/ and postcheck_<ts>/ folders
+(as written by preCheck.py / postCheck.py) and logs/ folders (tools.setupLogging),
+fans the CPU-bound regex parsing out to a process pool one file at a time,
+and writes everything into one consolidated output:
+
+    versions      device software version per run
+    inventory     show inventory PID/VID/SN per run
+    interfaces    show interface status rows per run
+    transceivers  show interface transceiver rows per run
+    log_events    WARNING/ERROR records from the script logs
+    parse_errors  files that could not be parsed
+
+Usage:
+    python batch_parse.py                                # ./precheck_* ./postcheck_* ./logs
+    python batch_parse.py /archive/2025 --format sqlite --output history.db
+    python batch_parse.py /archive --format csv --output history_csv --workers 16
+    python batch_parse.py /archive --format parquet --output history_parquet
+"""
+
+import argparse
+import csv
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from tools import getScriptName, setupLogging
+from parsers import (extract_version, parse_inventory, parse_interface_status,
+                     parse_nxos_transceiver, parse_ios_transceiver)
+
+
+# Output tables and their columns.  Every row produced by parse_file() is a
+# tuple in this column order, so writers never need to look at dict keys.
+TABLES = {
+    "versions": ["run", "run_time", "device", "version", "device_type", "source_file"],
+    "inventory": ["run", "run_time", "device", "name", "descr", "pid", "vid", "sn", "source_file"],
+    "interfaces": ["run", "run_time", "device", "port", "name", "status", "vlan",
+                   "duplex", "speed", "type", "source_file"],
+    "transceivers": ["run", "run_time", "device", "interface", "cisco_part_number",
+                     "serial_number", "type", "cisco_product_id", "name", "source_file"],
+    "log_events": ["log_file", "timestamp", "level", "function", "device", "message"],
+    "parse_errors": ["source_file", "error"],
+}
+
+RUN_DIR_RE = re.compile(r'^(precheck|postcheck)_(\d{8}_\d{6})$')
+LOG_LINE_RE = re.compile(
+    r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - (\w+) - (\S+?):\d+ - (.*)$'
+)
+LOG_DEVICE_RE = re.compile(r'(?:Failed on|Failed to connect to|Connecting to|Failed connecting to)\s+([\w.\-]+)')
+LOG_LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+DEFAULT_WORKERS = os.cpu_count() or 4
+DEFAULT_FLUSH_ROWS = 50000
+
+
+# ====================================================================
+# File discovery
+# ====================================================================
+
+def discover_files(roots):
+    """Return [(path, kind, run, run_time), ...] for every archived file.
+
+    kind is "check" for precheck_/postcheck_ command output files and
+    "log" for files in a logs/ directory.
+    """
+    found = []
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            # combineDeviceOutputs.sh writes duplicates into <run>/combined
+            dirnames[:] = [d for d in dirnames if d != "combined"]
+            base = os.path.basename(os.path.normpath(dirpath))
+            m = RUN_DIR_RE.match(base)
+            if m:
+                run_time = datetime.strptime(m.group(2), "%Y%m%d_%H%M%S").isoformat(sep=" ")
+                for name in sorted(filenames):
+                    if name.endswith(".txt"):
+                        found.append((os.path.join(dirpath, name), "check", base, run_time))
+            elif base == "logs":
+                for name in sorted(filenames):
+                    if name.endswith(".log"):
+                        found.append((os.path.join(dirpath, name), "log", "", ""))
+    return found
+
+
+# ====================================================================
+# Parsing (runs inside worker processes)
+# ====================================================================
+
+def read_saved_output(text):
+    """Split a preCheck/postCheck file into (device, command, output)."""
+    device = command = ""
+    lines = text.splitlines()
+    body_start = 0
+    for i, line in enumerate(lines[:10]):
+        if line.startswith("Device:"):
+            device = line.split(":", 1)[1].strip()
+        elif line.startswith("Command:"):
+            command = line.split(":", 1)[1].strip()
+        elif line.startswith("====="):
+            body_start = i + 1
+            break
+    body = lines[body_start:]
+    if body and body[-1].startswith("====="):
+        body = body[:-1]
+    return device, command, "\n".join(body)
+
+
+def _parse_check_file(text, run, run_time, source):
+    """Parse one saved command output file into table rows."""
+    rows = {}
+    device, command, output = read_saved_output(text)
+    cmd = re.sub(r'\s+', ' ', command.lower())
+    prefix = (run, run_time, device)
+
+    if cmd.startswith("show version"):
+        version, device_type = extract_version(output)
+        rows["versions"] = [prefix + (version, device_type, source)]
+
+    elif cmd.startswith("show inventory"):
+        rows["inventory"] = [
+            prefix + (i["name"], i["descr"], i["pid"], i["vid"], i["sn"], source)
+            for i in parse_inventory(output)
+        ]
+
+    elif re.match(r'show interfaces? (\S+ )?status', cmd):
+        rows["interfaces"] = [
+            prefix + (r["port"], r["name"], r["status"], r["vlan"],
+                      r["duplex"], r["speed"], r["type"], source)
+            for r in parse_interface_status(output)
+        ]
+
+    elif re.match(r'show interfaces? (\S+ )?transceiver', cmd):
+        if re.search(r'transceiver is', output, re.IGNORECASE):
+            parsed = parse_nxos_transceiver(output, device)
+        else:
+            parsed = parse_ios_transceiver(output, device)
+        rows["transceivers"] = [
+            prefix + (t["interface"], t["cisco_part_number"], t["serial_number"],
+                      t["type"], t["cisco_product_id"], t["name"], source)
+            for t in parsed
+        ]
+
+    return rows
+
+
+def _parse_log_file(text, source, min_level):
+    """Parse a tools.setupLogging log file into log_events rows.
+
+    Continuation lines (multi-line exception text) are folded into the
+    preceding record.
+    """
+    events = []
+    current = None
+    for line in text.splitlines():
+        m = LOG_LINE_RE.match(line)
+        if m:
+            current = None
+            ts, level, func, msg = m.groups()
+            if LOG_LEVELS.get(level, 0) < min_level:
+                continue
+            dev = LOG_DEVICE_RE.search(msg)
+            current = [source, ts, level, func, dev.group(1) if dev else "", msg]
+            events.append(current)
+        elif current is not None and line.strip():
+            current[5] += "\n" + line.rstrip()
+    return {"log_events": [tuple(e) for e in events]}
+
+
+def parse_file(job):
+    """Worker entry point: parse one archived file, return {table: [rows]}."""
+    path, kind, run, run_time, min_level = job
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        if kind == "log":
+            return _parse_log_file(text, path, min_level)
+        return _parse_check_file(text, run, run_time, path)
+    except Exception as e:
+        return {"parse_errors": [(path, str(e))]}
+
+
+# ====================================================================
+# Writers
+# ====================================================================
+
+class SqliteWriter:
+    """Append rows into one SQLite database, one table per record kind."""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        for table, cols in TABLES.items():
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(cols)})")
+
+    def write(self, table, rows):
+        marks = ", ".join("?" * len(TABLES[table]))
+        self.conn.executemany(f"INSERT INTO {table} VALUES ({marks})", rows)
+        self.conn.commit()
+
+    def close(self):
+        for table in ("versions", "inventory", "interfaces", "transceivers"):
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_device ON {table} (device, run_time)")
+        self.conn.commit()
+        self.conn.close()
+
+
+class CsvWriter:
+    """Append rows into <output_dir>/<table>.csv files."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.files = {}
+
+    def _writer(self, table):
+        if table not in self.files:
+            f = open(os.path.join(self.path, f"{table}.csv"), "w", newline="", encoding="utf-8")
+            w = csv.writer(f)
+            w.writerow(TABLES[table])
+            self.files[table] = (f, w)
+        return self.files[table][1]
+
+    def write(self, table, rows):
+        self._writer(table).writerows(rows)
+
+    def close(self):
+        for f, _ in self.files.values():
+            f.close()
+
+
+class ParquetWriter:
+    """Append row groups into <output_dir>/<table>.parquet (needs pyarrow)."""
+
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            print("Error: pyarrow not found.  pip install pyarrow  (or use --format sqlite/csv)")
+            sys.exit(1)
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.writers = {}
+
+    def write(self, table, rows):
+        cols = TABLES[table]
+        batch = self.pa.table({c: [str(r[i]) for r in rows] for i, c in enumerate(cols)})
+        if table not in self.writers:
+            self.writers[table] = self.pq.ParquetWriter(
+                os.path.join(self.path, f"{table}.parquet"), batch.schema)
+        self.writers[table].write_table(batch)
+
+    def close(self):
+        for w in self.writers.values():
+            w.close()
+
+
+WRITERS = {"sqlite": SqliteWriter, "csv": CsvWriter, "parquet": ParquetWriter}
+
+
+# ====================================================================
+# Driver
+# ====================================================================
+
+def run_batch(files, writer, workers=DEFAULT_WORKERS, flush_rows=DEFAULT_FLUSH_ROWS,
+              min_level=LOG_LEVELS["WARNING"], logger=None):
+    """Parse *files* in a process pool and stream rows into *writer*.
+
+    Results are collected in per-table buffers and flushed whenever a
+    buffer reaches *flush_rows*, so memory stays bounded regardless of
+    archive size.  Returns {table: row_count}.
+    """
+    logger = logger or logging.getLogger(__name__)
+    jobs = [(path, kind, run, run_time, min_level) for path, kind, run, run_time in files]
+    chunksize = max(1, min(64, len(jobs) // (workers * 4) or 1))
+
+    buffers = {t: [] for t in TABLES}
+    counts = {t: 0 for t in TABLES}
+
+    def flush(table):
+        if buffers[table]:
+            writer.write(table, buffers[table])
+            counts[table] += len(buffers[table])
+            buffers[table] = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for done, result in enumerate(pool.map(parse_file, jobs, chunksize=chunksize), 1):
+            for table, rows in result.items():
+                buffers[table].extend(rows)
+                if len(buffers[table]) >= flush_rows:
+                    flush(table)
+            if done % 1000 == 0:
+                logger.info(f"Parsed {done}/{len(jobs)} files")
+
+    for table in TABLES:
+        flush(table)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-parse archived precheck_/postcheck_ directories and logs into one consolidated output."
+    )
+    parser.add_argument("roots", nargs="*", default=["."],
+                        help="Directories to search (default: current directory)")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="sqlite",
+                        help="Output format (default: sqlite)")
+    parser.add_argument("--output", help="Output file (sqlite) or directory (csv/parquet)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Parser processes (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--flush-rows", type=int, default=DEFAULT_FLUSH_ROWS,
+                        help=f"Rows buffered per table before writing (default: {DEFAULT_FLUSH_ROWS})")
+    parser.add_argument("--log-level", choices=list(LOG_LEVELS), default="WARNING",
+                        help="Lowest log record level to keep from logs/ (default: WARNING)")
+    args = parser.parse_args()
+
+    setupLogging()
+    logger = logging.getLogger(__name__)
+
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output = args.output or (f"{getScriptName()}_{ts}.db" if args.format == "sqlite"
+                             else f"{getScriptName()}_{ts}")
+
+    files = discover_files(args.roots)
+    if not files:
+        print("No precheck_/postcheck_ or logs/ files found.")
+        return 1
+
+    checks = sum(1 for f in files if f[1] == "check")
+    print(f"\n{'='*60}")
+    print(f"Batch parse: {checks} command output files, {len(files) - checks} log files")
+    print(f"  Workers: {args.workers}   Format: {args.format}   Output: {output}")
+    print(f"{'='*60}")
+
+    start = time.perf_counter()
+    writer = WRITERS[args.format](output)
+    try:
+        counts = run_batch(files, writer, workers=args.workers, flush_rows=args.flush_rows,
+                           min_level=LOG_LEVELS[args.log_level], logger=logger)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"\nSUMMARY ({elapsed:.1f}s, {len(files) / max(elapsed, 1e-9):.0f} files/s)")
+    for table, n in counts.items():
+        print(f"  {table:<14} {n:>10} rows")
+    print(f"  Output: {output}")
+    logger.info(f"Batch parse complete: {counts} -> {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
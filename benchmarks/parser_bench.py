@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+parser_bench.py - Regression and throughput benchmark for the show-output parsers
+
+Two checks per parser:
+
+  golden     parse benchmarks/golden/<name>.txt and compare with the saved
+             <name>.json.  Any difference means a behaviour change.
+  throughput parse synthetic output scaled to 10k / 100k lines and report
+             lines/s, MB/s and peak memory (tracemalloc), then compare
+             lines/s against benchmarks/baseline.json.
+
+Usage:
+    python benchmarks/parser_bench.py                      # golden + 10k/100k
+    python benchmarks/parser_bench.py --sizes 10000 --only interface_status
+    python benchmarks/parser_bench.py --save-baseline      # record this machine
+    python benchmarks/parser_bench.py --update-golden      # accept new outputs
+    python benchmarks/parser_bench.py --write-corpus out/  # dump synthetic files
+
+Exit status is 1 if a golden comparison fails or a parser is more than
+--tolerance slower than the baseline.
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import parsers  # noqa: E402
+
+GOLDEN_DIR = os.path.join(HERE, "golden")
+BASELINE_FILE = os.path.join(HERE, "baseline.json")
+DEFAULT_SIZES = [10000, 100000]
+DEVICE = "bench-sw01"
+
+
+# ====================================================================
+# Parser targets
+# ====================================================================
+
+def _cdp_neighbors(text):
+    return [dataclasses.asdict(n) for n in parsers.parse_cdp_neighbors(text, DEVICE)]
+
+
+def _mac_regex(text):
+    return [list(m.groups()) for m in map(parsers.MAC_TABLE_RE.search, text.splitlines()) if m]
+
+
+def _arp_regex(text):
+    return [list(m.groups()) for m in map(parsers.ARP_RE.search, text.splitlines()) if m]
+
+
+TARGETS = {
+    "cdp_neighbors": _cdp_neighbors,
+    "nxos_transceiver": lambda text: parsers.parse_nxos_transceiver(text, DEVICE),
+    "ios_transceiver": lambda text: parsers.parse_ios_transceiver(text, DEVICE),
+    "interface_status": parsers.parse_interface_status,
+    "interface_description": lambda text: list(parsers.parse_interface_description(text)),
+    "portchannel_summary": parsers.parse_portchannel_summary,
+    "running_config": parsers.parse_running_config,
+    "mac_table_regex": _mac_regex,
+    "arp_regex": _arp_regex,
+}
+
+
+# ====================================================================
+# Synthetic output generators (deterministic for a given size)
+# ====================================================================
+
+def _port(i):
+    """Spread ports over native slots and FEX three-tuples."""
+    if i % 3 == 0:
+        return f"Eth{101 + (i // 48) % 20}/1/{i % 48 + 1}"
+    return f"Eth{i // 48 % 8 + 1}/{i % 48 + 1}"
+
+
+def _mac(i):
+    h = f"{(0x00aa00000000 + i):012x}"
+    return f"{h[0:4]}.{h[4:8]}.{h[8:12]}"
+
+
+def gen_cdp_neighbors(lines):
+    blocks = []
+    i = count = 0
+    while count < lines:
+        blocks.append(
+            "----------------------------------------\n"
+            f"Device ID:access-{i:05d}.corp.example.com\n"
+            "System Name: access\n\n"
+            "Interface address(es):\n"
+            f"    IPv4 Address: 10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}\n"
+            "Platform: N9K-C93180YC-EX, Capabilities: Router Switch IGMP Filtering Supports-STP-Dispute\n"
+            f"Interface: {_port(i)}, Port ID (outgoing port): Ethernet1/{i % 54 + 1}\n"
+            "Holdtime: 179 sec\n\n"
+            "Version:\nCisco Nexus Operating System (NX-OS) Software, Version 9.3(8)\n\n"
+            "Advertisement Version: 2\n"
+        )
+        count += blocks[-1].count("\n")
+        i += 1
+    return "".join(blocks)
+
+
+def gen_nxos_transceiver(lines):
+    out = []
+    i = 0
+    while len(out) < lines:
+        out += [
+            f"Ethernet{i // 48 % 8 + 1}/{i % 48 + 1}",
+            "    transceiver is present",
+            "    type is 10Gbase-SR",
+            "    name is CISCO-FINISAR",
+            "    part number is FTLX8574D3BCL-C2",
+            "    revision is A",
+            f"    serial number is FNS{i:08d}",
+            "    nominal bitrate is 10300 MBit/sec",
+            "    cisco id is 3",
+            "    cisco extended id number is 4",
+            "    cisco part number is 10-2415-03",
+            "    cisco product id is SFP-10G-SR",
+            "    cisco version id is V03",
+            "",
+        ]
+        i += 1
+    return "\n".join(out) + "\n"
+
+
+def gen_ios_transceiver(lines):
+    out = []
+    i = 0
+    while len(out) < lines:
+        out += [
+            f"TenGigabitEthernet1/0/{i % 48 + 1}",
+            "    Transceiver Type: SFP-10GBase-SR",
+            "    Vendor Name: CISCO-AVAGO",
+            "    Part Number: SFBR-709SMZ-CS1",
+            "    Product ID: SFP-10G-SR",
+            f"    Serial Number: AVD{i:08d}",
+            "",
+        ]
+        i += 1
+    return "\n".join(out) + "\n"
+
+
+def gen_interface_status(lines):
+    out = [
+        "",
+        "--------------------------------------------------------------------------------",
+        "Port          Name               Status    Vlan      Duplex  Speed   Type",
+        "--------------------------------------------------------------------------------",
+    ]
+    for i in range(lines - len(out)):
+        status = "connected" if i % 4 else "notconnec"
+        out.append(f"{_port(i):<14}{'srv-' + str(i):<19}{status:<10}{i % 4000 + 1:<10}"
+                   f"{'full':<8}{'10G':<8}10Gbase-SR")
+    return "\n".join(out) + "\n"
+
+
+def gen_interface_description(lines):
+    out = [
+        "",
+        "-------------------------------------------------------------------------------",
+        "Port          Type   Speed   Description",
+        "-------------------------------------------------------------------------------",
+    ]
+    for i in range(lines - len(out)):
+        out.append(f"{_port(i):<14}{'eth':<7}{'10G':<8}server-{i:06d} rack {i % 40} U{i % 42}")
+    return "\n".join(out) + "\n"
+
+
+def gen_portchannel_summary(lines):
+    out = [
+        "Flags:  D - Down        P - Up in port-channel (members)",
+        "        I - Individual  H - Hot-standby (LACP only)",
+        "--------------------------------------------------------------------------------",
+        "Group Port-       Type     Protocol  Member Ports",
+        "      Channel",
+        "--------------------------------------------------------------------------------",
+    ]
+    i = 0
+    while len(out) < lines:
+        a, b, c, d = (_port(4 * i + k) for k in range(4))
+        out.append(f"{i + 1:<6}Po{i + 1}(SU)     Eth      LACP      {a}(P)    {b}(P)")
+        out.append(f"                                     {c}(P)    {d}(D)")
+        i += 1
+    return "\n".join(out) + "\n"
+
+
+def gen_running_config(lines):
+    out = ["!Command: show running-config", "version 9.3(8) Bios:version 05.45", "hostname bench-sw01", ""]
+    i = 0
+    while len(out) < lines:
+        out += [
+            f"interface {_port(i).replace('Eth', 'Ethernet')}",
+            f"  description server-{i:06d}",
+            "  switchport",
+            "  switchport mode trunk",
+            f"  switchport trunk allowed vlan {i % 4000 + 1},{(i + 7) % 4000 + 1}",
+            "  spanning-tree port type edge trunk",
+            "  no shutdown",
+            "",
+        ]
+        i += 1
+    out += ["line console", "line vty"]
+    return "\n".join(out) + "\n"
+
+
+def gen_mac_table(lines):
+    out = [
+        "Legend:",
+        "        * - primary entry, G - Gateway MAC, (R) - Routed MAC, O - Overlay MAC",
+        "   VLAN     MAC Address      Type      age     Secure NTFY Ports",
+        "---------+-----------------+--------+---------+------+----+------------------",
+    ]
+    for i in range(lines - len(out)):
+        kind = "dynamic" if i % 10 else "static"
+        out.append(f"*  {i % 4000 + 1:<7} {_mac(i)}   {kind:<8}  0         F      F    {_port(i)}")
+    return "\n".join(out) + "\n"
+
+
+def gen_arp(lines):
+    out = [
+        "Flags: * - Adjacencies learnt on non-active FHRP router",
+        "",
+        "IP ARP Table for context default",
+        f"Total number of entries: {lines}",
+        "Address         Age       MAC Address     Interface       Flags",
+    ]
+    for i in range(lines - len(out)):
+        out.append(f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256:<10} 00:0{i % 10}:{i % 60:02d}  "
+                   f"{_mac(i)}  Vlan{i % 4000 + 1}")
+    return "\n".join(out) + "\n"
+
+
+GENERATORS = {
+    "cdp_neighbors": gen_cdp_neighbors,
+    "nxos_transceiver": gen_nxos_transceiver,
+    "ios_transceiver": gen_ios_transceiver,
+    "interface_status": gen_interface_status,
+    "interface_description": gen_interface_description,
+    "portchannel_summary": gen_portchannel_summary,
+    "running_config": gen_running_config,
+    "mac_table_regex": gen_mac_table,
+    "arp_regex": gen_arp,
+}
+
+
+# ====================================================================
+# Checks
+# ====================================================================
+
+def _normalize(result):
+    """JSON round-trip so tuples/lists and dict ordering compare equal."""
+    return json.loads(json.dumps(result, sort_keys=True))
+
+
+def check_golden(name, update=False):
+    """Return (status, detail) for one parser's golden corpus."""
+    txt = os.path.join(GOLDEN_DIR, f"{name}.txt")
+    expected_file = os.path.join(GOLDEN_DIR, f"{name}.json")
+    if not os.path.exists(txt):
+        return "MISSING", f"no corpus {txt}"
+    with open(txt) as f:
+        actual = _normalize(TARGETS[name](f.read()))
+
+    if update or not os.path.exists(expected_file):
+        with open(expected_file, "w") as f:
+            json.dump(actual, f, indent=2, sort_keys=True)
+            f.write("\n")
+        return "UPDATED", expected_file
+
+    with open(expected_file) as f:
+        expected = json.load(f)
+    if actual == expected:
+        return "PASS", ""
+    return "FAIL", f"output differs from {os.path.basename(expected_file)}"
+
+
+def measure(name, text, repeat=5):
+    """Best-of-*repeat* wall time, then one tracemalloc run for peak memory."""
+    func = TARGETS[name]
+    nlines = text.count("\n")
+    nbytes = len(text.encode())
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "lines": nlines,
+        "bytes": nbytes,
+        "seconds": best,
+        "lines_per_s": nlines / best if best else 0.0,
+        "mb_per_s": nbytes / best / 1e6 if best else 0.0,
+        "peak_mb": peak / 1e6,
+    }
+
+
+def load_baseline():
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE) as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(results):
+    with open(BASELINE_FILE, "w") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "machine": platform.node(),
+            "saved": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "results": results,
+        }, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+# ====================================================================
+# Main
+# ====================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Golden-corpus regression and throughput benchmark for the show-output parsers.")
+    parser.add_argument("--only", action="append", choices=sorted(TARGETS),
+                        help="Run only this parser (repeatable)")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated synthetic input sizes in lines (default: 10000,100000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions, best is kept (default: 5)")
+    parser.add_argument("--tolerance", type=float, default=0.20,
+                        help="Allowed slowdown vs baseline before failing (default: 0.20 = 20%%)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Write results to {os.path.relpath(BASELINE_FILE)}")
+    parser.add_argument("--update-golden", action="store_true", help="Overwrite golden .json files with current output")
+    parser.add_argument("--skip-golden", action="store_true", help="Only run the throughput benchmark")
+    parser.add_argument("--write-corpus", metavar="DIR", help="Write the synthetic inputs to DIR and exit")
+    args = parser.parse_args()
+
+    names = args.only or list(TARGETS)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    if args.write_corpus:
+        os.makedirs(args.write_corpus, exist_ok=True)
+        for name in names:
+            for size in sizes:
+                path = os.path.join(args.write_corpus, f"{name}_{size}.txt")
+                with open(path, "w") as f:
+                    f.write(GENERATORS[name](size))
+                print(f"  wrote {path}")
+        return 0
+
+    failed = False
+    available = {}
+
+    if not args.skip_golden:
+        print(f"\n{'='*78}\nGolden corpora\n{'='*78}")
+        for name in names:
+            try:
+                status, detail = check_golden(name, update=args.update_golden)
+            except ImportError as e:
+                status, detail = "SKIP", f"missing dependency: {e}"
+            available[name] = status != "SKIP"
+            failed |= status in ("FAIL", "MISSING")
+            print(f"  {name:<24} {status:<8} {detail}")
+
+    baseline = load_baseline()
+    results = {}
+    print(f"\n{'='*78}\nThroughput\n{'='*78}")
+    print(f"  {'parser':<24}{'lines':>8}{'lines/s':>13}{'MB/s':>9}{'peak MB':>10}{'vs base':>10}")
+    for name in names:
+        if available.get(name) is False:
+            continue
+        for size in sizes:
+            text = GENERATORS[name](size)
+            try:
+                r = measure(name, text, repeat=args.repeat)
+            except ImportError as e:
+                print(f"  {name:<24} SKIP  missing dependency: {e}")
+                break
+            key = f"{name}@{size}"
+            results[key] = r
+
+            delta = ""
+            base = baseline.get(key)
+            if base and base.get("lines_per_s"):
+                change = r["lines_per_s"] / base["lines_per_s"] - 1
+                delta = f"{change:+.0%}"
+                if change < -args.tolerance:
+                    delta += " !!"
+                    failed = True
+            print(f"  {name:<24}{r['lines']:>8}{r['lines_per_s']:>13,.0f}"
+                  f"{r['mb_per_s']:>9.1f}{r['peak_mb']:>10.1f}{delta:>10}")
+
+    if args.save_baseline:
+        save_baseline(results)
+        print(f"\nBaseline saved to {BASELINE_FILE}")
+
+    print(f"\n{'FAILED' if failed else 'OK'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,24 +9,22 @@ Requirements:
     pip install netmiko networkx matplotlib
 """
 
-import re
 import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Optional
 from netmiko import ConnectHandler, NetmikoTimeoutException, NetmikoAuthenticationException
 import networkx as nx
 import matplotlib.pyplot as plt
+from parsers import CDPNeighbor, parse_cdp_neighbors
+from topology_render import (ROLE_COLORS, assign_roles, export_graphml, export_html,
+                             export_json, load_layout_cache, role_layout, save_layout_cache)
+from topology_query import Topology
+from topology_store import TopologyStore
 
-
-@dataclass
-class CDPNeighbor:
-    """Represents a CDP neighbor entry."""
-    local_device: str
-    local_port: str
-    remote_device: str
-    remote_port: str
-    platform: str
-    ip_address: Optional[str] = None
+MAX_WORKERS = 20  # concurrent SSH sessions per discovery level
+PNG_MAX_NODES = 500  # beyond this a static image is unreadable
 
 
 @dataclass
@@ -39,67 +37,11 @@ class Device:
     password: str
 
 
-def parse_cdp_neighbors(output: str, local_device: str) -> list[CDPNeighbor]:
+def get_cdp_neighbors(device: Device) -> Optional[list[CDPNeighbor]]:
     """
-    Parse 'show cdp neighbors detail' output from NX-OS or IOS-XE.
-    Returns a list of CDPNeighbor objects.
+    Connect to a device and retrieve CDP neighbor information.
+    Returns None if the device could not be queried.
     """
-    neighbors = []
-    
-    # Split output into neighbor blocks
-    blocks = re.split(r'-{5,}', output)
-    
-    for block in blocks:
-        if not block.strip():
-            continue
-            
-        # Extract device ID (hostname)
-        device_match = re.search(
-            r'Device ID[:\s]+([^\s\n]+)', block, re.IGNORECASE
-        )
-        if not device_match:
-            continue
-        remote_device = device_match.group(1).split('.')[0]  # Remove domain
-        
-        # Extract IP address
-        ip_match = re.search(
-            r'(?:IP address|IPv4 Address)[:\s]+(\d+\.\d+\.\d+\.\d+)', 
-            block, re.IGNORECASE
-        )
-        ip_address = ip_match.group(1) if ip_match else None
-        
-        # Extract platform
-        platform_match = re.search(
-            r'Platform[:\s]+([^,\n]+)', block, re.IGNORECASE
-        )
-        platform = platform_match.group(1).strip() if platform_match else "Unknown"
-        
-        # Extract local interface
-        local_port_match = re.search(
-            r'Interface[:\s]+([^\s,\n]+)', block, re.IGNORECASE
-        )
-        local_port = local_port_match.group(1) if local_port_match else "Unknown"
-        
-        # Extract remote port
-        remote_port_match = re.search(
-            r'Port ID \(outgoing port\)[:\s]+([^\s\n]+)', block, re.IGNORECASE
-        )
-        remote_port = remote_port_match.group(1) if remote_port_match else "Unknown"
-        
-        neighbors.append(CDPNeighbor(
-            local_device=local_device,
-            local_port=local_port,
-            remote_device=remote_device,
-            remote_port=remote_port,
-            platform=platform,
-            ip_address=ip_address
-        ))
-    
-    return neighbors
-
-
-def get_cdp_neighbors(device: Device) -> list[CDPNeighbor]:
-    """Connect to a device and retrieve CDP neighbor information."""
     connection_params = {
         'device_type': device.device_type,
         'host': device.ip,
@@ -116,13 +58,13 @@ def get_cdp_neighbors(device: Device) -> list[CDPNeighbor]:
             return neighbors
     except NetmikoTimeoutException:
         print(f"  ERROR: Timeout connecting to {device.hostname}")
-        return []
+        return None
     except NetmikoAuthenticationException:
         print(f"  ERROR: Authentication failed for {device.hostname}")
-        return []
+        return None
     except Exception as e:
         print(f"  ERROR: {e}")
-        return []
+        return None
 
 
 def guess_device_type(platform: str) -> str:
@@ -148,158 +90,188 @@ def recursive_cdp_discovery(
     seed_devices: list[Device],
     max_depth: int,
     username: str,
-    password: str
+    password: str,
+    workers: int = MAX_WORKERS,
+    store: Optional[TopologyStore] = None
 ) -> list[CDPNeighbor]:
     """
     Recursively discover CDP neighbors up to max_depth hops.
-    
+
+    Discovery is level-synchronous: every device at depth N is queried in
+    parallel (up to `workers` SSH sessions), then their neighbors form the
+    depth N+1 frontier.  Run time grows with the network diameter rather
+    than the device count.  Devices are claimed in the visited sets when
+    they are queued, by the coordinating thread only, so a device reachable
+    from several parents is queried once.
+
+    With a `store`, every device from earlier runs is re-polled in the
+    first level (at its stored depth) and only devices whose CDP neighbor
+    table hash changed, or that are new, have their neighbors expanded.
+    An unchanged device still queues neighbors that are not in the store
+    yet (unreachable on an earlier run, or beyond an earlier depth limit).
+    Results are merged into the store as they arrive.
+
     Args:
         seed_devices: Initial devices to start discovery from
         max_depth: Maximum number of hops to traverse (0 = unlimited)
         username: SSH username for discovered devices
         password: SSH password for discovered devices
-    
+        workers: Maximum concurrent SSH sessions
+        store: Optional persistent topology for incremental re-discovery
+
     Returns:
-        List of all discovered CDP neighbor relationships
+        List of all CDP neighbor relationships reported during this run
     """
     all_neighbors: list[CDPNeighbor] = []
     visited_ips: set[str] = set()
     visited_hostnames: set[str] = set()
-    
-    # Queue: (device, current_depth)
-    queue: list[tuple[Device, int]] = [(d, 1) for d in seed_devices]
-    
-    while queue:
-        device, depth = queue.pop(0)
-        
-        # Skip if already visited
+    counts = {'queried': 0, 'changed': 0, 'new': 0, 'failed': 0}
+
+    def claim(device: Device) -> bool:
+        """Mark a device visited; False if its IP or hostname was already seen."""
         if device.ip in visited_ips or device.hostname.lower() in visited_hostnames:
-            continue
-        
+            return False
         visited_ips.add(device.ip)
         visited_hostnames.add(device.hostname.lower())
-        
-        print(f"[Depth {depth}] ", end="")
-        neighbors = get_cdp_neighbors(device)
-        all_neighbors.extend(neighbors)
-        
-        # If we haven't reached max depth, queue discovered neighbors
-        if max_depth == 0 or depth < max_depth:
-            for neighbor in neighbors:
-                # Skip if no IP or already visited
-                if not neighbor.ip_address:
-                    print(f"    Skipping {neighbor.remote_device}: No IP address in CDP")
-                    continue
-                if neighbor.ip_address in visited_ips:
-                    continue
-                if neighbor.remote_device.lower() in visited_hostnames:
+        return True
+
+    # Frontier entries carry their own depth so stored devices keep theirs
+    frontier = [(d, 1) for d in seed_devices if claim(d)]
+    if store is not None:
+        known = [
+            (Device(hostname=h, ip=ip, device_type=t, username=username, password=password), d)
+            for h, ip, t, d in store.known_devices()
+        ]
+        frontier += [(dev, d) for dev, d in known if claim(dev)]
+        print(f"Re-polling {len(known)} stored device(s) from {store.db_file}")
+        run_id = store.start_run()
+    level = 1
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while frontier:
+            print(f"\n[Level {level}] Querying {len(frontier)} device(s)...")
+            # map() keeps frontier order, so output and queueing are deterministic
+            results = executor.map(get_cdp_neighbors, (dev for dev, _ in frontier))
+
+            next_frontier: list[tuple[Device, int]] = []
+            for (device, depth), neighbors in zip(frontier, results):
+                counts['queried'] += 1
+                if neighbors is None:
+                    counts['failed'] += 1
+                    continue    # stored links of an unreachable device are kept
+                all_neighbors.extend(neighbors)
+
+                unchanged = False
+                if store is not None:
+                    is_new = store.device_hash(device.hostname) is None
+                    unchanged = not store.save_device(device, neighbors, depth)
+                    if not unchanged:
+                        counts['new' if is_new else 'changed'] += 1
+
+                # If we've reached max depth, don't queue this device's neighbors
+                if max_depth != 0 and depth >= max_depth:
                     continue
-                
-                # Create device entry for discovered neighbor
-                guessed_type = guess_device_type(neighbor.platform)
-                new_device = Device(
-                    hostname=neighbor.remote_device,
-                    ip=neighbor.ip_address,
-                    device_type=guessed_type,
-                    username=username,
-                    password=password
-                )
-                queue.append((new_device, depth + 1))
-                print(f"    Queued {neighbor.remote_device} ({neighbor.ip_address}) as {guessed_type}")
-    
+                for neighbor in neighbors:
+                    # Unchanged table: its stored neighbors are re-polled anyway, so only
+                    # queue ones never stored (unreachable before, or past an earlier -l)
+                    if unchanged and store.device_hash(neighbor.remote_device) is not None:
+                        continue
+                    if not neighbor.ip_address:
+                        print(f"    Skipping {neighbor.remote_device}: No IP address in CDP")
+                        continue
+
+                    # Create device entry for discovered neighbor
+                    guessed_type = guess_device_type(neighbor.platform)
+                    new_device = Device(
+                        hostname=neighbor.remote_device,
+                        ip=neighbor.ip_address,
+                        device_type=guessed_type,
+                        username=username,
+                        password=password
+                    )
+                    if not claim(new_device):
+                        continue
+                    next_frontier.append((new_device, depth + 1))
+                    print(f"    Queued {neighbor.remote_device} ({neighbor.ip_address}) as {guessed_type}")
+
+            frontier = next_frontier
+            level += 1
+
+    if store is not None:
+        store.finish_run(run_id, **counts)
+        print(f"\nIncremental run: {counts['queried']} queried, {counts['new']} new, "
+              f"{counts['changed']} changed, {counts['failed']} unreachable")
     return all_neighbors
 
 
 def build_topology_graph(all_neighbors: list[CDPNeighbor]) -> nx.Graph:
-    """Build a NetworkX graph from CDP neighbor data."""
-    G = nx.Graph()
-    
-    # Track unique devices and their platforms
-    device_platforms = {}
-    
-    for neighbor in all_neighbors:
-        device_platforms[neighbor.local_device] = "Queried Device"
-        if neighbor.remote_device not in device_platforms:
-            device_platforms[neighbor.remote_device] = neighbor.platform
-    
-    # Add nodes
-    for device, platform in device_platforms.items():
-        G.add_node(device, platform=platform)
-    
-    # Add edges (links between devices)
-    for neighbor in all_neighbors:
-        edge_label = f"{neighbor.local_port} <-> {neighbor.remote_port}"
-        
-        # Check if edge already exists (avoid duplicates)
-        if G.has_edge(neighbor.local_device, neighbor.remote_device):
-            # Append to existing label if different ports
-            existing = G[neighbor.local_device][neighbor.remote_device].get('label', '')
-            if edge_label not in existing:
-                G[neighbor.local_device][neighbor.remote_device]['label'] = \
-                    f"{existing}\n{edge_label}"
-        else:
-            G.add_edge(
-                neighbor.local_device, 
-                neighbor.remote_device,
-                label=edge_label
-            )
-    
-    return G
+    """
+    Build a NetworkX graph from CDP neighbor data: one edge per device pair,
+    its links listed in the 'label'.  A link reported from both ends appears
+    once.  See topology_query.Topology for the link-level model.
+    """
+    return Topology.from_neighbors(all_neighbors).simple_graph()
 
 
-def draw_topology(G: nx.Graph, output_file: str = "network_topology.png"):
-    """Draw the network topology and save to file."""
+def draw_topology(G: nx.Graph, output_file: str = "network_topology.png", pos: dict = None):
+    """
+    Draw the network topology and save to file.
+    Uses the tiered role layout (see topology_render) unless `pos` is given.
+    Graphs above PNG_MAX_NODES are skipped; use the HTML view for those.
+    """
     if len(G.nodes()) == 0:
         print("No topology data to draw.")
         return
+    if len(G.nodes()) > PNG_MAX_NODES:
+        print(f"\nSkipping {output_file}: {len(G.nodes())} devices is too many for a static image "
+              f"(limit {PNG_MAX_NODES}); use --html")
+        return
     
-    plt.figure(figsize=(14, 10))
+    if pos is None:
+        pos = role_layout(G)
+    roles = assign_roles(G)
     
-    # Use spring layout for automatic positioning
-    pos = nx.spring_layout(G, k=2, iterations=50, seed=42)
+    # Size the figure to the layout so wide tiers stay legible
+    xs = [x for x, _ in pos.values()]
+    ys = [y for _, y in pos.values()]
+    width = min(60, max(14, (max(xs) - min(xs)) * 0.6))
+    height = min(40, max(10, (max(ys) - min(ys)) * 0.6))
+    plt.figure(figsize=(width, height))
     
-    # Color nodes based on platform type
-    node_colors = []
-    for node in G.nodes():
-        platform = G.nodes[node].get('platform', '').lower()
-        if 'nexus' in platform or 'nxos' in platform:
-            node_colors.append('#00BCEB')  # Cisco blue for Nexus
-        elif 'switch' in platform or 'catalyst' in platform:
-            node_colors.append('#6CC24A')  # Green for switches
-        elif 'router' in platform or 'isr' in platform or 'asr' in platform:
-            node_colors.append('#FF6B6B')  # Red for routers
-        else:
-            node_colors.append('#9E9E9E')  # Gray for unknown
+    # Color nodes by inferred role
+    node_colors = [ROLE_COLORS[roles[node]] for node in G.nodes()]
+    small = len(G.nodes()) <= 100
     
     # Draw the graph
     nx.draw_networkx_nodes(
         G, pos, 
         node_color=node_colors,
-        node_size=2000,
+        node_size=2000 if small else 300,
         alpha=0.9
     )
     
     nx.draw_networkx_labels(
         G, pos,
-        font_size=9,
+        font_size=9 if small else 6,
         font_weight='bold'
     )
     
     nx.draw_networkx_edges(
         G, pos,
         edge_color='#666666',
-        width=2,
+        width=2 if small else 0.8,
         alpha=0.7
     )
     
-    # Draw edge labels (interface connections)
-    edge_labels = nx.get_edge_attributes(G, 'label')
-    nx.draw_networkx_edge_labels(
-        G, pos,
-        edge_labels=edge_labels,
-        font_size=7,
-        alpha=0.8
-    )
+    # Draw edge labels (interface connections) only while they can be read
+    if small:
+        edge_labels = nx.get_edge_attributes(G, 'label')
+        nx.draw_networkx_edge_labels(
+            G, pos,
+            edge_labels=edge_labels,
+            font_size=7,
+            alpha=0.8
+        )
     
     plt.title("Network Topology (CDP Discovery)", fontsize=14, fontweight='bold')
     plt.axis('off')
@@ -362,6 +334,26 @@ def main():
         default=1,
         help='Max discovery depth/hops (default: 1, use 0 for unlimited)'
     )
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=MAX_WORKERS,
+        help=f'Concurrent SSH sessions per discovery level (default: {MAX_WORKERS})'
+    )
+    parser.add_argument(
+        '-s', '--store',
+        metavar='DB',
+        help='SQLite topology store: re-poll known devices, expand only changed/new ones, '
+             'and draw the merged topology'
+    )
+    parser.add_argument('--html', metavar='FILE', help='Write an interactive HTML view')
+    parser.add_argument('--graphml', metavar='FILE', help='Export the topology as GraphML')
+    parser.add_argument('--json', metavar='FILE', help='Export the topology as node-link JSON')
+    parser.add_argument(
+        '--layout-cache',
+        metavar='FILE',
+        help='Layout coordinates reused between runs (default: <output>.layout.json)'
+    )
     
     args = parser.parse_args()
     
@@ -382,7 +374,8 @@ def main():
                 password=args.password
             ))
     
-    if not devices:
+    store = TopologyStore(args.store) if args.store else None
+    if not devices and not (store and store.known_devices()):
         print("No devices specified. Use -f or -d to specify devices.")
         parser.print_help()
         return
@@ -395,16 +388,39 @@ def main():
         seed_devices=devices,
         max_depth=args.layers,
         username=args.username,
-        password=args.password
+        password=args.password,
+        workers=args.workers,
+        store=store
     )
     
     print(f"\nTotal CDP neighbor relationships discovered: {len(all_neighbors)}")
+    if store:
+        # Draw everything known, including links of devices unreachable this run
+        all_neighbors = store.all_neighbors()
+        store.close()
+        print(f"Stored topology: {len(all_neighbors)} CDP neighbor relationships")
     
-    # Build and draw topology
+    # Build, lay out and draw topology
     G = build_topology_graph(all_neighbors)
     print(f"Topology contains {len(G.nodes())} devices and {len(G.edges())} links")
     
-    draw_topology(G, args.output)
+    layout_cache = args.layout_cache or f"{os.path.splitext(args.output)[0]}.layout.json"
+    cached = load_layout_cache(layout_cache)
+    pos = role_layout(G, cached)
+    save_layout_cache(layout_cache, pos)
+    print(f"Layout: {sum(1 for n in G if n in cached)} cached, "
+          f"{sum(1 for n in G if n not in cached)} placed ({layout_cache})")
+    
+    draw_topology(G, args.output, pos)
+    if args.html:
+        export_html(G, pos, args.html)
+        print(f"Interactive view saved to: {args.html}")
+    if args.graphml:
+        export_graphml(G, pos, args.graphml)
+        print(f"GraphML saved to: {args.graphml}")
+    if args.json:
+        export_json(G, pos, args.json)
+        print(f"JSON saved to: {args.json}")
 
 
 if __name__ == '__main__':
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
-import csv, ipaddress, sys
+import csv, sys
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import dns.resolver, dns.reversename
+import dns.resolver
+from dns_cache import DEFAULT_DB, CachedResolver, ptr_name
 
 INPUT = "combinedSD.csv"
 OUTPUT = "combinedSD_with_lookup.csv"
@@ -9,38 +10,31 @@ OUTPUT = "combinedSD_with_lookup.csv"
 DNS_SERVERS = ["8.8.8.8"]  # your resolver(s)
 TIMEOUT = 2.0              # per query
 MAX_WORKERS = 32
+CACHE_DB = DEFAULT_DB      # shared answer cache (dns_cache.py)
 
 resolver = dns.resolver.Resolver(configure=False)
 resolver.nameservers = DNS_SERVERS
 resolver.timeout = TIMEOUT
 resolver.lifetime = TIMEOUT
 
-def resolve_one(addr: str) -> str:
+def resolve_one(cached: CachedResolver, addr: str) -> str:
     addr = addr.strip()
     if not addr or addr.startswith("#"):
         return ""
     try:
         # IP -> PTR
-        ipaddress.ip_address(addr)
-        rev = dns.reversename.from_address(addr)
-        ans = resolver.resolve(rev, "PTR", raise_on_no_answer=False)
-        names = []
-        if ans.rrset:
-            for r in ans:
-                names.append(str(r.target).rstrip("."))
-        return " ".join(sorted(set(names))) if names else "NOT_FOUND"
+        rev = ptr_name(addr)
     except ValueError:
         # Hostname -> A/AAAA
         addrs = set()
         for rrtype in ("A", "AAAA"):
-            try:
-                ans = resolver.resolve(addr, rrtype, raise_on_no_answer=False)
-                if ans.rrset:
-                    for r in ans:
-                        addrs.add(r.address)
-            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.resolver.Timeout):
-                pass
+            ans = cached.lookup(addr, rrtype)
+            if ans:
+                addrs.update(ans.answers)
         return " ".join(sorted(addrs)) if addrs else "NOT_FOUND"
+    ans = cached.lookup(rev, "PTR")
+    names = ans.answers if ans else ()
+    return " ".join(sorted(set(names))) if names else "NOT_FOUND"
 
 def main():
     rows = []
@@ -50,8 +44,9 @@ def main():
     addrs = [line.split(",")[0].strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
 
     results = {}
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
-        futs = {ex.submit(resolve_one, a): a for a in addrs}
+    with CachedResolver(resolver=resolver, timeout=TIMEOUT, db_file=CACHE_DB) as cached, \
+            ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        futs = {ex.submit(resolve_one, cached, a): a for a in addrs}
         for fut in as_completed(futs):
             a = futs[fut]
             try:
@@ -65,6 +60,7 @@ def main():
             w.writerow([a, results.get(a, "NOT_FOUND")])
 
     print(f"Results -> {OUTPUT}")
+    print(cached.cache.summary())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+dns_cache.py - Shared persistent DNS cache for forward and PTR lookups
+
+The lookup tools in this repo (dns_lookup*.py, mac_discovery,
+checkDNSparallel, resolveIT, ping_devices) resolve the same names and
+addresses run after run.  They all keep their answers in one SQLite
+file, so a run only asks DNS about names whose TTL has expired:
+
+  * positive answers are kept for the record TTL (capped at MAX_TTL)
+  * NXDOMAIN / NODATA are kept for the SOA minimum of the negative
+    response (RFC 2308, capped at MAX_NEGATIVE_TTL), so dead addresses
+    are not re-queried on every run
+  * timeouts and server failures are never cached
+  * answers are kept per resolver view (the servers asked, plus search
+    domains for forward lookups), so a tool asking 8.8.8.8 never gets
+    the internal servers' answers and vice versa
+  * concurrent lookups of the same name share one query: CachedResolver
+    does this for threads, dns_engine.AsyncResolver for asyncio
+  * hit / negative / shared / queried counters for each tool's summary
+    (DnsCache.summary)
+
+Usage:
+    from dns_cache import CachedResolver, resolve_many
+
+    names = resolve_many(["10.1.1.10", "10.1.1.11"])   # {ip: hostname or 'N/A'}
+
+    with CachedResolver() as resolver:
+        resolver.gethostbyname("core1.example.com")    # '10.1.1.1' or None
+        resolver.gethostbyaddr("10.1.1.10")            # 'host.example.com' or None
+        print(resolver.cache.summary())
+
+Uses dnspython when installed (record and SOA TTLs are honoured);
+otherwise falls back to the socket module with DEFAULT_TTL and
+DEFAULT_NEGATIVE_TTL.
+"""
+
+import ipaddress
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import dns.exception
+    import dns.name
+    import dns.rdatatype
+    import dns.resolver
+    DNSPYTHON_AVAILABLE = True
+except ImportError:
+    DNSPYTHON_AVAILABLE = False
+
+DEFAULT_DB = os.path.join(os.path.expanduser("~"), ".dns_cache.db")
+DEFAULT_TTL = 3600          # used when the answer carries no TTL
+DEFAULT_NEGATIVE_TTL = 300  # negative answer without an SOA, or from the socket module
+MAX_TTL = 86400
+MAX_NEGATIVE_TTL = 10800    # RFC 2308 suggests 1-3 hours
+DEFAULT_WORKERS = 50
+DEFAULT_TIMEOUT = 3.0
+FLUSH_EVERY = 1000          # buffered writes per SQLite transaction
+NOT_FOUND = "N/A"
+
+# Answer status; the same strings as dns_engine's Lookup.status
+OK, NXDOMAIN, NODATA = "OK", "NXDOMAIN", "NODATA"
+CACHEABLE = (OK, NXDOMAIN, NODATA)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """A cacheable answer: OK with answers, or NXDOMAIN / NODATA."""
+    status: str
+    answers: tuple = ()
+    ttl: int = 0                # seconds left
+
+    @property
+    def negative(self) -> bool:
+        return self.status != OK
+
+
+def cache_key(qname: str, rdtype) -> tuple[str, str]:
+    """('host.example.com', 'A'): lower case, no trailing dot, type as text."""
+    if not isinstance(rdtype, str):
+        rdtype = dns.rdatatype.to_text(rdtype)
+    return qname.lower().rstrip("."), rdtype.upper()
+
+
+def resolver_view(servers, search=()) -> str:
+    """Stable cache view id for answers from *servers*, e.g. '10.1.1.53,10.1.2.53'.
+
+    Server order does not change the answers, search domain order can.
+    """
+    view = ",".join(sorted(servers))
+    if search:
+        view += ";search=" + ",".join(search)
+    return view
+
+
+def ptr_name(ip: str) -> str:
+    """'10.1.1.10' -> '10.1.1.10.in-addr.arpa' (ip6.arpa for IPv6)."""
+    return ipaddress.ip_address(ip).reverse_pointer
+
+
+class DnsCache:
+    """SQLite-backed answer cache keyed by (qname, rdtype, view), safe to share between threads.
+
+    Entries read or written during the run are also kept in memory; writes
+    are batched (FLUSH_EVERY) and flushed by flush() / close().
+    """
+
+    def __init__(self, db_file=DEFAULT_DB):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._mem = {}          # key -> (status, answers, expires), None if not in the db
+        self._dirty = {}
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(rr)")}
+        if columns and "view_id" not in columns:
+            self.conn.execute("DROP TABLE rr")      # answers not keyed by resolver view
+        self.conn.executescript(
+            """
+            DROP TABLE IF EXISTS ptr;   -- PTR-only layout of the first version
+            CREATE TABLE IF NOT EXISTS rr (
+                qname   TEXT NOT NULL,
+                rdtype  TEXT NOT NULL,
+                view_id TEXT NOT NULL,
+                status  TEXT NOT NULL,
+                answers TEXT NOT NULL,
+                expires REAL NOT NULL,
+                PRIMARY KEY (qname, rdtype, view_id)
+            );
+            """
+        )
+        self.conn.execute("DELETE FROM rr WHERE expires <= ?", (time.time(),))
+        self.conn.commit()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.shared = 0         # misses answered by a query already in flight
+
+    # ── Reads ───────────────────────────────────────────────
+    def _load(self, keys):
+        """Pull *keys* that are not in memory yet from SQLite (lock held)."""
+        by_type = {}
+        for key in keys:
+            if key not in self._mem:
+                by_type.setdefault(key[1:], []).append(key[0])
+                self._mem[key] = None
+        for (rdtype, view), names in by_type.items():
+            for i in range(0, len(names), 500):
+                chunk = names[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                for qname, status, answers, expires in self.conn.execute(
+                    f"SELECT qname, status, answers, expires FROM rr"
+                    f" WHERE rdtype = ? AND view_id = ? AND qname IN ({marks})",
+                    [rdtype, view, *chunk],
+                ):
+                    self._mem[(qname, rdtype, view)] = (status, tuple(answers.split()), expires)
+
+    def prefetch(self, keys, view=""):
+        """Load many (qname, rdtype) keys of *view* in a few queries; does not count as lookups."""
+        keys = [(*cache_key(*k), view) for k in keys]
+        with self._lock:
+            self._load(keys)
+
+    def get(self, qname, rdtype, view="") -> Optional[CacheEntry]:
+        """Unexpired entry for qname/rdtype from *view*, or None.  Counts a hit or a miss."""
+        key = (*cache_key(qname, rdtype), view)
+        with self._lock:
+            self._load((key,))
+            entry = self._mem[key]
+            now = time.time()
+            if entry is None or entry[2] <= now:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if entry[0] != OK:
+                self.negative_hits += 1
+        return CacheEntry(entry[0], entry[1], int(entry[2] - now))
+
+    # ── Writes ──────────────────────────────────────────────
+    def put(self, qname, rdtype, status, answers=(), ttl=0, view=""):
+        """Store an answer from *view*.  Uncacheable statuses and TTL 0 are ignored."""
+        if status not in CACHEABLE or ttl <= 0:
+            return
+        ttl = min(ttl, MAX_TTL if status == OK else MAX_NEGATIVE_TTL)
+        key = (*cache_key(qname, rdtype), view)
+        entry = (status, tuple(answers), time.time() + ttl)
+        with self._lock:
+            self._mem[key] = self._dirty[key] = entry
+            if len(self._dirty) >= FLUSH_EVERY:
+                self._flush()
+
+    def note_shared(self):
+        with self._lock:
+            self.shared += 1
+
+    def _flush(self):
+        if not self._dirty:
+            return
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO rr (qname, rdtype, view_id, status, answers, expires)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            [(q, t, v, s, " ".join(a), e) for (q, t, v), (s, a, e) in self._dirty.items()],
+        )
+        self.conn.commit()
+        self._dirty.clear()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── Stats ───────────────────────────────────────────────
+    def summary(self) -> str:
+        lookups = self.hits + self.misses
+        rate = self.hits * 100 / lookups if lookups else 0
+        return (f"DNS cache: {self.hits}/{lookups} hits ({rate:.0f}%, {self.negative_hits} negative), "
+                f"{self.shared} shared in flight, {self.misses - self.shared} queried  [{self.db_file}]")
+
+
+def open_cache(db_file=DEFAULT_DB) -> DnsCache:
+    """DnsCache on *db_file*; an in-memory one (with a warning) if the file is unusable."""
+    try:
+        return DnsCache(db_file)
+    except sqlite3.Error as e:
+        logger.warning(f"DNS cache {db_file} unavailable, caching for this run only: {e}")
+        return DnsCache(":memory:")
+
+
+# ── Lookups ─────────────────────────────────────────────────
+def negative_ttl(response) -> int:
+    """RFC 2308: min(SOA TTL, SOA MINIMUM) from a negative response's authority section."""
+    if response is not None:
+        for rrset in response.authority:
+            if rrset.rdtype == dns.rdatatype.SOA:
+                return min(rrset.ttl, rrset[0].minimum)
+    return DEFAULT_NEGATIVE_TTL
+
+
+def _address_from_ptr(qname: str) -> str:
+    labels = qname.split(".")[:-2]
+    if qname.endswith(".in-addr.arpa"):
+        return ".".join(reversed(labels))
+    nibbles = "".join(reversed(labels))
+    return str(ipaddress.IPv6Address(int(nibbles, 16)))
+
+
+def query(qname, rdtype="A", resolver=None, timeout=DEFAULT_TIMEOUT) -> Optional[CacheEntry]:
+    """Ask DNS (uncached).  Returns a CacheEntry, or None on timeout / server failure."""
+    qname, rdtype = cache_key(qname, rdtype)
+    if DNSPYTHON_AVAILABLE:
+        resolver = resolver or dns.resolver.get_default_resolver()
+        if rdtype == "PTR":
+            qname += "."        # absolute: never append search domains
+        try:
+            answer = resolver.resolve(qname, rdtype, lifetime=timeout,
+                                      raise_on_no_answer=False, search=True)
+        except dns.resolver.NXDOMAIN as e:
+            responses = e.responses().values()
+            ttl = min((negative_ttl(r) for r in responses), default=DEFAULT_NEGATIVE_TTL)
+            return CacheEntry(NXDOMAIN, (), ttl)
+        except dns.exception.DNSException as e:
+            logger.warning(f"{rdtype} lookup failed for {qname}: {e}")
+            return None
+        if answer.rrset is None:
+            return CacheEntry(NODATA, (), negative_ttl(answer.response))
+        answers = tuple(r.to_text().rstrip(".") for r in answer.rrset)
+        # expiration covers the whole CNAME chain, not just the final rrset
+        return CacheEntry(OK, answers, max(0, int(answer.expiration - time.time())))
+
+    try:
+        if rdtype == "PTR":
+            return CacheEntry(OK, (socket.gethostbyaddr(_address_from_ptr(qname))[0],), DEFAULT_TTL)
+        family = socket.AF_INET6 if rdtype == "AAAA" else socket.AF_INET
+        infos = socket.getaddrinfo(qname, None, family=family, type=socket.SOCK_STREAM)
+        return CacheEntry(OK, tuple(dict.fromkeys(i[4][0] for i in infos)), DEFAULT_TTL)
+    except socket.herror:
+        return CacheEntry(NXDOMAIN, (), DEFAULT_NEGATIVE_TTL)
+    except socket.gaierror as e:
+        if e.errno == socket.EAI_NONAME:
+            return CacheEntry(NXDOMAIN, (), DEFAULT_NEGATIVE_TTL)
+        return None
+    except (OSError, ValueError):
+        return None
+
+
+def _views(resolver):
+    """(PTR view, forward view) of answers query() gets through *resolver*.
+
+    Forward names are asked with search=True, so their view includes the
+    search list dnspython would apply; PTR names are absolute.
+    """
+    if not DNSPYTHON_AVAILABLE:
+        return "system", "system"
+    try:
+        resolver = resolver or dns.resolver.get_default_resolver()
+    except dns.resolver.NoResolverConfiguration:
+        return "system", "system"
+    servers = [ns if resolver.port == 53 else f"{ns}:{resolver.port}" for ns in resolver.nameservers]
+    search = resolver.search or [d for d in (resolver.domain,) if d and d != dns.name.root]
+    return resolver_view(servers), resolver_view(servers, [d.to_text(omit_final_dot=True) for d in search])
+
+
+def _system_lookup(qname) -> Optional[CacheEntry]:
+    """socket.gethostbyname, for names DNS does not know (hosts file, mDNS, ...)."""
+    try:
+        return CacheEntry(OK, (socket.gethostbyname(qname),), DEFAULT_TTL)
+    except OSError:
+        return None
+
+
+class CachedResolver:
+    """Thread-safe lookups through a DnsCache, one query per name in flight.
+
+    Pass *cache* to share one DnsCache between resolvers; otherwise the
+    resolver opens *db_file* itself and closes it in close().
+    *resolver* is an optional dns.resolver.Resolver (nameservers, timeouts).
+    """
+
+    def __init__(self, cache: Optional[DnsCache] = None, resolver=None,
+                 timeout=DEFAULT_TIMEOUT, db_file=DEFAULT_DB):
+        self._owns_cache = cache is None
+        self.cache = cache or open_cache(db_file)
+        self.resolver = resolver
+        self.ptr_view, self.view = _views(resolver)
+        self.timeout = timeout
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, qname, rdtype="A", fallback=None) -> Optional[CacheEntry]:
+        """Cached or fresh answer; None if DNS failed (not cached).
+
+        *fallback(qname)* is tried when DNS has no answer and may supply one.
+        """
+        key = cache_key(qname, rdtype)
+        view = self.ptr_view if key[1] == "PTR" else self.view
+        hit = self.cache.get(qname, rdtype, view)
+        if hit is not None:
+            return hit
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            self.cache.note_shared()
+            return future.result()
+        try:
+            entry = query(qname, rdtype, self.resolver, self.timeout)
+            if fallback and (entry is None or entry.negative):
+                entry = fallback(qname) or entry
+            if entry is not None:
+                self.cache.put(qname, rdtype, entry.status, entry.answers, entry.ttl, view)
+            future.set_result(entry)
+            return entry
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def gethostbyaddr(self, ip) -> Optional[str]:
+        """First PTR name of *ip*, or None."""
+        entry = self.lookup(ptr_name(ip), "PTR")
+        return entry.answers[0] if entry and entry.answers else None
+
+    def gethostbyname(self, name) -> Optional[str]:
+        """IPv4 address of *name*, or None; like socket.gethostbyname.
+
+        Names DNS does not know are tried once through the system resolver
+        (hosts file etc.) and the outcome is cached like a DNS answer.
+        """
+        try:
+            return str(ipaddress.IPv4Address(name))
+        except ValueError:
+            pass
+        entry = self.lookup(name, "A", fallback=_system_lookup)
+        return entry.answers[0] if entry and entry.answers else None
+
+    def close(self):
+        if self._owns_cache:
+            self.cache.close()
+        else:
+            self.cache.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def reverse_lookup(ip, timeout=DEFAULT_TIMEOUT, resolver=None):
+    """Resolve one IP, uncached.  Returns (hostname, ttl), or (None, 0) when unresolved."""
+    entry = query(ptr_name(ip), "PTR", resolver, timeout)
+    if entry is None or entry.negative:
+        return None, 0
+    return entry.answers[0], entry.ttl
+
+
+def resolve_many(ips, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT,
+                 cache=None, db_file=DEFAULT_DB):
+    """Reverse-resolve *ips* concurrently; returns {ip: hostname or NOT_FOUND}.
+
+    Duplicate IPs are looked up once.  Answers, including NXDOMAIN, come
+    from the cache while their TTL lasts; fresh answers are written back.
+    """
+    unique = list(dict.fromkeys(ips))
+    own_cache = cache is None
+    if own_cache:
+        cache = open_cache(db_file)
+    start = time.perf_counter()
+    with CachedResolver(cache, timeout=timeout) as resolver:
+        cache.prefetch(((ptr_name(ip), "PTR") for ip in unique), resolver.ptr_view)
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(unique) or 1))) as executor:
+            names = list(executor.map(resolver.gethostbyaddr, unique))
+    results = {ip: name or NOT_FOUND for ip, name in zip(unique, names)}
+    logger.info(f"Reverse DNS: {len(unique)} IPs in {time.perf_counter() - start:.1f}s; {cache.summary()}")
+    if own_cache:
+        cache.close()
+    return results
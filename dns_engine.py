@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+dns_engine.py - asyncio stub resolver for bulk DNS lookups
+
+Speaks DNS to the configured servers directly instead of forking dig or
+nslookup, or parking a thread in a blocking resolver call, per address:
+
+  * one UDP socket per server carries thousands of queries in flight,
+    matched to their replies by message ID and question
+  * a per-server semaphore caps outstanding queries so one resolver is
+    not flooded
+  * EDNS0 (1232-byte payload); a truncated answer is retried over TCP
+  * timeouts and SERVFAIL/REFUSED are retried on the next server with
+    exponential backoff and jitter
+  * negative answers carry the SOA minimum as their TTL (RFC 2308)
+  * optional shared answer cache (dns_cache.DnsCache); concurrent
+    lookups of the same name share one query either way
+  * optional hedging (hedge=True): ask the first server, and if it has
+    not answered within its recent p95 latency, race the next one too;
+    the first definitive answer wins and the other queries are cancelled
+
+Usage:
+    import asyncio
+    from dns_cache import open_cache
+    from dns_engine import AsyncResolver
+
+    async def run():
+        async with AsyncResolver(cache=open_cache()) as resolver:
+            return await resolver.reverse_many(["10.1.1.10", "8.8.8.8"])
+    results = asyncio.run(run())        # {ip: Lookup}
+    results["8.8.8.8"].name             # 'dns.google' or None; see Lookup.status
+
+Requires dnspython (message encoding/decoding only).
+"""
+
+import asyncio
+import ipaddress
+import itertools
+import random
+import socket
+import struct
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+import dns.asyncquery
+import dns.exception
+import dns.flags
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.resolver
+
+from dns_cache import DnsCache, cache_key, negative_ttl, ptr_name, resolver_view
+
+EXTERNAL_SERVERS = ["8.8.8.8", "8.8.4.4"]
+EDNS_PAYLOAD = 1232
+DEFAULT_TIMEOUT = 2.0           # per attempt
+DEFAULT_RETRIES = 2             # extra attempts, each on the next server
+DEFAULT_BACKOFF = 0.2           # seconds, doubled per retry, +/- 50% jitter
+DEFAULT_SERVER_CONCURRENCY = 500
+DEFAULT_CONCURRENCY = 2000      # lookups in flight across all servers
+HEDGE_DELAY = 0.1               # before a server has LATENCY_SAMPLES replies
+HEDGE_MIN_DELAY = 0.005
+LATENCY_WINDOW = 1000           # recent replies per server behind the hedge delay
+LATENCY_SAMPLES = 20
+RECV_BUFFER = 4 * 1024 * 1024   # UDP socket receive buffer, bytes
+
+# Lookup.status values
+OK, NXDOMAIN, NODATA, SERVFAIL, TIMEOUT, ERROR = "OK", "NXDOMAIN", "NODATA", "SERVFAIL", "TIMEOUT", "ERROR"
+DEFINITIVE = (OK, NXDOMAIN, NODATA)     # answers; anything else is worth another server
+
+
+@dataclass
+class Lookup:
+    """Outcome of one name lookup."""
+    qname: str
+    status: str
+    answers: tuple = ()         # PTR targets / addresses, in answer order
+    ttl: int = 0                # record TTL, or SOA minimum for NXDOMAIN/NODATA
+    server: str = ""
+    elapsed: float = 0.0        # seconds, including retries
+    error: str = ""
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.answers[0] if self.answers else None
+
+    @property
+    def negative(self) -> bool:
+        return self.status in (NXDOMAIN, NODATA)
+
+
+def system_servers() -> list[str]:
+    """Nameservers of the OS resolver configuration (resolv.conf / Windows registry)."""
+    try:
+        return list(dns.resolver.Resolver().nameservers)
+    except dns.resolver.NoResolverConfiguration:
+        return []
+
+
+def parse_server(spec: str) -> tuple[str, int]:
+    """'10.1.1.53', '10.1.1.53:5353' or '10.1.1.53#5353' (dig style) -> (address, port)."""
+    spec = spec.strip()
+    for sep in ("#", ":"):
+        host, _, port = spec.rpartition(sep)
+        if host and port.isdigit() and (sep == "#" or host.count(":") == 0):
+            return host, int(port)
+    return spec, 53
+
+
+def reverse_name(ip: str) -> str:
+    return ptr_name(ip) + "."
+
+
+def encode_question(qname: str, rdtype: int) -> bytes:
+    """Wire-format question section (QNAME QTYPE QCLASS=IN), lower-cased.
+
+    Built by hand: at tens of thousands of queries per second, going
+    through dns.name/dns.message for every query costs more CPU than the
+    network I/O does.
+    """
+    labels = qname.lower().rstrip(".").encode("idna").split(b".")
+    out = b"".join(bytes((len(l),)) + l for l in labels if l)
+    return out + b"\0" + struct.pack(">HH", rdtype, 1)
+
+
+# OPT pseudo-RR: root name, type 41, class = UDP payload size, no flags/options
+_OPT_RR = b"\0" + struct.pack(">HHIH", 41, EDNS_PAYLOAD, 0, 0)
+
+
+# ====================================================================
+# Transport
+# ====================================================================
+
+class _UdpChannel(asyncio.DatagramProtocol):
+    """A connected UDP socket to one server, multiplexing queries by message ID."""
+
+    def __init__(self):
+        self.transport = None
+        self.pending = {}           # id -> (future, question wire)
+
+    def connection_made(self, transport):
+        self.transport = transport
+        sock = transport.get_extra_info("socket")
+        try:
+            # a burst of replies must not overflow the default ~200 KB buffer
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER)
+        except OSError:
+            pass
+
+    def datagram_received(self, data, addr):
+        if len(data) < 12:
+            return
+        entry = self.pending.get(int.from_bytes(data[:2], "big"))
+        if entry is None:
+            return
+        future, question = entry
+        if data[12:12 + len(question)].lower() != question:
+            return                  # stale or spoofed reply for a reused ID
+        if not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc):
+        # ICMP unreachable etc.; outstanding queries will time out and be retried
+        pass
+
+    def connection_lost(self, exc):
+        for future, _ in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("UDP channel closed"))
+
+    def new_id(self):
+        while True:
+            qid = random.getrandbits(16)
+            if qid not in self.pending:
+                return qid
+
+
+def _expire(future):
+    if not future.done():
+        future.set_exception(asyncio.TimeoutError())
+
+
+class ServerStats:
+    """Counters and latency samples for one server."""
+
+    def __init__(self):
+        self.queries = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.tcp = 0
+        self.hedged = 0             # queries sent as a hedge
+        self.wins = 0               # races this server answered first
+        self.latencies = []         # seconds, successful exchanges
+        self.recent = deque(maxlen=LATENCY_WINDOW)
+        self._p95 = None
+        self._p95_age = 0
+
+    def record(self, latency: float):
+        self.latencies.append(latency)
+        self.recent.append(latency)
+        self._p95_age += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        data = sorted(self.latencies)
+        return data[min(len(data) - 1, int(p / 100.0 * len(data)))]
+
+    def recent_p95(self) -> Optional[float]:
+        """p95 of the last LATENCY_WINDOW replies, re-sorted every 32 samples."""
+        if len(self.recent) < LATENCY_SAMPLES:
+            return None
+        if self._p95 is None or self._p95_age >= 32:
+            data = sorted(self.recent)
+            self._p95 = data[int(0.95 * (len(data) - 1))]
+            self._p95_age = 0
+        return self._p95
+
+
+class Server:
+    """One DNS server: a UDP channel and a cap on outstanding queries."""
+
+    def __init__(self, address: str, port: int = 53, concurrency: int = DEFAULT_SERVER_CONCURRENCY):
+        self.address = address
+        self.port = port
+        self.name = address if port == 53 else f"{address}:{port}"
+        self.sem = asyncio.Semaphore(concurrency)
+        self.stats = ServerStats()
+        self._channel = None
+        self._lock = asyncio.Lock()
+
+    async def _get_channel(self) -> _UdpChannel:
+        if self._channel is None or self._channel.transport is None or self._channel.transport.is_closing():
+            async with self._lock:
+                if self._channel is None or self._channel.transport.is_closing():
+                    loop = asyncio.get_running_loop()
+                    _, self._channel = await loop.create_datagram_endpoint(
+                        _UdpChannel, remote_addr=(self.address, self.port))
+        return self._channel
+
+    async def exchange(self, question: bytes, edns: bool, timeout: float) -> dns.message.Message:
+        """Send one query and wait for its reply; TCP when the UDP reply is truncated.
+
+        `question` comes from encode_question().
+        """
+        async with self.sem:
+            channel = await self._get_channel()
+            loop = asyncio.get_running_loop()
+            qid = channel.new_id()
+            # RD set; one question, plus the OPT record in additional when edns
+            wire = struct.pack(">HHHHHH", qid, 0x0100, 1, 0, 0, 1 if edns else 0) + question
+            if edns:
+                wire += _OPT_RR
+            future = loop.create_future()
+            channel.pending[qid] = (future, question)
+            timer = loop.call_later(timeout, _expire, future)
+            self.stats.queries += 1
+            start = time.perf_counter()
+            try:
+                channel.transport.sendto(wire)
+                data = await future
+            except asyncio.TimeoutError:
+                self.stats.timeouts += 1
+                raise
+            except OSError:
+                self.stats.errors += 1
+                raise
+            finally:
+                timer.cancel()
+                channel.pending.pop(qid, None)
+            response = dns.message.from_wire(data, ignore_trailing=True)
+            if response.flags & dns.flags.TC:
+                self.stats.tcp += 1
+                query = dns.message.from_wire(wire)
+                response = await dns.asyncquery.tcp(query, self.address, timeout=timeout, port=self.port)
+            self.stats.record(time.perf_counter() - start)
+            return response
+
+    def close(self):
+        if self._channel is not None and self._channel.transport is not None:
+            self._channel.transport.close()
+
+
+# ====================================================================
+# Resolver
+# ====================================================================
+
+class AsyncResolver:
+    """Bulk resolver over a list of servers. Use as an async context manager.
+
+    With a `cache`, unexpired answers (including NXDOMAIN/NODATA) are
+    served from it and fresh ones written back under this server list's
+    view; the caller owns and closes the cache.
+
+    By default lookups start on the servers in turn and move to the next
+    one on failure.  With `hedge`, servers are tried in the given order
+    and raced (see _race).
+    """
+
+    def __init__(self, servers: Optional[list[str]] = None, timeout: float = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 server_concurrency: int = DEFAULT_SERVER_CONCURRENCY, edns: bool = True,
+                 cache: Optional[DnsCache] = None, hedge: bool = False):
+        addresses = servers or system_servers() or EXTERNAL_SERVERS
+        self.servers = [Server(*parse_server(a), concurrency=server_concurrency) for a in addresses]
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.edns = edns
+        self.cache = cache
+        self.view = resolver_view(s.name for s in self.servers)
+        self.hedge = hedge and len(self.servers) > 1
+        self._inflight = {}         # cache key -> future of the query being made
+        self._rotate = itertools.count()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for server in self.servers:
+            server.close()
+        if self.cache is not None:
+            self.cache.flush()
+
+    async def resolve(self, qname: str, rdtype="A") -> Lookup:
+        """Look up one name. Never raises for DNS failures; see Lookup.status."""
+        rdtype = dns.rdatatype.from_text(rdtype) if isinstance(rdtype, str) else rdtype
+        if self.cache is not None:
+            hit = self.cache.get(qname, rdtype, self.view)
+            if hit is not None:
+                return Lookup(qname, hit.status, hit.answers, hit.ttl, server="cache")
+        key = cache_key(qname, rdtype)
+        while (shared := self._inflight.get(key)) is not None:
+            if self.cache is not None:
+                self.cache.note_shared()
+            try:
+                return await asyncio.shield(shared)
+            except asyncio.CancelledError:
+                if not shared.cancelled():
+                    raise               # we were cancelled, not the shared query
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            if self.hedge:
+                lookup = await self._race(qname, rdtype)
+            else:
+                lookup = await self._query(qname, rdtype)
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+        if self.cache is not None:
+            self.cache.put(qname, rdtype, lookup.status, lookup.answers, lookup.ttl, self.view)
+        future.set_result(lookup)
+        return lookup
+
+    async def _attempt(self, srv: Server, question: bytes, qname: str, rdtype: int,
+                       start: float) -> Lookup:
+        """One query to one server, as a Lookup (SERVFAIL/TIMEOUT/ERROR included)."""
+        def lookup(status, answers=(), ttl=0, error=""):
+            return Lookup(qname, status, answers, ttl, srv.name, time.perf_counter() - start, error)
+
+        try:
+            response = await srv.exchange(question, self.edns, self.timeout)
+        except asyncio.TimeoutError:
+            return lookup(TIMEOUT, error=f"no reply from {srv.name} in {self.timeout:g}s")
+        except (OSError, dns.exception.DNSException) as e:
+            return lookup(ERROR, error=str(e))
+        rcode = response.rcode()
+        if rcode == dns.rcode.NXDOMAIN:
+            return lookup(NXDOMAIN, ttl=negative_ttl(response))
+        if rcode != dns.rcode.NOERROR:
+            return lookup(SERVFAIL, error=dns.rcode.to_text(rcode))
+        answers, ttl = [], None
+        for rrset in response.answer:
+            if rrset.rdtype == rdtype:
+                answers.extend(r.to_text().rstrip(".") for r in rrset)
+                ttl = rrset.ttl if ttl is None else min(ttl, rrset.ttl)
+        if not answers:
+            return lookup(NODATA, ttl=negative_ttl(response))
+        return lookup(OK, tuple(answers), ttl)
+
+    async def _query(self, qname: str, rdtype: int) -> Lookup:
+        question = encode_question(qname, rdtype)
+        start = time.perf_counter()
+        first = next(self._rotate)          # spread first attempts across servers
+        for attempt in range(self.retries + 1):
+            if attempt:
+                delay = self.backoff * (2 ** (attempt - 1))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            srv = self.servers[(first + attempt) % len(self.servers)]
+            lookup = await self._attempt(srv, question, qname, rdtype, start)
+            if lookup.status in DEFINITIVE:
+                return lookup
+            # timeout, SERVFAIL / REFUSED: try the next server
+        return lookup
+
+    def hedge_delay(self, srv: Server) -> float:
+        """How long to wait on `srv` before racing the next server."""
+        p95 = srv.stats.recent_p95()
+        if p95 is None:
+            return min(HEDGE_DELAY, self.timeout)
+        return min(max(p95, HEDGE_MIN_DELAY), self.timeout)
+
+    async def _race(self, qname: str, rdtype: int) -> Lookup:
+        """Hedged lookup over the servers in order.
+
+        The first server is asked at once; each further server joins when
+        the newest racer has gone hedge_delay() without a reply, or at once
+        when a racer fails.  The first OK/NXDOMAIN/NODATA wins and the
+        remaining queries are cancelled.  With retries, the server list is
+        cycled for up to retries + 1 attempts in total.
+        """
+        question = encode_question(qname, rdtype)
+        start = time.perf_counter()
+        n = len(self.servers)
+        order = [self.servers[i % n] for i in range(max(n, self.retries + 1))]
+        loop = asyncio.get_running_loop()
+        racers = {}                         # task -> server
+        launched = 0
+        lookup = None
+
+        def launch():
+            nonlocal launched
+            srv = order[launched]
+            launched += 1
+            if racers:
+                srv.stats.hedged += 1
+            task = loop.create_task(self._attempt(srv, question, qname, rdtype, start))
+            racers[task] = srv
+            return srv
+
+        newest = launch()
+        try:
+            while racers:
+                wait = self.hedge_delay(newest) if launched < len(order) else None
+                done, _ = await asyncio.wait(racers, timeout=wait,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    newest = launch()       # hedge: newest racer is slower than its p95
+                    continue
+                for task in done:
+                    srv = racers.pop(task)
+                    lookup = task.result()
+                    if lookup.status in DEFINITIVE:
+                        srv.stats.wins += 1
+                        return lookup
+                    if launched < len(order):
+                        newest = launch()   # failed outright: no point waiting
+        finally:
+            for task in racers:
+                task.cancel()
+        return lookup
+
+    async def reverse(self, ip: str) -> Lookup:
+        return await self.resolve(reverse_name(ip), "PTR")
+
+    async def reverse_many(self, ips, concurrency: int = DEFAULT_CONCURRENCY, progress=None) -> dict:
+        """PTR-resolve every distinct IP; returns {ip: Lookup}.
+
+        `progress(done, total)` is called as lookups finish, if given.
+        """
+        unique = list(dict.fromkeys(ips))
+        if self.cache is not None:
+            self.cache.prefetch(((reverse_name(ip), "PTR") for ip in unique), self.view)
+        results = {}
+        jobs = iter(unique)
+
+        async def worker():
+            for ip in jobs:
+                results[ip] = await self.reverse(ip)
+                if progress:
+                    progress(len(results), len(unique))
+
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(unique))))))
+        return results
+
+    def stats_lines(self) -> list[str]:
+        lines = []
+        for s in self.servers:
+            st = s.stats
+            p50, p95 = st.percentile(50), st.percentile(95)
+            lines.append(
+                f"{s.name:<21} {st.queries:>8} queries  {st.timeouts:>6} timeouts  "
+                f"{st.tcp:>4} via TCP  p50 {p50 * 1000 if p50 else 0:6.1f} ms  "
+                f"p95 {p95 * 1000 if p95 else 0:6.1f} ms"
+                + (f"  {st.hedged:>6} hedged  {st.wins:>7} won" if self.hedge else "")
+            )
+        return lines
+
+
+def is_public(ip: str) -> bool:
+    try:
+        return ipaddress.ip_address(ip).is_global
+    except ValueError:
+        return False
@@ -3,19 +3,41 @@
 DNS Lookup Script for IP Addresses
 Handles both internal (RFC 1918) and external IP addresses
 Outputs results to Excel with proper formatting
+
+All PTR lookups go through the asyncio engine in dns_engine.py: queries
+are sent straight to the DNS servers over UDP (TCP on truncation), with
+thousands in flight, a per-server concurrency cap, retries with backoff
+across servers, and EDNS0.  Public addresses that the system servers
+cannot resolve are retried against external DNS (8.8.8.8 by default).
+With --hedge the servers are raced instead of rotated: the first one is
+asked, the next joins once the first is slower than its recent p95, and
+the first answer wins.
+Answers, including NXDOMAIN, are kept in the shared DNS cache
+(dns_cache.py) for their TTL, so re-runs only query what has expired.
+
+The older dns_lookup2 / _builtin / _dig / _windows / _windows_hybrid
+scripts now run this one.
+
+Usage: python3 dns_lookup.py <input_csv_file> <output_excel_file> [options]
 """
 
+import argparse
+import asyncio
 import csv
-import socket
 import ipaddress
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
 from openpyxl import Workbook
 from openpyxl.styles import Font
 from openpyxl.utils import get_column_letter
-import dns.resolver
-import dns.reversename
-import time
+
+from dns_cache import DEFAULT_DB, open_cache
+from dns_engine import (DEFAULT_CONCURRENCY, DEFAULT_RETRIES, DEFAULT_SERVER_CONCURRENCY,
+                        DEFAULT_TIMEOUT, EXTERNAL_SERVERS, NODATA, NXDOMAIN, OK, TIMEOUT,
+                        AsyncResolver, is_public, system_servers)
+
+
+FAILURE_PREFIXES = ('DNS error:', 'No PTR record', 'DNS timeout')
 
 def is_rfc1918(ip_str):
     """Check if IP address is RFC 1918 (private/internal)"""
@@ -25,79 +47,58 @@ def is_rfc1918(ip_str):
     except ValueError:
         return False
 
-def dns_lookup(ip_address, use_internal=True):
-    """
-    Perform reverse DNS lookup on an IP address
-    
-    Args:
-        ip_address (str): IP address to lookup
-        use_internal (bool): Whether to use internal DNS or external (8.8.8.8)
-    
-    Returns:
-        str: Hostname or error message
-    """
-    try:
-        # Create a new resolver for each lookup
-        resolver = dns.resolver.Resolver()
-        
-        if use_internal:
-            # Use system default DNS servers for internal addresses
-            resolver.nameservers = dns.resolver.Resolver().nameservers
-        else:
-            # Use Google DNS for external addresses
-            resolver.nameservers = ['8.8.8.8', '8.8.4.4']
-        
-        # Set timeout
-        resolver.timeout = 5
-        resolver.lifetime = 10
-        
-        # Create reverse DNS name
-        reverse_name = dns.reversename.from_address(ip_address)
-        
-        # Perform the lookup
-        answer = resolver.resolve(reverse_name, 'PTR')
-        hostname = str(answer[0]).rstrip('.')
-        
-        return hostname
-        
-    except dns.resolver.NXDOMAIN:
+def describe(lookup):
+    """Hostname, or the failure text the lookup scripts have always written"""
+    if lookup.status == OK:
+        return lookup.name
+    if lookup.status in (NXDOMAIN, NODATA):
         return "No PTR record found"
-    except dns.resolver.Timeout:
+    if lookup.status == TIMEOUT:
         return "DNS timeout"
-    except dns.resolver.NoNameservers:
-        return "No nameservers available"
-    except Exception as e:
-        return f"DNS error: {str(e)}"
+    return f"DNS error: {lookup.error or lookup.status}"
 
-def process_ip_batch(ip_list):
-    """Process a batch of IP addresses with DNS lookups"""
-    results = []
-    
-    with ThreadPoolExecutor(max_workers=50) as executor:
-        # Submit all tasks
-        future_to_ip = {}
-        for ip in ip_list:
-            ip = ip.strip()
-            if not ip:
-                continue
-                
-            # Determine if we should use internal or external DNS
-            use_internal = is_rfc1918(ip)
-            future = executor.submit(dns_lookup, ip, use_internal)
-            future_to_ip[future] = ip
-        
-        # Collect results as they complete
-        for future in as_completed(future_to_ip):
-            ip = future_to_ip[future]
-            try:
-                hostname = future.result()
-                results.append((ip, hostname))
-                print(f"Processed {ip}: {hostname}")
-            except Exception as e:
-                results.append((ip, f"Error: {str(e)}"))
-                print(f"Error processing {ip}: {str(e)}")
-    
-    return results
+def _progress_printer(label):
+    state = {"last": 0.0}
+
+    def progress(done, total):
+        now = time.time()
+        if done == total or now - state["last"] >= 2:
+            state["last"] = now
+            print(f"  {label}: {done}/{total} ({done * 100 // total}%)")
+    return progress
+
+async def lookup_all(ips, servers=None, external=EXTERNAL_SERVERS, timeout=DEFAULT_TIMEOUT,
+                     retries=DEFAULT_RETRIES, concurrency=DEFAULT_CONCURRENCY,
+                     server_concurrency=DEFAULT_SERVER_CONCURRENCY, edns=True, cache=None,
+                     hedge=False):
+    """
+    Reverse-resolve every IP; returns ({ip: Lookup}, [resolver stats lines]).
+    Public IPs the primary servers could not resolve are retried on `external`;
+    the cache keeps each server list's answers apart.
+    """
+    options = dict(timeout=timeout, retries=retries, server_concurrency=server_concurrency, edns=edns,
+                   hedge=hedge)
+    async with AsyncResolver(servers, cache=cache, **options) as resolver:
+        results = await resolver.reverse_many(ips, concurrency, _progress_printer("lookups"))
+        stats = resolver.stats_lines()
+
+    retry = [ip for ip, r in results.items() if r.status != OK and is_public(ip)]
+    if retry and external:
+        print(f"Retrying {len(retry)} public addresses against {', '.join(external)}")
+        async with AsyncResolver(external, cache=cache, **options) as resolver:
+            second = await resolver.reverse_many(retry, concurrency, _progress_printer("external"))
+            stats += resolver.stats_lines()
+        for ip, r in second.items():
+            if r.status == OK or results[ip].status not in (NXDOMAIN, NODATA):
+                results[ip] = r
+    return results, stats
+
+def process_ip_batch(ip_list, dns_cache=DEFAULT_DB, **options):
+    """Process a list of IP addresses with DNS lookups; returns [(ip, hostname)]"""
+    ips = [ip.strip() for ip in ip_list if ip.strip()]
+    with open_cache(dns_cache) as cache:
+        results, _ = asyncio.run(lookup_all(ips, cache=cache, **options))
+    return [(ip, describe(results[ip])) for ip in ips]
 
 def read_ips_from_csv(csv_file):
     """Read IP addresses from CSV file"""
@@ -180,55 +181,70 @@ def save_to_excel(results, output_file):
     print(f"Results saved to {output_file}")
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python3 dns_lookup.py <input_csv_file> <output_excel_file>")
-        print("Example: python3 dns_lookup.py ip_addresses.csv dns_results.xlsx")
-        sys.exit(1)
-    
-    input_csv = sys.argv[1]
-    output_excel = sys.argv[2]
-    
+    parser = argparse.ArgumentParser(
+        description="Reverse DNS lookups for every IP in a CSV, written to Excel",
+        epilog="Example: python3 dns_lookup.py ip_addresses.csv dns_results.xlsx")
+    parser.add_argument("input_csv", help="CSV file; the first IP-looking cell of each row is used")
+    parser.add_argument("output_excel", help="Excel file to write")
+    parser.add_argument("--servers", help="Comma-separated DNS servers (default: system resolvers)")
+    parser.add_argument("--external", default=",".join(EXTERNAL_SERVERS),
+                        help="Servers to retry unresolved public IPs on, or 'none' "
+                             f"(default: {','.join(EXTERNAL_SERVERS)})")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"Per-attempt timeout in seconds (default: {DEFAULT_TIMEOUT:g})")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help=f"Retries per lookup, each on the next server (default: {DEFAULT_RETRIES})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Lookups in flight (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--server-concurrency", type=int, default=DEFAULT_SERVER_CONCURRENCY,
+                        help=f"Maximum outstanding queries per server (default: {DEFAULT_SERVER_CONCURRENCY})")
+    parser.add_argument("--no-edns", action="store_true", help="Send plain DNS queries without EDNS0")
+    parser.add_argument("--hedge", action="store_true",
+                        help="Race the servers in the order given instead of rotating through them")
+    parser.add_argument("--dns-cache", default=DEFAULT_DB,
+                        help=f"Persistent DNS cache file, ':memory:' for none (default: {DEFAULT_DB})")
+    args = parser.parse_args()
+
+    servers = [s.strip() for s in args.servers.split(",")] if args.servers else None
+    external = [] if args.external.lower() == "none" else [s.strip() for s in args.external.split(",") if s.strip()]
+
     print("Starting DNS lookup process...")
     print("=" * 50)
     
     # Read IP addresses from CSV
-    ips = read_ips_from_csv(input_csv)
+    ips = read_ips_from_csv(args.input_csv)
     if not ips:
         print("No valid IP addresses found in the CSV file")
         sys.exit(1)
     
-    print(f"Processing {len(ips)} IP addresses...")
-    print("RFC 1918 (private) addresses will use internal DNS")
-    print("Public addresses will use Google DNS (8.8.8.8)")
+    internal_count = sum(1 for ip in ips if is_rfc1918(ip))
+    print(f"Processing {len(ips)} IP addresses ({internal_count} internal, {len(ips) - internal_count} external)...")
+    print(f"DNS servers: {', '.join(servers or system_servers() or EXTERNAL_SERVERS)}")
+    if external:
+        print(f"Unresolved public addresses are retried on: {', '.join(external)}")
     print("=" * 50)
     
     start_time = time.time()
-    
-    # Process IPs in batches to manage memory and connections
-    batch_size = 1000
-    all_results = []
-    
-    for i in range(0, len(ips), batch_size):
-        batch = ips[i:i + batch_size]
-        print(f"Processing batch {i//batch_size + 1} ({len(batch)} addresses)...")
-        
-        batch_results = process_ip_batch(batch)
-        all_results.extend(batch_results)
-        
-        print(f"Completed batch {i//batch_size + 1}")
-        print("-" * 30)
+    with open_cache(args.dns_cache) as cache:
+        results, stats = asyncio.run(lookup_all(
+            ips, servers=servers, external=external, timeout=args.timeout, retries=args.retries,
+            concurrency=args.concurrency, server_concurrency=args.server_concurrency,
+            edns=not args.no_edns, cache=cache, hedge=args.hedge))
+    all_results = [(ip, describe(results[ip])) for ip in ips]
     
     elapsed_time = time.time() - start_time
     print(f"DNS lookups completed in {elapsed_time:.2f} seconds")
-    print(f"Average: {elapsed_time/len(ips):.3f} seconds per IP")
+    print(f"Average: {len(results) / elapsed_time if elapsed_time else 0:.0f} lookups per second")
+    for line in stats:
+        print(f"  {line}")
     
     # Save to Excel
     print("Saving results to Excel...")
-    save_to_excel(all_results, output_excel)
+    save_to_excel(all_results, args.output_excel)
     
     # Summary
-    successful_lookups = sum(1 for _, hostname in all_results 
-                           if not hostname.startswith(('DNS error:', 'No PTR record', 'DNS timeout')))
+    successful_lookups = sum(1 for _, hostname in all_results
+                           if not hostname.startswith(FAILURE_PREFIXES))
     
     print("=" * 50)
     print("SUMMARY:")
@@ -236,7 +252,8 @@ def main():
     print(f"Successful DNS lookups: {successful_lookups}")
     print(f"Failed lookups: {len(all_results) - successful_lookups}")
     print(f"Success rate: {(successful_lookups/len(all_results)*100):.1f}%")
-    print(f"Results saved to: {output_excel}")
+    print(cache.summary())
+    print(f"Results saved to: {args.output_excel}")
 
 if __name__ == "__main__":
     main()
@@ -6,17 +6,26 @@ Connects to NX-OS parent switches, runs 'show interface status' and
 'show interface description' for specified FEX ports, and writes the
 results to a formatted Excel spreadsheet.
 
+Switches are collected in parallel (--workers) and each one's rows are
+streamed into a write-only workbook as soon as it finishes, so run time
+is roughly that of the slowest switch and memory stays flat.
+
 Requirements:  pip install netmiko openpyxl
 """
 
+import argparse
 import re
 import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from netmiko import ConnectHandler
+from fleet_snapshot import ConnectHandler, add_snapshot_argument, snapshot_hosts, use_snapshot
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Font, Alignment, NamedStyle
 from openpyxl.utils import get_column_letter
 from tools import get_netmiko_creds, getScriptName, setupLogging
+from parsers import parse_interface_status, parse_interface_description
 
 
 # ====================================================================
@@ -38,105 +47,16 @@ scriptName = getScriptName()
 timestamp = datetime.now().strftime('%Y%m%d_%H%M')
 log_path = setupLogging(scriptName, timestamp)
 logger = logging.getLogger(__name__)
-netmikoUser, passwd, enable = get_netmiko_creds()
+netmikoUser = passwd = enable = None    # set in main(); not needed for --from-snapshot
 
 OUTPUT_FILE = f"fex_interface_report_{timestamp}.xlsx"
+MAX_WORKERS = 10
 
 
 # ====================================================================
 # Parsing helpers
 # ====================================================================
 
-def _col_positions(header, names):
-    """Derive (start, end) slicing positions from a fixed-width header line."""
-    positions = []
-    for i, name in enumerate(names):
-        start = header.index(name)
-        end = header.index(names[i + 1]) if i + 1 < len(names) else None
-        positions.append((start, end))
-    return positions
-
-
-def _extract(line, positions, keys):
-    """Slice one data line according to precomputed column positions."""
-    row = {}
-    for key, (start, end) in zip(keys, positions):
-        row[key] = (line[start:end] if end else line[start:]).strip()
-    return row
-
-
-def parse_interface_status(raw):
-    """
-    Parse NX-OS 'show interface <range> status'.
-
-    Expected columns (7):
-        Port  Name  Status  Vlan  Duplex  Speed  Type
-    """
-    COL_NAMES = ["Port", "Name", "Status", "Vlan", "Duplex", "Speed", "Type"]
-    KEYS      = ["port", "name", "status", "vlan", "duplex", "speed", "type"]
-    header = None
-    results = []
-    past_sep = False
-
-    for line in raw.splitlines():
-        if not header and all(c in line for c in ("Port", "Status", "Vlan")):
-            header = line
-            past_sep = False
-            continue
-        if header and line.lstrip().startswith("---"):
-            past_sep = True
-            continue
-        if past_sep and line.strip():
-            results.append(line)
-
-    if not header:
-        return []
-
-    pos = _col_positions(header, COL_NAMES)
-    return [_extract(l, pos, KEYS) for l in results]
-
-
-def parse_interface_description(raw):
-    """
-    Parse NX-OS 'show interface <range> description'.
-
-    Handles two common formats:
-      4-col:  Port  Type  Speed  Description
-      2-col:  Interface  Description
-    Returns (list-of-dicts, is_four_col).
-    """
-    header = None
-    data_lines = []
-    past_sep = False
-
-    for line in raw.splitlines():
-        if not header and "Description" in line and ("Port" in line or "Interface" in line):
-            header = line
-            past_sep = False
-            continue
-        if header and line.lstrip().startswith("---"):
-            past_sep = True
-            continue
-        if past_sep and line.strip():
-            data_lines.append(line)
-
-    if not header:
-        return [], True
-
-    four_col = "Type" in header and "Speed" in header
-
-    if four_col:
-        col_names = ["Port", "Type", "Speed", "Description"]
-        keys      = ["interface", "type", "speed", "description"]
-    else:
-        col_names = ["Interface", "Description"]
-        keys      = ["interface", "description"]
-
-    pos = _col_positions(header, col_names)
-    rows = [_extract(l, pos, keys) for l in data_lines]
-    return rows, four_col
-
-
 def normalize_intf(name):
     """Normalize to short form for reliable matching."""
     return re.sub(r"(?i)^ethernet", "Eth", name.strip()).lower()
@@ -152,14 +72,27 @@ def intf_sort_key(entry):
 # Data collection
 # ====================================================================
 
+def _fex_numbers(rows, key="port"):
+    """FEX numbers that appear in the interface names of rows (EthFEX/1/port)."""
+    found = set()
+    for r in rows:
+        m = re.match(r"eth(\d+)/\d+/\d+$", normalize_intf(r.get(key, "")))
+        if m:
+            found.add(int(m.group(1)))
+    return sorted(found)
+
+
 def _filter_by_fex(rows, fex, key="port"):
     """Return only rows whose interface belongs to the given FEX number."""
     prefix = f"eth{fex}/"
     return [r for r in rows if normalize_intf(r.get(key, "")).startswith(prefix)]
 
 
-def collect_switch(host, fex_list):
-    """SSH to one switch and return data for every requested FEX."""
+def collect_switch(host, fex_list=None):
+    """SSH to one switch and return data for every requested FEX.
+
+    fex_list None means every FEX found in the switch's interface status.
+    """
     logger.info(f"Connecting to {host}")
     device = {
         "device_type": "cisco_nxos",
@@ -185,6 +118,8 @@ def collect_switch(host, fex_list):
             raw_desc = conn.send_command("show interface description")
             all_desc, four_col = parse_interface_description(raw_desc)
 
+            if fex_list is None:
+                fex_list = _fex_numbers(all_status)
             for fex in fex_list:
                 logger.info(f"  FEX {fex}")
                 status_rows = _filter_by_fex(all_status, fex, key="port")
@@ -222,41 +157,64 @@ def collect_switch(host, fex_list):
 TOTAL_COLS = 14
 DIVIDER_COLS = [12, 14]
 
+HEADERS = [
+    "Host Switch", "FEX",                               # A-B
+    "Port", "Description", "Status", "Vlan",            # C-F
+    "Duplex", "Speed", "Type",                          # G-I
+    "New Switch", "New Switchport",                      # J-K
+    "", "Platform Owner", "",                            # L-N
+]
+
+# A write-only sheet has to declare its column widths before the first row,
+# so widths are fixed up front instead of measured from the data.
+COLUMN_WIDTHS = [24, 6, 14, 40, 14, 8, 8, 8, 16, 20, 16, 1, 18, 1]
+
+
+def _named_style(name, fill, font=None, alignment=None):
+    style = NamedStyle(name=name)
+    style.fill = fill
+    if font:
+        style.font = font
+    if alignment:
+        style.alignment = alignment
+    return style
 
-def build_report(all_data):
-    """Create the formatted .xlsx workbook."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "FEX Interface Report"
-
-    # ---- styles ----
-    hdr_fill = PatternFill("solid", fgColor="4472C4")
-    hdr_font = Font(bold=True, color="FFFFFF", size=11)
-    hdr_align = Alignment(horizontal="center")
-    gray_fill = PatternFill("solid", fgColor="D9D9D9")
-    red_strike = Font(color="FF0000", strikethrough=True)
-    blue_fill = PatternFill("solid", fgColor="BDD7EE")
-
-    # ---- headers ----
-    headers = [
-        "Host Switch", "FEX",                               # A-B
-        "Port", "Description", "Status", "Vlan",            # C-F
-        "Duplex", "Speed", "Type",                          # G-I
-        "New Switch", "New Switchport",                      # J-K
-        "", "Platform Owner", "",                            # L-N
-    ]
-    for ci, text in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=ci, value=text)
-        if ci in DIVIDER_COLS:
-            cell.fill = blue_fill
-        else:
-            cell.fill = hdr_fill
-            cell.font = hdr_font
-            cell.alignment = hdr_align
-
-    # ---- data rows ----
-    row = 2
-    for host, fex_results in all_data:
+
+class ReportWriter:
+    """Stream report rows into a write-only .xlsx as each host finishes.
+
+    Styles are registered once as named styles; rows go straight to disk,
+    so memory does not grow with the number of switches.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.wb = Workbook(write_only=True)
+        blue_fill = PatternFill("solid", fgColor="BDD7EE")
+        for style in (
+            _named_style("fex_header", PatternFill("solid", fgColor="4472C4"),
+                         Font(bold=True, color="FFFFFF", size=11), Alignment(horizontal="center")),
+            _named_style("fex_divider", blue_fill),
+            # gray background + red strikethrough for non-connected
+            _named_style("fex_down", PatternFill("solid", fgColor="D9D9D9"),
+                         Font(color="FF0000", strikethrough=True)),
+        ):
+            self.wb.add_named_style(style)
+
+        self.ws = self.wb.create_sheet("FEX Interface Report")
+        for ci, width in enumerate(COLUMN_WIDTHS, 1):
+            self.ws.column_dimensions[get_column_letter(ci)].width = width
+        self.ws.freeze_panes = "A2"
+
+    def _cell(self, value, style=None):
+        cell = WriteOnlyCell(self.ws, value=value)
+        if style:
+            cell.style = style
+        return cell
+
+    def add_host(self, host, fex_results):
+        """Append every row for one switch."""
         for fex, status_rows, desc_rows, four_col in fex_results:
 
             # Build lookup: normalized interface → description dict
@@ -271,47 +229,26 @@ def build_report(all_data):
                 desc = desc_map.get(key, {})
                 full_desc = desc.get("description", entry.get("name", ""))
 
-                ws.cell(row=row, column=1, value=host)
-                ws.cell(row=row, column=2, value=fex)
-                ws.cell(row=row, column=3, value=entry.get("port", ""))
-                ws.cell(row=row, column=4, value=full_desc)
-                ws.cell(row=row, column=5, value=entry.get("status", ""))
-                ws.cell(row=row, column=6, value=entry.get("vlan", ""))
-                ws.cell(row=row, column=7, value=entry.get("duplex", ""))
-                ws.cell(row=row, column=8, value=entry.get("speed", ""))
-                ws.cell(row=row, column=9, value=entry.get("type", ""))
-
-                # gray background + red strikethrough for non-connected
-                if entry.get("status", "").lower() != "connected":
-                    for c in range(1, TOTAL_COLS + 1):
-                        ws.cell(row=row, column=c).fill = gray_fill
-                        ws.cell(row=row, column=c).font = red_strike
-
-                row += 1
-
-    # ---- divider columns: light blue fill from row 1 to last data row ----
-    last_row = row - 1
-    for dc in DIVIDER_COLS:
-        for r in range(1, last_row + 1):
-            ws.cell(row=r, column=dc).fill = blue_fill
-
-    # ---- column widths ----
-    for ci in range(1, TOTAL_COLS + 1):
-        letter = get_column_letter(ci)
-        if ci in DIVIDER_COLS:
-            ws.column_dimensions[letter].width = 1
-            continue
-        max_len = max(
-            (len(str(cell.value or "")) for cell in ws[letter]),
-            default=8,
-        )
-        ws.column_dimensions[letter].width = max_len + 3
-
-    # ---- freeze top row ----
-    ws.freeze_panes = "A2"
-
-    wb.save(OUTPUT_FILE)
-    logger.info(f"Report saved to {OUTPUT_FILE}")
+                values = [
+                    host, fex, entry.get("port", ""), full_desc,
+                    entry.get("status", ""), entry.get("vlan", ""),
+                    entry.get("duplex", ""), entry.get("speed", ""),
+                    entry.get("type", ""), None, None, None, None, None,
+                ]
+                style = None if entry.get("status", "").lower() == "connected" else "fex_down"
+                if not self.rows:
+                    # Header goes out with the first row, so an empty report writes nothing
+                    self.ws.append([self._cell(text, "fex_divider" if ci in DIVIDER_COLS else "fex_header")
+                                    for ci, text in enumerate(HEADERS, 1)])
+                self.ws.append([
+                    self._cell(v, "fex_divider" if ci in DIVIDER_COLS else style)
+                    for ci, v in enumerate(values, 1)
+                ])
+                self.rows += 1
+
+    def close(self):
+        self.wb.save(self.path)
+        logger.info(f"Report saved to {self.path} ({self.rows} rows)")
 
 
 # ====================================================================
@@ -319,20 +256,44 @@ def build_report(all_data):
 # ====================================================================
 
 def main():
-    all_data = []  # [(host, fex_results), …]
-
-    for host, fex_list in SWITCHES.items():
-        fex_results = collect_switch(host, fex_list)
-        all_data.append((host, fex_results))
-
-    if not any(fr for _, fr in all_data):
-        logger.warning("No data collected — verify connectivity and FEX numbers.")
-        return
+    parser = add_snapshot_argument(argparse.ArgumentParser(description="NX-OS FEX interface report"))
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help=f"Switches collected in parallel (default: {MAX_WORKERS}, 1 = sequential)")
+    args = parser.parse_args()
+    global netmikoUser, passwd, enable
+    if args.from_snapshot:
+        # Every switch in the snapshot; FEX numbers from SWITCHES where listed,
+        # otherwise every FEX the switch reports
+        use_snapshot(args.from_snapshot)
+        switches = {host: SWITCHES.get(host) for host in snapshot_hosts()}
+    else:
+        netmikoUser, passwd, enable = get_netmiko_creds()
+        switches = SWITCHES
+
+    report = ReportWriter(OUTPUT_FILE)
+    collected = 0
+
+    # Rows are written in the order switches finish, not SWITCHES order
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {executor.submit(collect_switch, host, fex_list): host
+                   for host, fex_list in switches.items()}
+        for future in as_completed(futures):
+            host = futures[future]
+            fex_results = future.result()
+            report.add_host(host, fex_results)
+            collected += bool(fex_results)
+            logger.info(f"{host} written ({collected}/{len(switches)} with data)")
+
+    # Nothing collected: leave no headers-only workbook behind
+    if not report.rows:
+        logger.error("No data collected — verify connectivity and FEX numbers.")
+        return 1
+    report.close()
 
-    build_report(all_data)
     print(f"Report: {OUTPUT_FILE}")
     print(f"Log:    {log_path}")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+fleet_snapshot.py - "Collect once, report many" fleet snapshot
+
+Connects to every device once, concurrently, runs a fixed command set
+(version, inventory, interface status/description, transceiver, CDP,
+port-channel summary, vPC) and writes all raw output into one versioned,
+gzip-compressed JSON snapshot file.
+
+Report scripts (fex_report, ListThemfex, ExploreFex, GetSfpDetails,
+shIntDesc2, pdesc34, PortChanPorts, TransceiverInventory) accept
+--from-snapshot FILE and then build their output from the snapshot with
+zero device connections: they import ConnectHandler from this module,
+which hands back a SnapshotConnection replaying the stored output once
+use_snapshot() has been called.
+
+Usage:
+    python fleet_snapshot.py devices.txt                   # hostname[,device_type] per line
+    python fleet_snapshot.py -d sw1 -d sw2 --workers 30
+    python fex_report.py --from-snapshot fleet_snapshot_20250911_161455.json.gz
+
+Credentials come from tools.py.
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import logging
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+SNAPSHOT_FORMAT = "fleet-snapshot"
+SNAPSHOT_SCHEMA = 1
+DEFAULT_WORKERS = 20
+
+# Command set gathered per platform.  Reports that ask for a filtered form
+# ("... | include x") or a shorter form of a command are served from these.
+COMMAND_SETS = {
+    "cisco_nxos": [
+        "show version",
+        "show inventory",
+        "show interface status",
+        "show interface description",
+        "show interface transceiver detail",
+        "show cdp neighbors",
+        "show cdp neighbors detail",
+        "show port-channel summary",
+        "show vpc brief",
+    ],
+    "cisco_ios": [
+        "show version",
+        "show inventory",
+        "show interfaces status",
+        "show interfaces description",
+        "show interfaces transceiver",
+        "show cdp neighbors",
+        "show cdp neighbors detail",
+        "show etherchannel summary",
+    ],
+}
+COMMAND_SETS["cisco_xe"] = COMMAND_SETS["cisco_ios"]
+
+logger = logging.getLogger(__name__)
+
+
+# ====================================================================
+# Snapshot file
+# ====================================================================
+
+def normalize_command(command):
+    """Lower-case, collapse whitespace, and treat 'interfaces' as 'interface'."""
+    cmd = " ".join(command.lower().split())
+    return re.sub(r'\binterfaces\b', 'interface', cmd)
+
+
+def save_snapshot(snapshot, path):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(snapshot, f)
+
+
+def load_snapshot(path):
+    """Load and validate a snapshot file written by save_snapshot()."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        snapshot = json.load(f)
+    if snapshot.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path} is not a fleet snapshot")
+    if snapshot.get("schema", 0) > SNAPSHOT_SCHEMA:
+        raise ValueError(f"{path} uses snapshot schema {snapshot['schema']}, "
+                         f"this tool understands up to {SNAPSHOT_SCHEMA}")
+    return snapshot
+
+
+class SnapshotConnection:
+    """Read-only stand-in for a netmiko connection, replaying snapshot output.
+
+    Supports the calls the report scripts make: send_command (including
+    '| include/exclude/begin' filters and use_textfsm), enable,
+    find_prompt, disconnect and use as a context manager.
+    """
+
+    def __init__(self, host, record):
+        self.host = host
+        self.device_type = record.get("device_type", "cisco_nxos")
+        self.outputs = {normalize_command(c): o for c, o in record.get("outputs", {}).items()}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.disconnect()
+
+    def enable(self, *args, **kwargs):
+        return ""
+
+    def disconnect(self):
+        pass
+
+    def find_prompt(self, *args, **kwargs):
+        return f"{self.host}#"
+
+    def _base_output(self, command):
+        cmd = normalize_command(command)
+        if cmd in self.outputs:
+            return self.outputs[cmd]
+        # "show interface transceiver" can be answered from "... detail"
+        longer = sorted((c for c in self.outputs if c.startswith(cmd + " ")), key=len)
+        if longer:
+            return self.outputs[longer[0]]
+        raise KeyError(f"'{command}' for {self.host} is not in the snapshot")
+
+    def send_command(self, command, use_textfsm=False, **kwargs):
+        if command.strip().lower().startswith("terminal "):
+            return ""
+        # Only " | " separates pipes; "Ethernet|product" is a regex alternation
+        base, *pipes = re.split(r"\s+\|\s+", command.strip())
+        output = self._base_output(base)
+        for pipe in pipes:
+            verb, _, pattern = pipe.strip().partition(" ")
+            pattern = pattern.strip().strip('"')
+            lines = output.splitlines()
+            if verb.startswith("inc"):
+                output = "\n".join(l for l in lines if re.search(pattern, l))
+            elif verb.startswith("exc"):
+                output = "\n".join(l for l in lines if not re.search(pattern, l))
+            elif verb.startswith("beg"):
+                start = next((i for i, l in enumerate(lines) if re.search(pattern, l)), len(lines))
+                output = "\n".join(lines[start:])
+        if use_textfsm:
+            from textfsm_cache import parse_output
+            return parse_output(self.device_type, base, output)
+        return output
+
+
+_active_snapshot = None
+
+
+def use_snapshot(path):
+    """Make ConnectHandler() in this process replay *path* instead of SSH."""
+    global _active_snapshot
+    _active_snapshot = load_snapshot(path)
+    logger.info(f"Using snapshot {path} ({_active_snapshot['snapshot_id']}, "
+                f"{len(_active_snapshot['devices'])} devices)")
+    return _active_snapshot
+
+
+def snapshot_hosts():
+    """Hosts collected successfully in the active snapshot ([] if none active)."""
+    if _active_snapshot is None:
+        return []
+    return [h for h, rec in _active_snapshot["devices"].items() if rec.get("status") == "Success"]
+
+
+def ConnectHandler(**params):
+    """netmiko.ConnectHandler, or a SnapshotConnection when a snapshot is active."""
+    if _active_snapshot is None:
+        from netmiko import ConnectHandler as NetmikoConnectHandler
+        return NetmikoConnectHandler(**params)
+
+    host = params.get("host") or params.get("ip", "")
+    devices = _active_snapshot["devices"]
+    record = devices.get(host)
+    if record is None:
+        wanted = host.lower()
+        record = next((r for h, r in devices.items()
+                       if h.lower() == wanted or r.get("ip", "").lower() == wanted), None)
+    if record is None or record.get("status") != "Success":
+        raise ConnectionError(f"{host} is not in snapshot {_active_snapshot['snapshot_id']}")
+    return SnapshotConnection(host, record)
+
+
+def add_snapshot_argument(parser):
+    """Add the shared --from-snapshot option to a report's argument parser."""
+    parser.add_argument("--from-snapshot", metavar="FILE",
+                        help="Build the report from a fleet_snapshot.py file instead of connecting to devices")
+    return parser
+
+
+# ====================================================================
+# Collection
+# ====================================================================
+
+def load_device_list(path, default_type):
+    """Read 'hostname[,device_type[,ip]]' lines (# comments allowed).
+
+    A TransceiverInventory-style CSV with a devicename,ipaddr,...,devicetype
+    header is also accepted, so one device file can drive both tools.
+    """
+    devices = []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        header = f.readline()
+        if "devicename" in header.lower():
+            f.seek(0)
+            for row in csv.DictReader(f):
+                row = {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+                if row.get("devicename"):
+                    devices.append({"host": row["devicename"],
+                                    "device_type": (row.get("devicetype") or default_type).lower(),
+                                    "ip": row.get("ipaddr", "")})
+            return devices
+        f.seek(0)
+        for row in csv.reader(f):
+            if not row or not row[0].strip() or row[0].strip().startswith("#"):
+                continue
+            host = row[0].strip()
+            if host.lower() in ("hostname", "host", "devicename", "device"):
+                continue
+            dtype = row[1].strip().lower() if len(row) > 1 and row[1].strip() else default_type
+            ip = row[2].strip() if len(row) > 2 else ""
+            devices.append({"host": host, "device_type": dtype, "ip": ip})
+    return devices
+
+
+def collect_device(device, username, password, secret):
+    """SSH to one device and return its snapshot record."""
+    from netmiko import ConnectHandler as NetmikoConnectHandler
+
+    host = device["host"]
+    dtype = device["device_type"]
+    record = {"device_type": dtype, "ip": device.get("ip", ""), "outputs": {}, "errors": {}}
+    start = time.perf_counter()
+    try:
+        with NetmikoConnectHandler(device_type=dtype, host=device.get("ip") or host,
+                                   username=username, password=password, secret=secret,
+                                   fast_cli=False, timeout=60) as conn:
+            try:
+                conn.enable()
+            except Exception:
+                pass  # Some devices don't need enable
+            for command in COMMAND_SETS.get(dtype, COMMAND_SETS["cisco_ios"]):
+                try:
+                    record["outputs"][command] = conn.send_command(command, read_timeout=180)
+                except Exception as e:
+                    record["errors"][command] = str(e)
+                    logger.warning(f"{host}: '{command}' failed: {e}")
+        record["status"] = "Success"
+    except Exception as e:
+        record["status"] = "Failed"
+        record["error"] = str(e)
+        logger.error(f"Failed to collect {host}: {e}")
+    record["collected_at"] = datetime.now().isoformat(sep=" ", timespec="seconds")
+    record["seconds"] = round(time.perf_counter() - start, 2)
+    return host, record
+
+
+def collect_snapshot(devices, username, password, secret, workers=DEFAULT_WORKERS):
+    """Collect every device concurrently and return the snapshot dict."""
+    snapshot = {
+        "format": SNAPSHOT_FORMAT,
+        "schema": SNAPSHOT_SCHEMA,
+        "snapshot_id": datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "created": datetime.now().isoformat(sep=" ", timespec="seconds"),
+        "command_sets": COMMAND_SETS,
+        "devices": {},
+    }
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(collect_device, d, username, password, secret) for d in devices]
+        for done, future in enumerate(as_completed(futures), 1):
+            host, record = future.result()
+            snapshot["devices"][host] = record
+            print(f"  [{done}/{len(devices)}] {host}: {record['status']} ({record['seconds']}s)")
+    return snapshot
+
+
+def main():
+    from tools import get_netmiko_creds, getScriptName, setupLogging
+
+    parser = argparse.ArgumentParser(description="Collect a fleet-wide command snapshot for offline reporting.")
+    parser.add_argument("device_file", nargs="?", help="File with hostname[,device_type[,ip]] per line")
+    parser.add_argument("-d", "--device", action="append", default=[], help="Device hostname/IP (repeatable)")
+    parser.add_argument("--device-type", default="cisco_nxos",
+                        help="Device type when not given in the file (default: cisco_nxos)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent SSH sessions (default: {DEFAULT_WORKERS})")
+    parser.add_argument("-o", "--output", help="Snapshot file (default: fleet_snapshot_<timestamp>.json.gz)")
+    args = parser.parse_args()
+
+    setupLogging()
+    devices = load_device_list(args.device_file, args.device_type) if args.device_file else []
+    devices += [{"host": h, "device_type": args.device_type, "ip": ""} for h in args.device]
+    if not devices:
+        parser.error("no devices given (device_file or -d)")
+
+    username, password, secret = get_netmiko_creds()
+    print(f"\nCollecting snapshot from {len(devices)} devices with {args.workers} workers")
+    start = time.perf_counter()
+    snapshot = collect_snapshot(devices, username, password, secret, workers=args.workers)
+
+    output = args.output or f"{getScriptName()}_{snapshot['snapshot_id']}.json.gz"
+    save_snapshot(snapshot, output)
+
+    ok = sum(1 for r in snapshot["devices"].values() if r["status"] == "Success")
+    print(f"\nSnapshot {snapshot['snapshot_id']}: {ok}/{len(devices)} devices "
+          f"in {time.perf_counter() - start:.1f}s -> {output}")
+    logger.info(f"Snapshot saved: {output}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
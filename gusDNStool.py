@@ -3,12 +3,22 @@
 DNS Performance Testing Tool for SD-WAN/Network Engineers
 
 Features:
-- Configurable requests per second (RPS) rate limiting
+- Open-loop load: queries are issued on a fixed schedule (token bucket
+  with catch-up) whether or not earlier ones have been answered, and
+  latency is measured from each query's intended send time, so a slow
+  server or a saturated client shows up in the numbers instead of
+  silently lowering the rate (no coordinated omission)
 - Multi-threaded worker supportdns_perf_test.py
+- Asyncio engine (--engine asyncio): thousands of outstanding queries
+  per event loop over a few UDP sockets, matched by query ID, with a
+  timer wheel for timeouts; --processes runs one loop per CPU core
 - Detailed timestamps and logging
 - Support for local or remote domain lists
 - Comprehensive error classification
 - Real-time statistics display
+- Constant-memory latency statistics: per-worker HDR-style histograms
+  (p50/p90/p99/p99.9/max), plus a per-second time series CSV of rate,
+  latency and errors
 - Portable - single Python file with minimal dependencies
 
 Usage:
@@ -17,6 +27,13 @@ Usage:
 """
 
 import argparse
+import asyncio
+import csv
+import math
+import multiprocessing
+import os
+import socket
+import struct
 import dns.resolver
 import dns.exception
 import time
@@ -26,9 +43,29 @@ import sys
 import urllib.request
 import random
 from datetime import datetime
-from collections import defaultdict, Counter
+from collections import Counter
 from pathlib import Path
 
+SCHED_QUANTUM = 0.0002      # feeder sleeps at least this long; due queries go out in a batch
+CATCH_UP_SECONDS = 1.0      # overdue queries older than this are skipped, not burst out
+HIST_SUB_BITS = 11          # latency histogram: 2048 sub-buckets, ~0.1% resolution
+HIST_SUB_BUCKETS = 1 << HIST_SUB_BITS
+HIST_HALF = HIST_SUB_BUCKETS // 2
+TIMESERIES_GRACE = 2        # seconds before a time-series row is written
+DEFAULT_SOCKETS = 4         # asyncio engine: UDP sockets per event loop
+IDS_PER_SOCKET = 32768      # outstanding queries per socket before another is used
+TIMER_TICK = 0.01           # asyncio engine timer wheel resolution
+LOG_FLUSH_INTERVAL = 0.2    # asyncio engine: seconds between batched log writes
+STATS_INTERVAL = 0.5        # seconds between stats deltas from engine processes
+RECV_BUFFER = 4 << 20       # SO_RCVBUF for engine sockets, so reply bursts are not dropped
+QUERY_HEADER = struct.Struct('>HHHHHH')
+
+# Result type -> get_stats() counter
+RESULT_KEYS = {
+    'SUCCESS': 'successful', 'TIMEOUT': 'timeout', 'NXDOMAIN': 'nxdomain',
+    'SERVFAIL': 'servfail', 'REFUSED': 'refused', 'NODATA': 'nodata', 'NETWORK': 'network',
+}
+
 # Default domain list for testing (Top Alexa domains)
 DEFAULT_DOMAINS = [
     'google.com', 'youtube.com', 'facebook.com', 'baidu.com', 'wikipedia.org',
@@ -43,100 +80,318 @@ DEFAULT_DOMAINS = [
     'dell.com', 'samsung.com', 'huawei.com', 'aliexpress.com', 'booking.com'
 ]
 
-class DNSStats:
-    """Thread-safe statistics collector"""
+class LatencyHistogram:
+    """HDR-style log-bucketed histogram of latencies in microseconds
+
+    Values below HIST_SUB_BUCKETS are counted exactly.  Above that, each
+    power of two is split into HIST_SUB_BUCKETS / 2 buckets, so reported
+    percentiles are within 0.1% of the true value.  Memory depends on the
+    range of latencies seen, not on how many were recorded.  Histograms
+    from different workers (or processes) add up with merge().
+    """
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
     def __init__(self):
-        self.lock = threading.Lock()
-        self.total_queries = 0
-        self.successful = 0
-        self.failed = 0
-        self.timeout = 0
-        self.nxdomain = 0
-        self.servfail = 0
-        self.refused = 0
-        self.nodata = 0
-        self.network_error = 0
-        self.other_errors = 0
-        self.response_times = []
+        self.counts = {}        # bucket index -> count
+        self.count = 0
+        self.total = 0          # us, for an exact mean
+        self.min = None
+        self.max = 0
+
+    def record(self, value_us):
+        v = int(value_us) if value_us > 0 else 0
+        if v < HIST_SUB_BUCKETS:
+            i = v
+        else:
+            shift = v.bit_length() - HIST_SUB_BITS
+            i = HIST_SUB_BUCKETS + (shift - 1) * HIST_HALF + (v >> shift) - HIST_HALF
+        counts = self.counts
+        counts[i] = counts.get(i, 0) + 1
+        self.count += 1
+        self.total += v
+        if v > self.max:
+            self.max = v
+        if self.min is None or v < self.min:
+            self.min = v
+
+    @staticmethod
+    def bucket_value(i):
+        """Midpoint of bucket i, in us"""
+        if i < HIST_SUB_BUCKETS:
+            return i
+        shift, m = divmod(i - HIST_SUB_BUCKETS, HIST_HALF)
+        shift += 1
+        m += HIST_HALF
+        return ((m << shift) + ((m + 1) << shift) - 1) / 2
+
+    def merge(self, other):
+        counts = self.counts
+        for i, n in other.counts.copy().items():
+            counts[i] = counts.get(i, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        return self
+
+    def percentiles(self, ps):
+        """Values (us) at each percentile in ps, in one pass over the buckets"""
+        if not self.count:
+            return [0] * len(ps)
+        ranks = [max(1, math.ceil(p / 100.0 * self.count)) for p in ps]
+        order = sorted(range(len(ps)), key=lambda k: ranks[k])
+        out = [self.max] * len(ps)
+        seen = 0
+        pending = iter(order)
+        k = next(pending)
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            while k is not None and seen >= ranks[k]:
+                out[k] = min(self.bucket_value(i), self.max)
+                k = next(pending, None)
+            if k is None:
+                break
+        return out
+
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+
+def _result_key(result):
+    """Map a recorded result type onto the get_stats() counter names"""
+    return RESULT_KEYS.get(result, 'other')
+
+
+class StatsRecorder:
+    """One worker's statistics; only the owning thread writes to it"""
+    def __init__(self, origin):
+        self.origin = origin            # time.monotonic() at test start
+        self.results = Counter()        # get_stats() key -> count
+        self.total = 0
+        self.latency = LatencyHistogram()   # successful queries
         self.error_details = Counter()
+        self.queue_delay_total = 0.0    # ms between intended send and a worker picking it up
+        self.queue_delay_max = 0.0
+        self.seconds = {}               # second since origin -> (Counter, LatencyHistogram)
+
+    def record(self, result, response_time=None, queue_delay=0.0, detail=None):
+        key = _result_key(result)
+        self.results[key] += 1
+        self.total += 1
+        self.queue_delay_total += queue_delay
+        if queue_delay > self.queue_delay_max:
+            self.queue_delay_max = queue_delay
+        sec = int(time.monotonic() - self.origin)
+        bucket = self.seconds.get(sec)
+        if bucket is None:
+            bucket = self.seconds[sec] = (Counter(), LatencyHistogram())
+        bucket[0][key] += 1
+        if response_time is not None:
+            us = response_time * 1000
+            self.latency.record(us)
+            bucket[1].record(us)
+        if detail is not None:
+            self.error_details[f"{result}: {detail}"] += 1
+
+    def merge(self, other):
+        """Add another recorder's counts (e.g. a delta from an engine process)"""
+        self.results.update(other.results)
+        self.total += other.total
+        self.latency.merge(other.latency)
+        self.error_details.update(other.error_details)
+        self.queue_delay_total += other.queue_delay_total
+        self.queue_delay_max = max(self.queue_delay_max, other.queue_delay_max)
+        for sec, (results, latency) in other.seconds.items():
+            bucket = self.seconds.get(sec)
+            if bucket is None:
+                self.seconds[sec] = (Counter(results), LatencyHistogram().merge(latency))
+            else:
+                bucket[0].update(results)
+                bucket[1].merge(latency)
+        return self
+
+
+class DNSStats:
+    """Statistics merged from per-worker recorders
+
+    Each thread records into its own StatsRecorder, so nothing on the
+    query path takes a shared lock; get_stats() merges the recorders when
+    asked.  Recorders from other processes can be added with
+    add_recorder().
+    """
+    def __init__(self):
+        self.lock = threading.Lock()    # guards the recorder list only
+        self.recorders = []
+        self._local = threading.local()
+        self.origin = time.monotonic()
         self.start_time = None
         self.end_time = None
-        
-    def record_success(self, response_time):
+
+    def recorder(self):
+        """The calling thread's StatsRecorder"""
+        rec = getattr(self._local, 'recorder', None)
+        if rec is None:
+            rec = self._local.recorder = self.add_recorder(StatsRecorder(self.origin))
+        return rec
+
+    def add_recorder(self, rec):
         with self.lock:
-            self.total_queries += 1
-            self.successful += 1
-            self.response_times.append(response_time)
+            self.recorders.append(rec)
+        return rec
+
+    def record_success(self, response_time, queue_delay=0.0):
+        self.recorder().record('SUCCESS', response_time, queue_delay)
     
-    def record_failure(self, error_type, error_detail):
-        with self.lock:
-            self.total_queries += 1
-            self.failed += 1
-            
-            if error_type == 'TIMEOUT':
-                self.timeout += 1
-            elif error_type == 'NXDOMAIN':
-                self.nxdomain += 1
-            elif error_type == 'SERVFAIL':
-                self.servfail += 1
-            elif error_type == 'REFUSED':
-                self.refused += 1
-            elif error_type == 'NODATA':
-                self.nodata += 1
-            elif error_type == 'NETWORK':
-                self.network_error += 1
-            else:
-                self.other_errors += 1
-            
-            self.error_details[f"{error_type}: {error_detail}"] += 1
+    def record_failure(self, error_type, error_detail, queue_delay=0.0):
+        self.recorder().record(error_type, None, queue_delay, error_detail)
+
+    @property
+    def total_queries(self):
+        return sum(rec.total for rec in list(self.recorders))
     
     def get_stats(self):
         with self.lock:
-            if self.response_times:
-                sorted_times = sorted(self.response_times)
-                avg_time = sum(self.response_times) / len(self.response_times)
-                min_time = min(self.response_times)
-                max_time = max(self.response_times)
-                p50 = sorted_times[len(sorted_times) // 2]
-                p95 = sorted_times[int(len(sorted_times) * 0.95)]
-                p99 = sorted_times[int(len(sorted_times) * 0.99)]
-            else:
-                avg_time = min_time = max_time = p50 = p95 = p99 = 0
-            
-            elapsed = (self.end_time or time.time()) - (self.start_time or time.time())
-            qps = self.total_queries / elapsed if elapsed > 0 else 0
-            
-            return {
-                'total': self.total_queries,
-                'successful': self.successful,
-                'failed': self.failed,
-                'success_rate': (self.successful / self.total_queries * 100) if self.total_queries > 0 else 0,
-                'timeout': self.timeout,
-                'nxdomain': self.nxdomain,
-                'servfail': self.servfail,
-                'refused': self.refused,
-                'nodata': self.nodata,
-                'network': self.network_error,
-                'other': self.other_errors,
-                'avg_time': avg_time,
-                'min_time': min_time,
-                'max_time': max_time,
-                'p50_time': p50,
-                'p95_time': p95,
-                'p99_time': p99,
-                'elapsed': elapsed,
-                'qps': qps,
-                'error_details': dict(self.error_details.most_common(10))
-            }
+            recorders = list(self.recorders)
+        results = Counter()
+        latency = LatencyHistogram()
+        error_details = Counter()
+        queue_delay_total = queue_delay_max = 0.0
+        for rec in recorders:
+            results.update(rec.results.copy())
+            latency.merge(rec.latency)
+            error_details.update(rec.error_details.copy())
+            queue_delay_total += rec.queue_delay_total
+            queue_delay_max = max(queue_delay_max, rec.queue_delay_max)
+        total = sum(results.values())
+        successful = results['successful']
+        p50, p90, p95, p99, p999 = (v / 1000 for v in latency.percentiles((50, 90, 95, 99, 99.9)))
+        
+        elapsed = (self.end_time or time.time()) - (self.start_time or time.time())
+        qps = total / elapsed if elapsed > 0 else 0
+        
+        return {
+            'total': total,
+            'successful': successful,
+            'failed': total - successful,
+            'success_rate': (successful / total * 100) if total > 0 else 0,
+            'timeout': results['timeout'],
+            'nxdomain': results['nxdomain'],
+            'servfail': results['servfail'],
+            'refused': results['refused'],
+            'nodata': results['nodata'],
+            'network': results['network'],
+            'other': results['other'],
+            'avg_time': latency.mean() / 1000,
+            'min_time': (latency.min or 0) / 1000,
+            'max_time': latency.max / 1000,
+            'p50_time': p50,
+            'p90_time': p90,
+            'p95_time': p95,
+            'p99_time': p99,
+            'p999_time': p999,
+            'elapsed': elapsed,
+            'qps': qps,
+            'queue_delay_avg': queue_delay_total / total if total else 0,
+            'queue_delay_max': queue_delay_max,
+            'error_details': dict(error_details.most_common(10))
+        }
+
+class TimeSeriesWriter:
+    """Per-second rate, latency and error counts, written to CSV as each second closes
+
+    Seconds are by completion time.  A second is written once it is
+    TIMESERIES_GRACE seconds old (so workers have finished recording into
+    it) and then dropped from the recorders, keeping memory constant.
+    """
+    FIELDS = ['second', 'timestamp', 'completed', 'successful', 'failed',
+              'timeout', 'nxdomain', 'servfail', 'refused', 'nodata', 'network', 'other',
+              'avg_ms', 'p50_ms', 'p90_ms', 'p99_ms', 'p999_ms', 'max_ms']
+
+    def __init__(self, path, stats):
+        self.path = path
+        self.stats = stats
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.FIELDS)
+        self.next_second = 0
+
+    def flush(self, final=False):
+        now = int(time.monotonic() - self.stats.origin)
+        with self.stats.lock:
+            recorders = list(self.stats.recorders)
+        if final:
+            last = max([now] + [max(rec.seconds, default=0) for rec in recorders]) + 1
+        else:
+            last = now - TIMESERIES_GRACE
+        for sec in range(self.next_second, last):
+            results = Counter()
+            latency = LatencyHistogram()
+            for rec in recorders:
+                bucket = rec.seconds.pop(sec, None)
+                if bucket is not None:
+                    results.update(bucket[0])
+                    latency.merge(bucket[1])
+            completed = sum(results.values())
+            stamp = datetime.fromtimestamp((self.stats.start_time or 0) + sec)
+            p50, p90, p99, p999 = (v / 1000 for v in latency.percentiles((50, 90, 99, 99.9)))
+            self.writer.writerow([
+                sec, stamp.strftime('%Y-%m-%d %H:%M:%S'), completed, results['successful'],
+                completed - results['successful'], results['timeout'], results['nxdomain'],
+                results['servfail'], results['refused'], results['nodata'], results['network'],
+                results['other'], f"{latency.mean() / 1000:.3f}", f"{p50:.3f}", f"{p90:.3f}",
+                f"{p99:.3f}", f"{p999:.3f}", f"{latency.max / 1000:.3f}",
+            ])
+        self.next_second = max(self.next_second, last)
+        self.file.flush()
+
+    def close(self):
+        self.flush(final=True)
+        self.file.close()
+
+class ScheduleStats:
+    """What the open-loop feeder was asked to do and what it managed"""
+    def __init__(self, target_rate, duration):
+        self.target_rate = target_rate
+        self.duration = duration
+        self.scheduled = int(target_rate * duration)
+        self.issued = 0         # handed to the workers
+        self.skipped = 0        # overdue by more than CATCH_UP_SECONDS
+        self.dropped = 0        # work queue full: workers cannot keep up
+        self.lag_total = 0.0    # seconds the feeder was late, summed over issued queries
+        self.lag_max = 0.0
+        self.first_send = None
+        self.last_send = None
+
+    def achieved_rate(self):
+        if not self.issued or self.last_send is None or self.last_send <= self.first_send:
+            return 0.0
+        # n sends span n-1 intervals
+        return (self.issued - 1) / (self.last_send - self.first_send)
+
+    def lag_avg_ms(self):
+        return self.lag_total / self.issued * 1000 if self.issued else 0.0
+
+    def merge(self, other):
+        """Add an engine process's share of this schedule (scheduled is already the total)"""
+        self.issued += other.issued
+        self.skipped += other.skipped
+        self.dropped += other.dropped
+        self.lag_total += other.lag_total
+        self.lag_max = max(self.lag_max, other.lag_max)
+        if other.first_send is not None:
+            self.first_send = other.first_send if self.first_send is None else min(self.first_send, other.first_send)
+            self.last_send = other.last_send if self.last_send is None else max(self.last_send, other.last_send)
 
 class DNSWorker(threading.Thread):
     """Worker thread for DNS queries"""
-    def __init__(self, worker_id, work_queue, stats, dns_server, timeout, log_file):
+    def __init__(self, worker_id, work_queue, stats, dns_server, timeout, log_file, port=53):
         super().__init__(daemon=True)
         self.worker_id = worker_id
         self.work_queue = work_queue
         self.stats = stats
         self.dns_server = dns_server
+        self.port = port
         self.timeout = timeout
         self.log_file = log_file
         self.resolver = None
@@ -146,6 +401,7 @@ class DNSWorker(threading.Thread):
         """Setup DNS resolver for this worker"""
         self.resolver = dns.resolver.Resolver()
         self.resolver.nameservers = [self.dns_server]
+        self.resolver.port = self.port
         self.resolver.timeout = self.timeout
         self.resolver.lifetime = self.timeout
         
@@ -154,11 +410,12 @@ class DNSWorker(threading.Thread):
         
         while self.running:
             try:
-                domain = self.work_queue.get(timeout=0.1)
-                if domain is None:  # Poison pill to stop worker
+                item = self.work_queue.get(timeout=0.1)
+                if item is None:  # Poison pill to stop worker
                     break
                 
-                self.query_domain(domain)
+                domain, intended = item
+                self.query_domain(domain, intended)
                 self.work_queue.task_done()
                 
             except queue.Empty:
@@ -166,54 +423,61 @@ class DNSWorker(threading.Thread):
             except Exception as e:
                 print(f"Worker {self.worker_id} error: {e}")
     
-    def query_domain(self, domain):
-        """Perform DNS query and record results"""
+    def query_domain(self, domain, intended=None):
+        """Perform DNS query and record results
+
+        `intended` is the perf_counter() time the scheduler meant the query
+        to go out; response times are measured from it, so time spent
+        waiting for a free worker counts as latency.
+        """
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-        start_time = time.time()
+        dequeued = time.perf_counter()
+        start_time = dequeued if intended is None else intended
+        queue_delay = (dequeued - start_time) * 1000
         
         try:
             answer = self.resolver.resolve(domain, 'A')
-            response_time = (time.time() - start_time) * 1000  # Convert to ms
+            response_time = (time.perf_counter() - start_time) * 1000  # Convert to ms
             
             ip_addresses = [str(rdata) for rdata in answer]
             result = 'SUCCESS'
             detail = f"Resolved to {', '.join(ip_addresses)}"
             
-            self.stats.record_success(response_time)
+            self.stats.record_success(response_time, queue_delay)
             
             # Log success
             log_line = f"{timestamp} | Worker-{self.worker_id:02d} | {domain:40s} | {result:10s} | {response_time:7.2f}ms | {detail}\n"
             
         except dns.resolver.NXDOMAIN as e:
-            response_time = (time.time() - start_time) * 1000
+            response_time = (time.perf_counter() - start_time) * 1000
             result = 'NXDOMAIN'
             detail = 'Domain not found'
-            self.stats.record_failure('NXDOMAIN', detail)
+            self.stats.record_failure('NXDOMAIN', detail, queue_delay)
             log_line = f"{timestamp} | Worker-{self.worker_id:02d} | {domain:40s} | {result:10s} | {response_time:7.2f}ms | {detail}\n"
             
         except dns.resolver.Timeout as e:
-            response_time = (time.time() - start_time) * 1000
+            response_time = (time.perf_counter() - start_time) * 1000
             result = 'TIMEOUT'
             detail = f'Query timeout after {self.timeout}s'
-            self.stats.record_failure('TIMEOUT', detail)
+            self.stats.record_failure('TIMEOUT', detail, queue_delay)
             log_line = f"{timestamp} | Worker-{self.worker_id:02d} | {domain:40s} | {result:10s} | {response_time:7.2f}ms | {detail}\n"
             
         except dns.resolver.NoAnswer as e:
-            response_time = (time.time() - start_time) * 1000
+            response_time = (time.perf_counter() - start_time) * 1000
             result = 'NODATA'
             detail = 'No A records found'
-            self.stats.record_failure('NODATA', detail)
+            self.stats.record_failure('NODATA', detail, queue_delay)
             log_line = f"{timestamp} | Worker-{self.worker_id:02d} | {domain:40s} | {result:10s} | {response_time:7.2f}ms | {detail}\n"
             
         except dns.resolver.NoNameservers as e:
-            response_time = (time.time() - start_time) * 1000
+            response_time = (time.perf_counter() - start_time) * 1000
             result = 'SERVFAIL'
             detail = 'All nameservers failed (SERVFAIL or network issue)'
-            self.stats.record_failure('SERVFAIL', detail)
+            self.stats.record_failure('SERVFAIL', detail, queue_delay)
             log_line = f"{timestamp} | Worker-{self.worker_id:02d} | {domain:40s} | {result:10s} | {response_time:7.2f}ms | {detail}\n"
             
         except dns.exception.DNSException as e:
-            response_time = (time.time() - start_time) * 1000
+            response_time = (time.perf_counter() - start_time) * 1000
             result = 'DNS_ERROR'
             detail = str(e)
             
@@ -225,14 +489,14 @@ class DNSWorker(threading.Thread):
             else:
                 error_type = 'OTHER'
             
-            self.stats.record_failure(error_type, detail)
+            self.stats.record_failure(error_type, detail, queue_delay)
             log_line = f"{timestamp} | Worker-{self.worker_id:02d} | {domain:40s} | {result:10s} | {response_time:7.2f}ms | {detail}\n"
             
         except Exception as e:
-            response_time = (time.time() - start_time) * 1000
+            response_time = (time.perf_counter() - start_time) * 1000
             result = 'ERROR'
             detail = str(e)
-            self.stats.record_failure('NETWORK', detail)
+            self.stats.record_failure('NETWORK', detail, queue_delay)
             log_line = f"{timestamp} | Worker-{self.worker_id:02d} | {domain:40s} | {result:10s} | {response_time:7.2f}ms | {detail}\n"
         
         # Write to log file and stdout
@@ -241,7 +505,7 @@ class DNSWorker(threading.Thread):
             self.log_file.flush()
         
         # Print to console (with less verbosity for high rates)
-        if self.stats.total_queries % 100 == 0 or result != 'SUCCESS':
+        if self.stats.recorder().total % 100 == 0 or result != 'SUCCESS':
             print(log_line.rstrip())
 
 def load_domains(domains_source):
@@ -280,23 +544,422 @@ def load_domains(domains_source):
     
     return domains
 
-def rate_limited_feeder(work_queue, domains, target_rate, duration):
-    """Feed work queue at specified rate"""
-    interval = 1.0 / target_rate  # Time between queries
-    end_time = time.time() + duration
-    query_count = 0
+def open_loop_feeder(work_queue, domains, schedule):
+    """Issue queries on a fixed open-loop schedule (token bucket with catch-up)
+
+    Query i is due at start + i / rate.  The feeder wakes at most every
+    SCHED_QUANTUM, hands out every query that has come due since the last
+    wake-up (each stamped with its own intended send time) and sleeps
+    until the next one is due.  Late wake-ups are caught up on rather than
+    stretching the schedule, so the achieved rate does not drift below
+    the target; only queries more than CATCH_UP_SECONDS overdue are
+    skipped (counted in schedule.skipped).  A full work queue never
+    blocks the schedule: the query is counted in schedule.dropped.
+    """
+    rate = schedule.target_rate
+    interval = 1.0 / rate
+    burst = max(1, int(rate * CATCH_UP_SECONDS))
+    total = schedule.scheduled
+    choice = random.choice
+    put = work_queue.put_nowait
     
-    print(f"Starting DNS queries at {target_rate} requests/second for {duration} seconds")
+    print(f"Starting DNS queries at {rate} requests/second for {schedule.duration} seconds")
     
-    while time.time() < end_time:
-        domain = random.choice(domains)  # Random selection from domain list
-        work_queue.put(domain)
-        query_count += 1
+    start = time.perf_counter()
+    issued = 0
+    while issued < total:
+        now = time.perf_counter()
+        due = min(total, int((now - start) * rate) + 1)
+        if due - issued > burst:
+            schedule.skipped += due - issued - burst
+            issued = due - burst
+        for i in range(issued, due):
+            intended = start + i * interval
+            try:
+                put((choice(domains), intended))
+            except queue.Full:
+                schedule.dropped += 1
+                continue
+            lag = now - intended
+            schedule.lag_total += lag
+            if lag > schedule.lag_max:
+                schedule.lag_max = lag
+            if schedule.first_send is None:
+                schedule.first_send = now
+            schedule.last_send = now
+            schedule.issued += 1
+        issued = due
         
-        # Sleep to maintain rate
-        time.sleep(interval)
+        # Sleep until the next query is due
+        delay = start + issued * interval - time.perf_counter()
+        time.sleep(max(delay, SCHED_QUANTUM))
     
-    print(f"\nQueued {query_count} total queries")
+    print(f"\nQueued {schedule.issued} total queries")
+
+class TimerWheel:
+    """Hashed timer wheel: a ring of TIMER_TICK slots covering the query timeout
+
+    Adding a timer is a list append and cancelling is setting the entry's
+    `done` flag (it is dropped when its slot comes round), so there is no
+    per-query timer handle or heap operation as with loop.call_later().
+    Entries need `deadline` and `done` attributes.
+    """
+    def __init__(self, span, origin, tick=TIMER_TICK):
+        self.tick = tick
+        self.origin = origin
+        self.slots = [[] for _ in range(int(span / tick) + 3)]
+        self.current = 0        # next tick to expire
+
+    def add(self, entry):
+        t = max(self.current, math.ceil((entry.deadline - self.origin) / self.tick))
+        self.slots[t % len(self.slots)].append(entry)
+
+    def expire(self, now):
+        """Entries whose deadline has passed and that are not done yet"""
+        expired = []
+        last = int((now - self.origin) / self.tick)
+        n = len(self.slots)
+        while self.current <= last:
+            slot = self.slots[self.current % n]
+            if slot:
+                keep = []
+                for entry in slot:
+                    if entry.done:
+                        continue
+                    if entry.deadline <= now:
+                        expired.append(entry)
+                    else:
+                        keep.append(entry)     # wrapped: not due until the wheel comes round again
+                self.slots[self.current % n] = keep
+            self.current += 1
+        return expired
+
+
+class PendingQuery:
+    """One query sent by the asyncio engine and not yet answered"""
+    __slots__ = ('domain', 'qid', 'question', 'channel', 'intended', 'sent', 'deadline', 'done')
+
+    def __init__(self, domain, qid, question, channel, intended, sent, deadline):
+        self.domain = domain
+        self.qid = qid
+        self.question = question    # (wire bytes, lower-cased wire bytes)
+        self.channel = channel
+        self.intended = intended    # perf_counter() time the schedule meant it to go out
+        self.sent = sent
+        self.deadline = deadline
+        self.done = False
+
+
+def encode_question(domain):
+    """Question section of an A query for domain, as (wire, lower-cased wire)"""
+    wire = b''
+    for label in domain.rstrip('.').encode('idna').split(b'.'):
+        if not 0 < len(label) < 64:
+            raise ValueError(f"Invalid label in {domain!r}")
+        wire += bytes([len(label)]) + label
+    wire += b'\0' + struct.pack('>HH', 1, 1)     # QTYPE A, QCLASS IN
+    return wire, wire.lower()
+
+
+def _skip_name(data, pos):
+    while True:
+        length = data[pos]
+        if length == 0:
+            return pos + 1
+        if length & 0xC0 == 0xC0:
+            return pos + 2
+        pos += length + 1
+
+
+def parse_response(data, question_length):
+    """(rcode, truncated, [A record addresses]) from a reply to a one-question query"""
+    flags, ancount = struct.unpack_from('>H2xH', data, 2)
+    pos = 12 + question_length
+    addresses = []
+    for _ in range(ancount):
+        pos = _skip_name(data, pos)
+        rtype, rdlength = struct.unpack_from('>H6xH', data, pos)
+        pos += 10
+        if rtype == 1 and rdlength == 4:
+            addresses.append(socket.inet_ntoa(data[pos:pos + 4]))
+        pos += rdlength
+    return flags & 0xF, bool(flags & 0x200), addresses
+
+
+class UDPChannel(asyncio.DatagramProtocol):
+    """One UDP socket of the asyncio engine; replies are matched by query ID"""
+    def __init__(self, engine, channel_id):
+        self.engine = engine
+        self.channel_id = channel_id
+        self.transport = None
+        self.pending = {}       # query ID -> PendingQuery
+
+    def connection_made(self, transport):
+        self.transport = transport
+        sock = transport.get_extra_info('socket')
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER)
+        except (OSError, AttributeError):
+            pass
+
+    def datagram_received(self, data, addr):
+        if len(data) < 12 or not data[2] & 0x80:
+            return
+        query = self.pending.get((data[0] << 8) | data[1])
+        if query is None:
+            return
+        question = query.question[1]
+        if data[12:12 + len(question)].lower() != question:
+            return      # late answer to an earlier query that used the same ID
+        del self.pending[query.qid]
+        query.done = True
+        self.engine.answered(query, data)
+
+    def error_received(self, exc):
+        # ICMP errors cannot be tied to a query; those queries time out
+        pass
+
+
+class AsyncDNSEngine:
+    """Open-loop DNS load from one event loop over a small pool of UDP sockets
+
+    Engine k of n sends queries k, k + n, k + 2n, ... of the schedule, so
+    n engines in separate processes interleave into the full rate.  Each
+    query gets a random ID that is free on its socket and the reply is
+    matched on ID and question; thousands can be outstanding at once.
+    Timeouts are handled by a TimerWheel ticking every TIMER_TICK, and a
+    truncated reply is retried over TCP within the same deadline.
+
+    Results go into `recorder` (a StatsRecorder) and the log, in the same
+    format as DNSWorker; log lines are appended in batches with O_APPEND
+    so several processes can share the file.  If `report` is given it is
+    called every STATS_INTERVAL with the recorder, which is then replaced
+    by a fresh one (used to ship deltas from child processes).
+    """
+    def __init__(self, engine_id, engines, domains, args, schedule, recorder, report=None):
+        self.engine_id = engine_id
+        self.engines = engines
+        self.domains = domains
+        self.server = args.server
+        self.port = args.port
+        self.timeout = args.timeout
+        self.log_path = args.output
+        self.schedule = schedule
+        self.recorder = recorder
+        self.report = report
+        # Enough sockets that IDs stay sparse at rate * timeout outstanding queries
+        outstanding = args.rate / engines * args.timeout
+        self.socket_count = max(args.sockets, math.ceil(outstanding / IDS_PER_SOCKET))
+        self.channels = []
+        self.next_channel = 0
+        self.questions = {}     # domain -> encode_question(domain)
+        self.outstanding = 0
+        self.completed = 0
+        self.log_lines = []
+        self.log_fd = None
+        self.tasks = set()
+
+    async def run(self, start=None):
+        loop = asyncio.get_running_loop()
+        for i in range(self.socket_count):
+            channel_id = self.engine_id * self.socket_count + i
+            _, channel = await loop.create_datagram_endpoint(
+                lambda channel_id=channel_id: UDPChannel(self, channel_id),
+                remote_addr=(self.server, self.port))
+            self.channels.append(channel)
+        if self.log_path:
+            self.log_fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND)
+
+        now = time.perf_counter()
+        if start is None:
+            start = now
+        self.wall_offset = time.time() - now
+        self.wheel = TimerWheel(self.timeout, now)
+        self.next_flush = now + LOG_FLUSH_INTERVAL
+        self.next_report = now + STATS_INTERVAL
+        self.ticker = loop.call_later(TIMER_TICK, self._tick)
+        try:
+            await self._schedule(start)
+            while self.outstanding:
+                await asyncio.sleep(TIMER_TICK)
+        finally:
+            self.ticker.cancel()
+            for channel in self.channels:
+                channel.transport.close()
+            self._flush_log()
+            if self.log_fd is not None:
+                os.close(self.log_fd)
+            if self.report:
+                self.report(self.recorder)
+
+    async def _schedule(self, start):
+        """The open_loop_feeder() algorithm, for this engine's share of the queries"""
+        schedule = self.schedule
+        rate = schedule.target_rate / self.engines
+        interval = 1.0 / rate
+        first = start + self.engine_id / schedule.target_rate
+        burst = max(1, int(rate * CATCH_UP_SECONDS))
+        total = schedule.scheduled
+        choice = random.choice
+        domains = self.domains
+        send = self._send
+
+        issued = 0
+        while issued < total:
+            now = time.perf_counter()
+            elapsed = now - first
+            due = 0 if elapsed < 0 else min(total, int(elapsed * rate) + 1)
+            if due - issued > burst:
+                schedule.skipped += due - issued - burst
+                issued = due - burst
+            for i in range(issued, due):
+                intended = first + i * interval
+                if not send(choice(domains), intended, now):
+                    schedule.dropped += 1
+                    continue
+                lag = now - intended
+                schedule.lag_total += lag
+                if lag > schedule.lag_max:
+                    schedule.lag_max = lag
+                if schedule.first_send is None:
+                    schedule.first_send = now
+                schedule.last_send = now
+                schedule.issued += 1
+            issued = max(issued, due)
+
+            delay = first + issued * interval - time.perf_counter()
+            await asyncio.sleep(max(delay, SCHED_QUANTUM))
+
+    def _send(self, domain, intended, now):
+        """Send one query; False if every socket is out of free IDs"""
+        question = self.questions.get(domain)
+        if question is None:
+            try:
+                question = self.questions[domain] = encode_question(domain)
+            except (ValueError, UnicodeError) as e:
+                self.outstanding += 1
+                query = PendingQuery(domain, 0, None, None, intended, now, now)
+                self._finish(query, 'DNS_ERROR', str(e), 'OTHER')
+                return True
+
+        channels = self.channels
+        for _ in range(len(channels)):
+            channel = channels[self.next_channel]
+            self.next_channel = (self.next_channel + 1) % len(channels)
+            if len(channel.pending) < IDS_PER_SOCKET:
+                break
+        else:
+            return False
+        pending = channel.pending
+        qid = random.getrandbits(16)
+        while qid in pending:
+            qid = random.getrandbits(16)
+        query = PendingQuery(domain, qid, question, channel, intended, now, now + self.timeout)
+        pending[qid] = query
+        self.outstanding += 1
+        channel.transport.sendto(QUERY_HEADER.pack(qid, 0x0100, 1, 0, 0, 0) + question[0])
+        self.wheel.add(query)
+        return True
+
+    def answered(self, query, data, tcp=False):
+        try:
+            rcode, truncated, addresses = parse_response(data, len(query.question[0]))
+        except (struct.error, IndexError):
+            self._finish(query, 'DNS_ERROR', 'Malformed response', 'OTHER')
+            return
+        if truncated and not tcp:
+            task = asyncio.ensure_future(self._tcp_retry(query))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        elif rcode == 0 and addresses:
+            self._finish(query, 'SUCCESS', f"Resolved to {', '.join(addresses)}")
+        elif rcode == 0:
+            self._finish(query, 'NODATA', 'No A records found', 'NODATA')
+        elif rcode == 3:
+            self._finish(query, 'NXDOMAIN', 'Domain not found', 'NXDOMAIN')
+        elif rcode == 2:
+            self._finish(query, 'SERVFAIL', 'All nameservers failed (SERVFAIL or network issue)', 'SERVFAIL')
+        elif rcode == 5:
+            self._finish(query, 'REFUSED', 'Query refused by server', 'REFUSED')
+        else:
+            self._finish(query, 'DNS_ERROR', f'Response code {rcode}', 'OTHER')
+
+    async def _tcp_retry(self, query):
+        """Repeat a truncated query over TCP, within the original deadline"""
+        message = QUERY_HEADER.pack(query.qid, 0x0100, 1, 0, 0, 0) + query.question[0]
+        writer = None
+        try:
+            async def exchange():
+                nonlocal writer
+                reader, writer = await asyncio.open_connection(self.server, self.port)
+                writer.write(struct.pack('>H', len(message)) + message)
+                await writer.drain()
+                length, = struct.unpack('>H', await reader.readexactly(2))
+                return await reader.readexactly(length)
+            data = await asyncio.wait_for(exchange(), max(query.deadline - time.perf_counter(), 0))
+        except asyncio.TimeoutError:
+            self._finish(query, 'TIMEOUT', f'Query timeout after {self.timeout}s', 'TIMEOUT')
+        except (OSError, asyncio.IncompleteReadError) as e:
+            self._finish(query, 'ERROR', str(e) or type(e).__name__, 'NETWORK')
+        else:
+            self.answered(query, data, tcp=True)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def _tick(self):
+        now = time.perf_counter()
+        for query in self.wheel.expire(now):
+            query.done = True
+            del query.channel.pending[query.qid]
+            self._finish(query, 'TIMEOUT', f'Query timeout after {self.timeout}s', 'TIMEOUT')
+        if now >= self.next_flush:
+            self._flush_log()
+            self.next_flush = now + LOG_FLUSH_INTERVAL
+        if self.report and now >= self.next_report:
+            self.report(self.recorder)
+            self.recorder = StatsRecorder(self.recorder.origin)
+            self.next_report = now + STATS_INTERVAL
+        self.ticker = asyncio.get_running_loop().call_later(TIMER_TICK, self._tick)
+
+    def _finish(self, query, result, detail, error_type=None):
+        """Record and log a completed query, as DNSWorker.query_domain() does"""
+        response_time = (time.perf_counter() - query.intended) * 1000
+        queue_delay = (query.sent - query.intended) * 1000
+        if error_type is None:
+            self.recorder.record('SUCCESS', response_time, queue_delay)
+        else:
+            self.recorder.record(error_type, None, queue_delay, detail)
+        self.outstanding -= 1
+        self.completed += 1
+
+        worker = query.channel.channel_id if query.channel else self.engine_id * self.socket_count
+        timestamp = datetime.fromtimestamp(self.wall_offset + query.sent).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+        log_line = f"{timestamp} | Worker-{worker:02d} | {query.domain:40s} | {result:10s} | {response_time:7.2f}ms | {detail}\n"
+        if self.log_fd is not None:
+            self.log_lines.append(log_line)
+        if self.completed % 100 == 0 or result != 'SUCCESS':
+            print(log_line.rstrip())
+
+    def _flush_log(self):
+        if self.log_lines and self.log_fd is not None:
+            os.write(self.log_fd, ''.join(self.log_lines).encode())
+        self.log_lines = []
+
+
+def _engine_process(engine_id, engines, domains, args, results, go, clock):
+    """Child process running one AsyncDNSEngine; see run_asyncio_engines()"""
+    schedule = ScheduleStats(args.rate, args.duration)
+    schedule.scheduled = len(range(engine_id, schedule.scheduled, engines))
+    results.put(('ready', engine_id, None))
+    go.wait()
+    start, origin = clock[0], clock[1]
+    engine = AsyncDNSEngine(engine_id, engines, domains, args, schedule, StatsRecorder(origin),
+                            report=lambda recorder: results.put(('stats', engine_id, recorder)))
+    try:
+        asyncio.run(engine.run(start))
+    finally:
+        results.put(('done', engine_id, schedule))
 
 def print_stats_header():
     """Print statistics header"""
@@ -310,7 +973,13 @@ def print_live_stats(stats):
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     print(f"{timestamp:<20} | {s['total']:>8} | {s['successful']:>8} | {s['failed']:>8} | {s['success_rate']:>6.1f}% | {s['qps']:>7.1f} | {s['avg_time']:>7.2f} | {s['p95_time']:>7.2f}")
 
-def print_final_report(stats, args, log_filename):
+def describe_workers(args):
+    if args.engine == 'asyncio':
+        loops = 'event loop' if args.processes == 1 else 'event loop processes'
+        return f"asyncio, {args.processes} {loops} x {args.sockets} UDP sockets"
+    return f"{args.threads} threads"
+
+def print_final_report(stats, args, log_filename, schedule=None, timeseries_filename=None):
     """Print comprehensive final report"""
     s = stats.get_stats()
     
@@ -320,9 +989,9 @@ def print_final_report(stats, args, log_filename):
     
     print("\nTest Configuration:")
     print(f"  DNS Server:        {args.server}")
-    print(f"  Target Rate:       {args.rate} queries/second")
+    print(f"  Target Rate:       {args.rate} queries/second (open loop)")
     print(f"  Duration:          {args.duration} seconds")
-    print(f"  Worker Threads:    {args.threads}")
+    print(f"  Workers:           {describe_workers(args)}")
     print(f"  Query Timeout:     {args.timeout} seconds")
     print(f"  Domain Source:     {args.domains}")
     
@@ -333,13 +1002,30 @@ def print_final_report(stats, args, log_filename):
     print(f"  Actual QPS:        {s['qps']:.2f}")
     print(f"  Test Duration:     {s['elapsed']:.2f} seconds")
     
-    print("\nResponse Times (milliseconds):")
+    if schedule is not None:
+        achieved = schedule.achieved_rate()
+        print("\nLoad Accuracy:")
+        print(f"  Scheduled:         {schedule.scheduled} queries at {schedule.target_rate} QPS")
+        print(f"  Issued:            {schedule.issued} "
+              f"({schedule.issued / schedule.scheduled * 100 if schedule.scheduled else 0:.2f}% of schedule)")
+        print(f"  Achieved Rate:     {achieved:.2f} QPS "
+              f"({(achieved - schedule.target_rate) / schedule.target_rate * 100:+.2f}% vs target)")
+        print(f"  Scheduler Lag:     avg {schedule.lag_avg_ms():.3f} ms, max {schedule.lag_max * 1000:.3f} ms")
+        print(f"  Worker Pickup:     avg {s['queue_delay_avg']:.3f} ms, max {s['queue_delay_max']:.3f} ms "
+              f"after intended send")
+        if schedule.skipped or schedule.dropped:
+            print(f"  Skipped (>{CATCH_UP_SECONDS:g}s late): {schedule.skipped}")
+            print(f"  Dropped (queue full): {schedule.dropped}")
+    
+    print("\nResponse Times (milliseconds, from intended send time):")
     print(f"  Average:           {s['avg_time']:.2f} ms")
     print(f"  Minimum:           {s['min_time']:.2f} ms")
     print(f"  Maximum:           {s['max_time']:.2f} ms")
     print(f"  50th Percentile:   {s['p50_time']:.2f} ms")
+    print(f"  90th Percentile:   {s['p90_time']:.2f} ms")
     print(f"  95th Percentile:   {s['p95_time']:.2f} ms")
     print(f"  99th Percentile:   {s['p99_time']:.2f} ms")
+    print(f"  99.9th Percentile: {s['p999_time']:.2f} ms")
     
     print("\nError Breakdown:")
     print(f"  Timeouts:          {s['timeout']}")
@@ -366,10 +1052,128 @@ def print_final_report(stats, args, log_filename):
         print("  → High average latency: DNS server may be slow or overloaded")
     if s['success_rate'] < 90:
         print("  → Low success rate: Investigate DNS infrastructure")
+    if schedule is not None and (schedule.dropped or s['queue_delay_avg'] > 10):
+        if args.engine == 'asyncio':
+            print("  → Event loops could not keep up with the schedule: add --processes, or the client is the bottleneck")
+        else:
+            print("  → Workers could not keep up with the schedule: add --threads or use --engine asyncio")
     
     print(f"\nDetailed log saved to: {log_filename}")
+    if timeseries_filename:
+        print(f"Per-second time series saved to: {timeseries_filename}")
     print("=" * 120)
 
+def monitor(stats, timeseries, running, wait=time.sleep):
+    """Print live stats every 5 seconds and write the time series while running() is true"""
+    print_stats_header()
+    
+    last_print = time.time()
+    while running():
+        if time.time() - last_print >= 5:  # Print stats every 5 seconds
+            print_live_stats(stats)
+            last_print = time.time()
+        timeseries.flush()
+        wait(0.5)
+
+def run_worker_threads(args, domains, stats, schedule, timeseries, log_file):
+    """Threads engine: a feeder thread and one blocking dnspython worker per thread"""
+    work_queue = queue.Queue(maxsize=args.rate * 10)  # Buffer; the feeder drops rather than blocks
+    
+    # Start workers
+    workers = []
+    for i in range(args.threads):
+        worker = DNSWorker(i, work_queue, stats, args.server, args.timeout, log_file, args.port)
+        worker.start()
+        workers.append(worker)
+    
+    print(f"Started {args.threads} worker threads")
+    
+    # Start feeder thread
+    feeder = threading.Thread(target=open_loop_feeder,
+                             args=(work_queue, domains, schedule),
+                             daemon=True)
+    feeder.start()
+    
+    monitor(stats, timeseries, lambda: feeder.is_alive() or not work_queue.empty())
+    
+    # Wait for queue to drain
+    print("\nWaiting for remaining queries to complete...")
+    work_queue.join()
+    
+    # Stop workers
+    for _ in workers:
+        work_queue.put(None)  # Poison pill
+    
+    for worker in workers:
+        worker.join(timeout=2)
+
+def run_asyncio_engines(args, domains, stats, schedule, timeseries):
+    """Asyncio engine: one AsyncDNSEngine event loop, or one per process
+
+    With several processes each child runs its share of the schedule and
+    sends its StatsRecorder deltas and final ScheduleStats back over a
+    multiprocessing queue; they are merged into `stats` and `schedule`.
+    """
+    print(f"Starting DNS queries at {args.rate} requests/second for {args.duration} seconds")
+    
+    processes = args.processes
+    if processes == 1:
+        engine = AsyncDNSEngine(0, 1, domains, args, schedule, stats.add_recorder(StatsRecorder(stats.origin)))
+        loop_thread = threading.Thread(target=asyncio.run, args=(engine.run(),), daemon=True)
+        loop_thread.start()
+        monitor(stats, timeseries, loop_thread.is_alive)
+        loop_thread.join()
+        print(f"\nSent {schedule.issued} total queries")
+        return
+    
+    results = multiprocessing.Queue()
+    go = multiprocessing.Event()
+    clock = multiprocessing.Array('d', 2)   # schedule start (perf_counter), stats origin (monotonic)
+    children = [multiprocessing.Process(target=_engine_process,
+                                        args=(k, processes, domains, args, results, go, clock),
+                                        daemon=True)
+                for k in range(processes)]
+    for child in children:
+        child.start()
+    
+    # Start every loop on the same schedule once they are all up
+    ready = 0
+    while ready < processes:
+        try:
+            ready += results.get(timeout=1)[0] == 'ready'
+        except queue.Empty:
+            if not all(child.is_alive() for child in children):
+                print("ERROR: an engine process failed to start")
+                sys.exit(1)
+    aggregates = [stats.add_recorder(StatsRecorder(0.0)) for _ in children]
+    stats.origin = time.monotonic()
+    stats.start_time = time.time()
+    clock[0] = time.perf_counter()
+    clock[1] = stats.origin
+    go.set()
+    print(f"Started {processes} event loop processes")
+    
+    done = set()
+    def receive(timeout):
+        deadline = time.time() + timeout
+        while True:
+            try:
+                kind, k, payload = results.get(timeout=max(deadline - time.time(), 0))
+            except queue.Empty:
+                return
+            if kind == 'stats':
+                aggregates[k].merge(payload)
+            elif kind == 'done':
+                schedule.merge(payload)
+                done.add(k)
+    
+    monitor(stats, timeseries,
+            lambda: len(done) < processes and any(child.is_alive() for child in children) or not results.empty(),
+            receive)
+    for child in children:
+        child.join(timeout=2)
+    print(f"\nSent {schedule.issued} total queries")
+
 def main():
     parser = argparse.ArgumentParser(
         description='DNS Performance Testing Tool for Network Engineers',
@@ -387,23 +1191,37 @@ Examples:
 
   Quick 10-second test:
     %(prog)s --server 8.8.8.8 --rate 50 --duration 10
+
+  High rate with the asyncio engine, one event loop per CPU core:
+    %(prog)s --server 10.1.1.1 --rate 50000 --engine asyncio --processes 0
         """
     )
     
     parser.add_argument('--server', '-s', required=True,
                         help='DNS server IP address to test')
+    parser.add_argument('--port', '-p', type=int, default=53,
+                        help='DNS server port (default: 53)')
     parser.add_argument('--rate', '-r', type=int, default=10,
                         help='Target queries per second (default: 10)')
     parser.add_argument('--duration', '-d', type=int, default=60,
                         help='Test duration in seconds (default: 60)')
     parser.add_argument('--threads', '-t', type=int, default=5,
                         help='Number of worker threads (default: 5)')
+    parser.add_argument('--engine', choices=['threads', 'asyncio'], default='threads',
+                        help='threads: blocking dnspython worker threads; asyncio: thousands of '
+                             'queries in flight per event loop (default: threads)')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='asyncio engine: event loop processes, 0 for one per CPU core (default: 1)')
+    parser.add_argument('--sockets', type=int, default=DEFAULT_SOCKETS,
+                        help=f'asyncio engine: UDP sockets per event loop (default: {DEFAULT_SOCKETS})')
     parser.add_argument('--timeout', type=float, default=5.0,
                         help='DNS query timeout in seconds (default: 5.0)')
     parser.add_argument('--domains', default=None,
                         help='Domain list file or URL (default: built-in list)')
     parser.add_argument('--output', '-o', default=None,
                         help='Output log filename (default: dns_test_TIMESTAMP.log)')
+    parser.add_argument('--timeseries', default=None,
+                        help='Per-second rate/latency/error CSV (default: <output>_timeseries.csv)')
     
     args = parser.parse_args()
     
@@ -411,6 +1229,10 @@ Examples:
     if args.output is None:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         args.output = f'dns_test_{timestamp}.log'
+    if args.processes < 1:
+        args.processes = os.cpu_count() or 1
+    if args.timeseries is None:
+        args.timeseries = str(Path(args.output).with_suffix('')) + '_timeseries.csv'
     
     # Load domains
     if args.domains:
@@ -426,12 +1248,12 @@ Examples:
     # Setup
     stats = DNSStats()
     stats.start_time = time.time()
-    work_queue = queue.Queue(maxsize=args.rate * 10)  # Buffer
+    schedule = ScheduleStats(args.rate, args.duration)
     
     print("\n" + "=" * 120)
     print("DNS PERFORMANCE TEST")
     print("=" * 120)
-    print(f"Server: {args.server} | Rate: {args.rate} QPS | Duration: {args.duration}s | Workers: {args.threads}")
+    print(f"Server: {args.server} | Rate: {args.rate} QPS | Duration: {args.duration}s | Workers: {describe_workers(args)}")
     print("=" * 120)
     
     # Open log file
@@ -442,60 +1264,36 @@ Examples:
         log_file.write(f"Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         log_file.write(f"Target Rate: {args.rate} QPS\n")
         log_file.write(f"Duration: {args.duration} seconds\n")
-        log_file.write(f"Workers: {args.threads}\n")
+        log_file.write(f"Workers: {describe_workers(args)}\n")
         log_file.write("=" * 120 + "\n")
         log_file.write(f"{'Timestamp':<26} | {'Worker':<10} | {'Domain':<40} | {'Result':<10} | {'Time':<10} | Details\n")
         log_file.write("=" * 120 + "\n")
+        log_file.flush()    # asyncio engines append to the file themselves
     except Exception as e:
         print(f"ERROR: Could not open log file {args.output}: {e}")
         sys.exit(1)
+    try:
+        timeseries = TimeSeriesWriter(args.timeseries, stats)
+    except Exception as e:
+        print(f"ERROR: Could not open time series file {args.timeseries}: {e}")
+        sys.exit(1)
     
-    # Start workers
-    workers = []
-    for i in range(args.threads):
-        worker = DNSWorker(i, work_queue, stats, args.server, args.timeout, log_file)
-        worker.start()
-        workers.append(worker)
-    
-    print(f"Started {args.threads} worker threads")
-    
-    # Start feeder thread
-    feeder = threading.Thread(target=rate_limited_feeder, 
-                             args=(work_queue, domains, args.rate, args.duration),
-                             daemon=True)
-    feeder.start()
-    
-    # Monitor progress
-    print_stats_header()
-    
-    last_print = time.time()
-    while feeder.is_alive() or not work_queue.empty():
-        if time.time() - last_print >= 5:  # Print stats every 5 seconds
-            print_live_stats(stats)
-            last_print = time.time()
-        time.sleep(0.5)
-    
-    # Wait for queue to drain
-    print("\nWaiting for remaining queries to complete...")
-    work_queue.join()
-    
-    # Stop workers
-    for _ in workers:
-        work_queue.put(None)  # Poison pill
-    
-    for worker in workers:
-        worker.join(timeout=2)
+    if args.engine == 'asyncio':
+        run_asyncio_engines(args, domains, stats, schedule, timeseries)
+    else:
+        run_worker_threads(args, domains, stats, schedule, timeseries, log_file)
     
     stats.end_time = time.time()
     
     # Print final stats
     print_live_stats(stats)
     
-    # Close log file
+    # Close log and time series files
     log_file.close()
+    timeseries.close()
     
     # Print final report
-    print_final_report(stats, args, args.output)
+    print_final_report(stats, args, args.output, schedule, args.timeseries)
 
 if __name__ == '__main__':
     try:
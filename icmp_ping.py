@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+icmp_ping.py - In-process asyncio ICMP echo engine
+
+Pings thousands of targets concurrently from one socket instead of
+forking a ping process per target.
+
+Socket choice (Linux):
+    1. Unprivileged ICMP datagram socket (SOCK_DGRAM/IPPROTO_ICMP); allowed
+       when the user's group is inside net.ipv4.ping_group_range.  The
+       kernel owns the echo identifier and only delivers our own replies.
+    2. Raw ICMP socket (needs root or CAP_NET_RAW); replies for every
+       process arrive, so they are filtered by our identifier.
+
+Replies are matched to requests by (source IP, sequence number).  Names
+are resolved asynchronously, and each distinct name only once.
+
+Usage:
+    import asyncio
+    from icmp_ping import ping_many
+
+    stats = asyncio.run(ping_many(["10.1.1.1", "core-sw1"], count=2, timeout=2))
+    stats["core-sw1"].loss_pct, stats["core-sw1"].rtt_avg
+"""
+
+import asyncio
+import ipaddress
+import itertools
+import os
+import socket
+import struct
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+DEFAULT_CONCURRENCY = 2000
+PAYLOAD = b"icmp_ping" + bytes(23)      # 32-byte payload like Windows ping
+
+# Kernel receive timestamps (Linux SO_TIMESTAMPNS, not exported by the socket
+# module).  Without them RTTs include the time a reply waits for the event
+# loop, which is tens of ms when thousands of requests go out at once.
+SO_TIMESTAMPNS = getattr(socket, "SO_TIMESTAMPNS", 35 if sys.platform.startswith("linux") else None)
+
+
+def checksum(data):
+    """RFC 1071 Internet checksum."""
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo(ident, seq, payload=PAYLOAD):
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    csum = checksum(header + payload)
+    return struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, csum, ident, seq) + payload
+
+
+@dataclass
+class PingStats:
+    """Outcome of pinging one target."""
+    target: str
+    resolved_ip: Optional[str] = None
+    sent: int = 0
+    received: int = 0
+    rtts: list = field(default_factory=list)     # milliseconds
+    error: Optional[str] = None
+
+    @property
+    def reachable(self):
+        return self.received > 0
+
+    @property
+    def loss_pct(self):
+        return 100.0 if not self.sent else 100.0 * (self.sent - self.received) / self.sent
+
+    @property
+    def rtt_min(self):
+        return min(self.rtts) if self.rtts else None
+
+    @property
+    def rtt_avg(self):
+        return sum(self.rtts) / len(self.rtts) if self.rtts else None
+
+    @property
+    def rtt_max(self):
+        return max(self.rtts) if self.rtts else None
+
+
+class AsyncPinger:
+    """One ICMP socket shared by every outstanding echo request.
+
+    Use as ``async with AsyncPinger() as pinger: rtt = await pinger.ping(ip)``.
+    """
+
+    def __init__(self, timeout=2.0):
+        self.timeout = timeout
+        self.sock = None
+        self.raw = False
+        self.ident = os.getpid() & 0xFFFF
+        self._seq = itertools.count(1)
+        self._pending = {}          # (ip, seq) -> (future, send time)
+        self._loop = None
+        self.kernel_timestamps = False
+
+    def open(self):
+        try:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        except PermissionError:
+            # Outside ping_group_range: fall back to a raw socket (root / CAP_NET_RAW)
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            self.raw = True
+        self.sock.setblocking(False)
+        # Large receive buffer so bursts of thousands of replies are not dropped
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        except OSError:
+            pass
+        if SO_TIMESTAMPNS is not None:
+            try:
+                self.sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+                self.kernel_timestamps = True
+            except OSError:
+                pass
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self.sock.fileno(), self._on_readable)
+        return self
+
+    def close(self):
+        if self.sock is not None:
+            self._loop.remove_reader(self.sock.fileno())
+            self.sock.close()
+            self.sock = None
+        for future, _ in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+
+    async def __aenter__(self):
+        return self.open()
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    @property
+    def mode(self):
+        return "raw" if self.raw else "datagram"
+
+    def _on_readable(self):
+        while True:
+            try:
+                data, ancdata, _, addr = self.sock.recvmsg(2048, 64)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            now = time.time()
+            for level, ctype, cdata in ancdata:
+                if level == socket.SOL_SOCKET and ctype == SO_TIMESTAMPNS and len(cdata) >= 16:
+                    sec, nsec = struct.unpack("@qq", cdata[:16])
+                    now = sec + nsec / 1e9
+            if self.raw:
+                data = data[(data[0] & 0x0F) * 4:]      # strip IP header
+            if len(data) < 8:
+                continue
+            icmp_type, _, _, ident, seq = struct.unpack("!BBHHH", data[:8])
+            if icmp_type != ICMP_ECHO_REPLY:
+                continue
+            if self.raw and ident != self.ident:
+                continue            # another process's ping
+            entry = self._pending.pop((addr[0], seq), None)
+            if entry and not entry[0].done():
+                entry[0].set_result((now - entry[1]) * 1000.0)
+
+    async def ping(self, ip, timeout=None):
+        """Send one echo request; returns RTT in ms, or None on timeout."""
+        seq = next(self._seq) & 0xFFFF
+        key = (ip, seq)
+        future = self._loop.create_future()
+        # A plain timer is much cheaper than asyncio.wait_for at thousands of pings
+        timer = self._loop.call_later(timeout or self.timeout, _expire, future)
+        self._pending[key] = (future, time.time())
+        try:
+            self.sock.sendto(build_echo(self.ident, seq), (ip, 0))
+            return await future
+        finally:
+            timer.cancel()
+            self._pending.pop(key, None)
+
+
+def _expire(future):
+    if not future.done():
+        future.set_result(None)
+
+
+async def resolve_all(targets, concurrency=200, resolver=None):
+    """Resolve hostnames to IPv4 concurrently, once per distinct name.
+
+    Returns {target: ip or None}.  IP literals are returned unchanged.
+    With a dns_cache.CachedResolver, names are looked up through the
+    shared DNS cache instead of getaddrinfo.
+    """
+    loop = asyncio.get_running_loop()
+    sem = asyncio.Semaphore(concurrency)
+    results = {}
+
+    async def resolve(name):
+        try:
+            results[name] = str(ipaddress.IPv4Address(name))
+            return
+        except ValueError:
+            pass
+        async with sem:
+            if resolver is not None:
+                results[name] = await loop.run_in_executor(None, resolver.gethostbyname, name)
+                return
+            try:
+                info = await loop.getaddrinfo(name, None, family=socket.AF_INET,
+                                              type=socket.SOCK_STREAM)
+                results[name] = info[0][4][0]
+            except (socket.gaierror, OSError):
+                results[name] = None
+
+    await asyncio.gather(*(resolve(t) for t in dict.fromkeys(targets)))
+    return results
+
+
+async def ping_many(targets, count=2, timeout=2.0, interval=0.2,
+                    concurrency=DEFAULT_CONCURRENCY, pinger=None, resolver=None):
+    """Ping every target *count* times; returns {target: PingStats}.
+
+    Targets may repeat or share an IP; each distinct IP is pinged once and
+    the stats are shared by every target that resolved to it.  *resolver*
+    is passed to resolve_all().
+    """
+    resolved = await resolve_all(targets, resolver=resolver)
+    by_ip = {}
+    for ip in resolved.values():
+        if ip and ip not in by_ip:
+            by_ip[ip] = PingStats(target=ip, resolved_ip=ip)
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def probe(stats):
+        for i in range(count):
+            if i:
+                await asyncio.sleep(interval)
+            async with sem:
+                stats.sent += 1
+                try:
+                    rtt = await pinger.ping(stats.resolved_ip, timeout)
+                except OSError as e:
+                    stats.error = str(e)
+                    return
+            if rtt is not None:
+                stats.received += 1
+                stats.rtts.append(rtt)
+
+    own = pinger is None
+    if own:
+        pinger = AsyncPinger(timeout).open()
+    try:
+        await asyncio.gather(*(probe(s) for s in by_ip.values()))
+    finally:
+        if own:
+            pinger.close()
+
+    results = {}
+    for target in targets:
+        ip = resolved.get(target)
+        if ip is None:
+            results[target] = PingStats(target=target, error="DNS resolution failed")
+        else:
+            shared = by_ip[ip]
+            results[target] = PingStats(target=target, resolved_ip=ip, sent=shared.sent,
+                                        received=shared.received, rtts=shared.rtts,
+                                        error=shared.error)
+    return results
@@ -18,11 +18,15 @@ Credentials come from tools.py.
 import argparse
 import logging
 import re
-import subprocess
+import socket
 import sys
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from netmiko import ConnectHandler
 from tools import get_netmiko_creds, getScriptName, setupLogging, save_file_and_set_permissions
+from parsers import MAC_TABLE_RE, ARP_RE
+from dns_cache import DEFAULT_DB, DEFAULT_WORKERS, NOT_FOUND, open_cache, resolve_many
 
 try:
     from openpyxl import Workbook
@@ -109,6 +113,118 @@ def connect_nxos(hostname):
         return None
 
 
+# ── Compact MAC / ARP tables ────────────────────────────────
+# Aggregation switches carry 150k+ MAC and ARP entries, so entries are kept
+# as integers in parallel arrays (MAC = 48-bit, IPv4 = 32-bit) and interface
+# names are interned.  Strings are only produced again when writing Excel.
+def mac_to_int(mac):
+    """aabb.ccdd.0001 -> 0xaabbccdd0001"""
+    return int(mac.replace(".", ""), 16)
+
+
+def int_to_mac(value):
+    """0xaabbccdd0001 -> aabb.ccdd.0001"""
+    h = f"{value:012x}"
+    return f"{h[0:4]}.{h[4:8]}.{h[8:12]}"
+
+
+def ip_to_int(ip):
+    """10.1.1.1 -> 0x0a010101"""
+    return int.from_bytes(socket.inet_aton(ip), "big")
+
+
+def int_to_ip(value):
+    """0x0a010101 -> 10.1.1.1"""
+    return socket.inet_ntoa(value.to_bytes(4, "big"))
+
+
+class _Interner:
+    """Map repeated strings (interface names) to small integer ids."""
+
+    def __init__(self):
+        self.names = []
+        self._ids = {}
+
+    def id(self, name):
+        i = self._ids.get(name)
+        if i is None:
+            i = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+
+class MacTable:
+    """Dynamic MAC entries as parallel arrays: mac (48-bit), vlan, port id."""
+
+    def __init__(self):
+        self.mac = array("Q")
+        self.vlan = array("H")
+        self.port = array("I")
+        self.ports = _Interner()
+        self.skipped = 0
+
+    def __len__(self):
+        return len(self.mac)
+
+    def append(self, mac, vlan, port):
+        self.mac.append(mac_to_int(mac))
+        self.vlan.append(int(vlan))
+        self.port.append(self.ports.id(port))
+
+    def port_name(self, i):
+        return self.ports.names[self.port[i]]
+
+
+class ArpTable:
+    """ARP entries as parallel arrays: mac (48-bit), ip (32-bit), interface id.
+
+    A MAC seen more than once keeps its last entry, as the old dict did.
+    ``source`` records which L3 switch an entry came from when several
+    tables are merged (site mode); it is "" for a single switch.
+    """
+
+    def __init__(self):
+        self.mac = array("Q")
+        self.ip = array("I")
+        self.intf = array("I")
+        self.source = array("H")
+        self.interfaces = _Interner()
+        self.sources = _Interner()
+        self._index = None
+
+    def __len__(self):
+        return len(self.mac)
+
+    def append(self, ip, mac, interface, source=""):
+        self.mac.append(mac_to_int(mac))
+        self.ip.append(ip_to_int(ip))
+        self.intf.append(self.interfaces.id(interface))
+        self.source.append(self.sources.id(source))
+        self._index = None
+
+    def extend(self, other, source):
+        """Append every entry of *other*, tagged with L3 switch *source*."""
+        src = self.sources.id(source)
+        intf_ids = [self.interfaces.id(n) for n in other.interfaces.names]
+        self.mac.extend(other.mac)
+        self.ip.extend(other.ip)
+        self.intf.extend(array("I", (intf_ids[i] for i in other.intf)))
+        self.source.extend(array("H", [src]) * len(other))
+        self._index = None
+
+    def index(self):
+        """Integer hash {mac_int: row}, built once on first lookup."""
+        if self._index is None:
+            self._index = {m: i for i, m in enumerate(self.mac)}
+        return self._index
+
+    def interface_name(self, i):
+        return self.interfaces.names[self.intf[i]]
+
+    def source_name(self, i):
+        return self.sources.names[self.source[i]]
+
+
 def get_local_mac_addresses(conn, hostname, exclude_ports=None):
     """Collect locally learned dynamic MAC addresses from an NX-OS L2 switch.
 
@@ -116,42 +232,39 @@ def get_local_mac_addresses(conn, hostname, exclude_ports=None):
         exclude_ports: set of normalised interface names to skip
 
     Returns:
-        list[dict]: [{mac, vlan, port}, ...]
+        MacTable
     """
     logger.info(f"Running 'show mac address-table local' on {hostname}")
     output = conn.send_command("show mac address-table local")
     logger.debug(f"Output:\n{output}")
 
-    entries = []
     # NX-OS format (typical):
     #  [*+~G] VLAN  MAC_Address          Type   age  Secure NTFY  Ports
     #  *      10    aabb.ccdd.0001       dynamic 0   F      F     Eth1/1
-    pattern = re.compile(
-        r'[\*\+~G]?\s*(\d+)\s+'                                        # VLAN
-        r'([0-9a-fA-F]{4}\.[0-9a-fA-F]{4}\.[0-9a-fA-F]{4})\s+'        # MAC
-        r'(\w+)\s+'                                                     # Type
-        r'\S+\s+'                                                       # age
-        r'\S+\s+'                                                       # Secure
-        r'\S+\s+'                                                       # NTFY
-        r'(\S+)'                                                        # Port
-    )
+    entries = parse_mac_table(output, exclude_ports)
+    skipped = entries.skipped
+
+    logger.info(f"{len(entries)} dynamic local MACs on {hostname} ({skipped} excluded)")
+    print(f"  {len(entries)} dynamic local MAC addresses found ({skipped} excluded on uplink/infra ports)")
+    return entries
+
 
-    skipped = 0
+def parse_mac_table(output, exclude_ports=None):
+    """Parse ``show mac address-table local`` output into a MacTable."""
+    entries = MacTable()
+    excluded_cache = {}
     for line in output.splitlines():
-        m = pattern.search(line)
+        m = MAC_TABLE_RE.search(line)
         if m and m.group(3).lower() == "dynamic":
             port = m.group(4)
-            if exclude_ports and normalize_interface(port) in exclude_ports:
-                skipped += 1
-                continue
-            entries.append({
-                "mac":  m.group(2).lower(),
-                "vlan": m.group(1),
-                "port": port,
-            })
-
-    logger.info(f"{len(entries)} dynamic local MACs on {hostname} ({skipped} excluded)")
-    print(f"  {len(entries)} dynamic local MAC addresses found ({skipped} excluded on uplink/infra ports)")
+            if exclude_ports:
+                excluded = excluded_cache.get(port)
+                if excluded is None:
+                    excluded = excluded_cache[port] = normalize_interface(port) in exclude_ports
+                if excluded:
+                    entries.skipped += 1
+                    continue
+            entries.append(m.group(2), m.group(1), port)
     return entries
 
 
@@ -159,74 +272,123 @@ def get_arp_table(conn, hostname):
     """Collect ARP table from an NX-OS L3 switch.
 
     Returns:
-        dict: {mac_address: {ip, interface}, ...}
+        ArpTable
     """
     logger.info(f"Running 'show ip arp' on {hostname}")
     output = conn.send_command("show ip arp")
     logger.debug(f"Output:\n{output}")
 
-    arp = {}
     # NX-OS format:
     #  Address       Age       MAC Address          Interface    Flags
     #  10.1.1.1      00:05:32  aabb.ccdd.0001       Vlan10
-    pattern = re.compile(
-        r'(\d+\.\d+\.\d+\.\d+)\s+'                                     # IP
-        r'\S+\s+'                                                       # Age
-        r'([0-9a-fA-F]{4}\.[0-9a-fA-F]{4}\.[0-9a-fA-F]{4})\s+'        # MAC
-        r'(\S+)'                                                        # Interface
-    )
-
-    for line in output.splitlines():
-        m = pattern.search(line)
-        if m:
-            arp[m.group(2).lower()] = {"ip": m.group(1), "interface": m.group(3)}
+    arp = parse_arp_table(output)
 
     logger.info(f"{len(arp)} ARP entries on {hostname}")
     print(f"  {len(arp)} ARP entries found")
     return arp
 
 
-# ── DNS lookup ──────────────────────────────────────────────
-def do_nslookup(ip):
-    """Run nslookup and return the resolved hostname, or 'N/A'."""
-    try:
-        result = subprocess.run(
-            ["nslookup", ip],
-            capture_output=True, text=True, timeout=10,
-        )
-        m = re.search(r"Name:\s+(\S+)", result.stdout)
+def parse_arp_table(output):
+    """Parse ``show ip arp`` output into an ArpTable."""
+    arp = ArpTable()
+    for line in output.splitlines():
+        m = ARP_RE.search(line)
         if m:
-            return m.group(1)
-    except (subprocess.TimeoutExpired, Exception) as e:
-        logger.warning(f"nslookup failed for {ip}: {e}")
-    return "N/A"
+            arp.append(m.group(1), m.group(2), m.group(3))
+    return arp
 
 
 # ── Correlate ───────────────────────────────────────────────
-def correlate(mac_entries, arp, l2_switch, l3_switch):
-    """Match MAC -> IP (ARP) -> DNS and return combined rows."""
-    rows = []
-    for entry in mac_entries:
-        mac  = entry["mac"]
-        vlan = entry["vlan"]
-        port = entry["port"]
-
-        arp_hit  = arp.get(mac, {})
-        ip       = arp_hit.get("ip", "N/A")
-        arp_intf = arp_hit.get("interface", "N/A")
-
-        dns = "N/A"
-        if ip != "N/A":
-            print(f"    nslookup {ip} ... ", end="", flush=True)
-            dns = do_nslookup(ip)
-            print(dns)
-
-        rows.append({
-            "mac": mac, "vlan": vlan, "port": port,
-            "ip": ip, "arp_interface": arp_intf, "dns": dns,
-            "l2_switch": l2_switch, "l3_switch": l3_switch,
-        })
-    return rows
+class CorrelatedRows:
+    """MAC -> ARP join result, still in integer form.
+
+    ``arp_row[i]`` is the ARP row for MAC row *i* (-1 for no hit) and
+    ``dns`` maps ip_int -> hostname.  ``rows()`` formats strings lazily.
+    """
+
+    def __init__(self, macs, arp, arp_row, dns, l2_switch, l3_switch):
+        self.macs = macs
+        self.arp = arp
+        self.arp_row = arp_row
+        self.dns = dns
+        self.l2_switch = l2_switch
+        self.l3_switch = l3_switch
+
+    def __len__(self):
+        return len(self.macs)
+
+    @property
+    def resolved_ip(self):
+        return sum(1 for a in self.arp_row if a >= 0)
+
+    @property
+    def resolved_dns(self):
+        return sum(1 for a in self.arp_row
+                   if a >= 0 and self.dns.get(self.arp.ip[a], "N/A") != "N/A")
+
+    def rows(self):
+        """Yield (mac, vlan, port, ip, arp_interface, dns, l2, l3) string tuples."""
+        macs, arp = self.macs, self.arp
+        for i, a in enumerate(self.arp_row):
+            if a >= 0:
+                ip_int = arp.ip[a]
+                ip = int_to_ip(ip_int)
+                arp_intf = arp.interface_name(a)
+                dns = self.dns.get(ip_int, "N/A")
+                l3 = arp.source_name(a) or self.l3_switch
+            else:
+                ip = arp_intf = dns = "N/A"
+                l3 = self.l3_switch
+            yield (int_to_mac(macs.mac[i]), str(macs.vlan[i]), macs.port_name(i),
+                   ip, arp_intf, dns, self.l2_switch, l3)
+
+    def ips(self):
+        """Yield the resolved IP of every row that has one, in row order."""
+        for a in self.arp_row:
+            if a >= 0:
+                yield int_to_ip(self.arp.ip[a])
+
+
+def correlate(mac_entries, arp, l2_switch, l3_switch,
+              dns_workers=DEFAULT_WORKERS, dns_cache=None):
+    """Match MAC -> IP (ARP) -> DNS and return a CorrelatedRows.
+
+    Each unique IP is reverse-resolved once, concurrently, through the
+    persistent TTL cache in dns_cache.py (*dns_cache*, a DnsCache, or the
+    default cache file).
+    """
+    index = arp.index()
+    arp_row = array("i", (index.get(m, -1) for m in mac_entries.mac))
+    dns = resolve_dns((arp.ip[a] for a in arp_row if a >= 0), dns_workers, dns_cache)
+    return CorrelatedRows(mac_entries, arp, arp_row, dns, l2_switch, l3_switch)
+
+
+def resolve_dns(ip_ints, dns_workers=DEFAULT_WORKERS, dns_cache=None):
+    """Reverse-resolve unique integer IPs; returns {ip_int: hostname or 'N/A'}."""
+    ip_ints = list(dict.fromkeys(ip_ints))
+    names = resolve_many([int_to_ip(i) for i in ip_ints],
+                         workers=dns_workers, cache=dns_cache)
+    dns = {i: names[int_to_ip(i)] for i in ip_ints}
+    print(f"    {len(dns)} unique IPs, "
+          f"{sum(1 for n in dns.values() if n != NOT_FOUND)} with a DNS name")
+    return dns
+
+
+def correlate_site(mac_tables, arp, l3_label,
+                   dns_workers=DEFAULT_WORKERS, dns_cache=None):
+    """Site mode: join every L2 switch's MacTable against one merged ArpTable.
+
+    *mac_tables* is [(l2_switch, MacTable), ...].  The ARP index is built
+    once and all unique IPs across the site are resolved in one batch.
+    Returns a list of CorrelatedRows sharing one dns dict.
+    """
+    index = arp.index()
+    joined = [(l2, macs, array("i", (index.get(m, -1) for m in macs.mac)))
+              for l2, macs in mac_tables]
+    dns = resolve_dns((arp.ip[a] for _, _, arp_row in joined for a in arp_row if a >= 0),
+                      dns_workers, dns_cache)
+    return [CorrelatedRows(macs, arp, arp_row, dns, l2, l3_label)
+            for l2, macs, arp_row in joined]
 
 
 # ── Excel output ────────────────────────────────────────────
@@ -235,7 +397,12 @@ def write_excel(rows, l2_switch):
 
     Sheet 1 – MAC-ARP-DNS  (full data)
     Sheet 2 – IP Addresses (just IPs for easy copy)
+    Sheet 3 – Switch Summary (site mode only: per-L2 counts)
+
+    *rows* is one CorrelatedRows, or a list of them (site mode) which are
+    merged into the same sheets.
     """
+    row_sets = [rows] if isinstance(rows, CorrelatedRows) else list(rows)
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"mac_discovery_{l2_switch}_{ts}.xlsx"
     wb = Workbook()
@@ -258,24 +425,19 @@ def write_excel(rows, l2_switch):
         cell.font = hdr_font
         cell.alignment = center
 
-    for r, row in enumerate(rows, 2):
-        ws.cell(row=r, column=1, value=row["mac"])
-        ws.cell(row=r, column=2, value=row["vlan"])
-        ws.cell(row=r, column=3, value=row["port"])
-        ws.cell(row=r, column=4, value=row["ip"])
-        ws.cell(row=r, column=5, value=row["arp_interface"])
-        ws.cell(row=r, column=6, value=row["dns"])
-        ws.cell(row=r, column=7, value=row["l2_switch"])
-        ws.cell(row=r, column=8, value=row["l3_switch"])
-
-    # Auto-width columns
-    for c in range(1, len(headers) + 1):
-        max_w = len(headers[c - 1])
-        for r in range(2, len(rows) + 2):
-            v = ws.cell(row=r, column=c).value
-            if v and len(str(v)) > max_w:
-                max_w = len(str(v))
-        ws.column_dimensions[get_column_letter(c)].width = max_w + 3
+    # Auto-width tracked while writing instead of re-reading every cell
+    widths = [len(h) for h in headers]
+    r = 2
+    for rs in row_sets:
+        for values in rs.rows():
+            for c, v in enumerate(values, 1):
+                ws.cell(row=r, column=c, value=v)
+                if len(v) > widths[c - 1]:
+                    widths[c - 1] = len(v)
+            r += 1
+
+    for c, w in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(c)].width = w + 3
     ws.freeze_panes = "A2"
 
     # ── Sheet 2: IP Addresses (easy copy) ──
@@ -286,13 +448,30 @@ def write_excel(rows, l2_switch):
     cell.alignment = center
 
     r = 2
-    for row in rows:
-        if row["ip"] != "N/A":
-            ws2.cell(row=r, column=1, value=row["ip"])
+    for rs in row_sets:
+        for ip in rs.ips():
+            ws2.cell(row=r, column=1, value=ip)
             r += 1
     ws2.column_dimensions["A"].width = 20
     ws2.freeze_panes = "A2"
 
+    # ── Sheet 3: Switch Summary (site mode) ──
+    if len(row_sets) > 1:
+        ws3 = wb.create_sheet(title="Switch Summary")
+        summary_headers = ["L2 Switch", "MACs", "ARP Resolved", "DNS Resolved"]
+        for c, h in enumerate(summary_headers, 1):
+            cell = ws3.cell(row=1, column=c, value=h)
+            cell.fill = hdr_fill
+            cell.font = hdr_font
+            cell.alignment = center
+        for r, rs in enumerate(row_sets, 2):
+            for c, v in enumerate((rs.l2_switch, len(rs), rs.resolved_ip, rs.resolved_dns), 1):
+                ws3.cell(row=r, column=c, value=v)
+        ws3.column_dimensions["A"].width = max(len(rs.l2_switch) for rs in row_sets) + 3
+        for letter in "BCD":
+            ws3.column_dimensions[letter].width = 15
+        ws3.freeze_panes = "A2"
+
     wb.save(filename)
     save_file_and_set_permissions(filename)
     logger.info(f"Report saved: {filename}")
@@ -300,15 +479,130 @@ def write_excel(rows, l2_switch):
     return filename
 
 
+# ── Site mode ───────────────────────────────────────────────
+def load_switch_list(path):
+    """One hostname per line; blank lines and # comments ignored."""
+    with open(path) as f:
+        return [l.split("#")[0].strip() for l in f if l.split("#")[0].strip()]
+
+
+def collect_l2(hostname, base_excludes):
+    """Connect, build the exclusion set and collect MACs for one L2 switch."""
+    conn = connect_nxos(hostname)
+    if not conn:
+        return None
+    try:
+        exclude = build_exclusion_set(conn, hostname, base_excludes)
+        return get_local_mac_addresses(conn, hostname, exclude_ports=exclude)
+    except Exception as e:
+        logger.error(f"MAC collection failed on {hostname}: {e}")
+        print(f"  *** MAC collection FAILED on {hostname}: {e}")
+        return None
+    finally:
+        conn.disconnect()
+        logger.info(f"Disconnected from {hostname}")
+
+
+def collect_l3(hostname):
+    """Connect and pull the ARP table from one L3 switch."""
+    conn = connect_nxos(hostname)
+    if not conn:
+        return None
+    try:
+        return get_arp_table(conn, hostname)
+    except Exception as e:
+        logger.error(f"ARP collection failed on {hostname}: {e}")
+        print(f"  *** ARP collection FAILED on {hostname}: {e}")
+        return None
+    finally:
+        conn.disconnect()
+        logger.info(f"Disconnected from {hostname}")
+
+
+def run_site(l2_switches, l3_switches, workers, dns_workers, dns_cache):
+    """Fetch each ARP table once and every L2 MAC table concurrently.
+
+    Returns (list of CorrelatedRows, merged ArpTable) or (None, None).
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        arp_futures = {h: executor.submit(collect_l3, h) for h in l3_switches}
+        mac_futures = {h: executor.submit(collect_l2, h, EXCLUDE_INTERFACES) for h in l2_switches}
+
+        arp = ArpTable()
+        for h, future in arp_futures.items():
+            table = future.result()
+            if table is not None:
+                arp.extend(table, h)
+        mac_tables = []
+        for h, future in mac_futures.items():
+            macs = future.result()
+            if macs:
+                mac_tables.append((h, macs))
+
+    if not len(arp) or not mac_tables:
+        return None, None
+    return correlate_site(mac_tables, arp, ",".join(l3_switches),
+                          dns_workers=dns_workers, dns_cache=dns_cache), arp
+
+
+def main_site(args):
+    l2_switches = load_switch_list(args.site)
+    print(f"\n{'='*60}")
+    print(f"MAC Discovery & DNS Resolution – site mode")
+    print(f"  L2 Switches: {len(l2_switches)} from {args.site}")
+    print(f"  L3 Switches: {', '.join(args.l3)}")
+    print(f"{'='*60}")
+
+    print(f"\n[1/3] Collecting ARP and MAC tables ({args.workers} parallel sessions)")
+    with open_cache(args.dns_cache) as dns_cache:
+        row_sets, arp = run_site(l2_switches, args.l3, args.workers,
+                                 args.dns_workers, dns_cache)
+    if not row_sets:
+        print("  No ARP entries or no local dynamic MACs collected. Nothing to do.")
+        sys.exit(1)
+
+    print(f"\n[2/3] Writing report")
+    filename = write_excel(row_sets, "site")
+
+    print(f"\n{'='*60}")
+    print(f"SUMMARY")
+    print(f"  L2 switches:     {len(row_sets)}/{len(l2_switches)} collected")
+    print(f"  ARP entries:     {len(arp)}")
+    print(f"  MACs found:      {sum(len(rs) for rs in row_sets)}")
+    print(f"  ARP resolved:    {sum(rs.resolved_ip for rs in row_sets)}")
+    print(f"  DNS resolved:    {sum(rs.resolved_dns for rs in row_sets)}")
+    print(f"  {dns_cache.summary()}")
+    print(f"  Report:          {filename}")
+    print(f"{'='*60}")
+
+
 # ── Main ────────────────────────────────────────────────────
 def main():
     parser = argparse.ArgumentParser(
         description="Discover local MACs on an NX-OS L2 switch, resolve to IP/DNS via L3 ARP, export to Excel."
     )
-    parser.add_argument("l2_switch", help="Hostname/IP of the Layer 2 NX-OS switch")
-    parser.add_argument("l3_switch", help="Hostname/IP of the Layer 3 NX-OS switch")
+    parser.add_argument("l2_switch", nargs="?", help="Hostname/IP of the Layer 2 NX-OS switch")
+    parser.add_argument("l3_switch", nargs="?", help="Hostname/IP of the Layer 3 NX-OS switch")
+    parser.add_argument("--site", metavar="L2_FILE",
+                        help="Site mode: file with one L2 switch per line, merged into one workbook")
+    parser.add_argument("--l3", action="append", default=[], metavar="HOST",
+                        help="Site mode: L3 switch to pull ARP from once (repeatable)")
+    parser.add_argument("--workers", type=int, default=10,
+                        help="Site mode: concurrent switch sessions (default: 10)")
+    parser.add_argument("--dns-workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent reverse DNS lookups (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--dns-cache", default=DEFAULT_DB,
+                        help=f"Persistent DNS cache file (default: {DEFAULT_DB})")
     args = parser.parse_args()
 
+    if args.site:
+        if args.l2_switch or args.l3_switch or not args.l3:
+            parser.error("site mode takes L2 switches from the file and L3 switches via --l3")
+        main_site(args)
+        return
+    if not (args.l2_switch and args.l3_switch):
+        parser.error("l2_switch and l3_switch are required (or use --site FILE --l3 HOST)")
+
     print(f"\n{'='*60}")
     print(f"MAC Discovery & DNS Resolution")
     print(f"  L2 Switch: {args.l2_switch}")
@@ -345,10 +639,12 @@ def main():
 
     # 4 – Correlate MAC→IP  and run DNS lookups
     print(f"\n[4/5] DNS lookups")
-    rows = correlate(macs, arp, args.l2_switch, args.l3_switch)
+    with open_cache(args.dns_cache) as dns_cache:
+        rows = correlate(macs, arp, args.l2_switch, args.l3_switch,
+                         dns_workers=args.dns_workers, dns_cache=dns_cache)
 
-    resolved_ip  = sum(1 for r in rows if r["ip"]  != "N/A")
-    resolved_dns = sum(1 for r in rows if r["dns"] != "N/A")
+    resolved_ip  = rows.resolved_ip
+    resolved_dns = rows.resolved_dns
 
     # 5 – Write Excel
     print(f"\n[5/5] Writing report")
@@ -359,6 +655,7 @@ def main():
     print(f"  MACs found:      {len(macs)}")
     print(f"  ARP resolved:    {resolved_ip}")
     print(f"  DNS resolved:    {resolved_dns}")
+    print(f"  {dns_cache.summary()}")
     print(f"  Report:          {filename}")
     print(f"{'='*60}")
 
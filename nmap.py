@@ -5,29 +5,396 @@
 # Created:      12/08/2014
 # Copyright:    (c) phillipsme 2014
 # Licence:      Free to use, free to have fun!
-# Version:      beta!!! (0.2)
-# ToDo:         add threading
+# Version:      beta!!! (0.3)
+# Notes:        0.3 - asyncio scan engine (thousands of connects in flight),
+#                     per-host adaptive timeouts from measured RTT, retries of
+#                     filtered ports, ipaddress target expansion, JSON/CSV
+#                     output and a --benchmark against a localhost listener farm
 #-------------------------------------------------------------------------------
 import socket
 import argparse
+import asyncio
+import collections
+import csv
+import errno
+import heapq
+import ipaddress
+import json
+import random
+import select
 import sys
 import time
 
-def main():
+DEFAULT_CONCURRENCY = 2000
+DEFAULT_TIMEOUT = 1.0       # connect timeout until a host has RTT samples
+MIN_TIMEOUT = 0.05
+MAX_TIMEOUT = 3.0
+DEFAULT_RETRIES = 1         # extra passes over filtered ports, timeout doubled each pass
+UDP_PROBE = b"--TEST LINE--"
+
+OPEN, CLOSED, FILTERED, OPEN_FILTERED = "open", "closed", "filtered", "open|filtered"
+
+def main(args, targets, ports):
     # Output command line args to screen
     if args.verbose: printmsg("Arguments used:"); print(args)
 
     starttime=time.time()
     # Start Scanning
-    results={}
-    for target in targets:
-        results[target]= portscan(target,ports,args.tcpscan,args.udpscan,args.verbose)
-    printmsg(("Total scantime %.2f seconds") % (time.time()-starttime))
+    scanner = Scanner(concurrency=args.concurrency, timeout=args.timeout, retries=args.retries)
+    results = asyncio.run(scanner.scan(targets, ports, args.tcpscan, args.udpscan))
+    printmsg(("Total scantime %.2f seconds - %d probes (%d retried)") %
+             (time.time()-starttime, scanner.probes, scanner.retried))
 
     for target in results:
-        print("%s TCP:%s  UDP:%s" % (target,results[target][0],results[target][1]))
+        tcpports = open_ports(results[target]["tcp"])
+        udpports = open_ports(results[target]["udp"])
+        if args.verbose:
+            for proto in ("tcp", "udp"):
+                for portnum, state in sorted(results[target][proto].items()):
+                    print("%s %d/%s \t%s" % (target, portnum, proto, state))
+        print("%s TCP:%s  UDP:%s" % (target,tcpports,udpports))
+    if args.json: write_json(results, args.json); printmsg("Results written to %s" % args.json)
+    if args.csv: write_csv(results, args.csv); printmsg("Results written to %s" % args.csv)
     return results
 
+#-------------------------------------------------------------------------------
+# Async scan engine
+#-------------------------------------------------------------------------------
+class RttEstimator:
+    """Per-host probe timeout from measured RTTs (RFC 6298 style: SRTT + 4*RTTVAR)."""
+
+    def __init__(self, initial=DEFAULT_TIMEOUT):
+        self.initial = initial
+        self.srtt = None
+        self.rttvar = None
+
+    def update(self, rtt):
+        if self.srtt is None:
+            self.srtt, self.rttvar = rtt, rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    @property
+    def timeout(self):
+        if self.srtt is None:
+            return self.initial
+        return min(MAX_TIMEOUT, max(MIN_TIMEOUT, self.srtt + 4 * self.rttvar))
+
+def _connect_result(s, err, start):
+    """State and rtt of a finished non-blocking connect (err from connect_ex/SO_ERROR)."""
+    rtt = time.perf_counter() - start
+    if err == errno.ECONNREFUSED:
+        return CLOSED, rtt
+    if err:
+        return FILTERED, None           # host/network unreachable, etc.
+    if s.getsockname() == s.getpeername():
+        return CLOSED, rtt              # loopback self-connect to our own ephemeral port
+    # RST instead of FIN so open ports don't pile up in TIME_WAIT
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, b"\x01\x00\x00\x00\x00\x00\x00\x00")
+    return OPEN, rtt
+
+class TcpConnectPass:
+    """One pass of TCP connect probes, driven by callbacks rather than a coroutine per probe.
+
+    Up to scanner.concurrency connects are kept in flight.  On Linux the
+    sockets go into a private epoll set (EPOLLOUT | EPOLLONESHOT) that the
+    event loop watches as a single fd, so a probe costs one epoll_ctl and
+    no selector bookkeeping; elsewhere loop.add_writer() is used per socket.
+    Deadlines sit in a heap swept every TICK instead of one loop timer per
+    probe.  Running out of file descriptors lowers scanner.concurrency and
+    requeues the port.
+    """
+    TICK = 0.01
+
+    def __init__(self, scanner, jobs, backoff, results):
+        self.scanner = scanner
+        self.jobs = jobs
+        self.requeued = collections.deque()
+        self.backoff = backoff
+        self.results = results
+        self.inflight = {}              # fd -> (socket, ip, port, start, seq)
+        self.deadlines = []             # heap of (deadline, seq, fd)
+        self.seq = 0
+        self.epoll = select.epoll() if hasattr(select, "epoll") else None
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        self.done = self.loop.create_future()
+        if self.epoll:
+            self.loop.add_reader(self.epoll.fileno(), self._guard, self._on_epoll)
+        self.ticker = self.loop.call_later(self.TICK, self._guard, self._sweep)
+        try:
+            self._fill()
+            if not self.done.done() and not self.inflight: self.done.set_result(None)
+            await self.done
+        finally:
+            self.ticker.cancel()
+            if self.epoll:
+                self.loop.remove_reader(self.epoll.fileno())
+                self.epoll.close()
+            for s, *_ in self.inflight.values():
+                if not self.epoll: self.loop.remove_writer(s.fileno())
+                s.close()
+
+    def _guard(self, callback, *args):
+        """Run a loop callback; an exception ends the pass instead of being logged and lost."""
+        try:
+            callback(*args)
+        except BaseException as e:
+            if not self.done.done(): self.done.set_exception(e)
+
+    def _next_job(self):
+        if self.requeued: return self.requeued.popleft()
+        return next(self.jobs, None)
+
+    def _fill(self):
+        while len(self.inflight) < self.scanner.concurrency:
+            job = self._next_job()
+            if job is None:
+                if not self.inflight and not self.done.done(): self.done.set_result(None)
+                return
+            if not self._start(*job):
+                return
+
+    def _start(self, ip, port):
+        """Begin one connect; False (port requeued) if out of file descriptors."""
+        try:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        except OSError as e:
+            if e.errno not in (errno.EMFILE, errno.ENFILE): raise
+            self._out_of_fds(ip, port)
+            return False
+        s.setblocking(False)
+        start = time.perf_counter()
+        err = s.connect_ex((ip, port))
+        if err not in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+            self._record(ip, port, *_connect_result(s, err, start))
+            s.close()
+            return True
+        fd = s.fileno()
+        est = self.scanner.estimators[ip]
+        timeout = min(MAX_TIMEOUT * self.backoff, est.timeout * self.backoff)
+        self.seq += 1
+        self.inflight[fd] = (s, ip, port, start, self.seq)
+        heapq.heappush(self.deadlines, (start + timeout, self.seq, fd))
+        if self.epoll:
+            self.epoll.register(fd, select.EPOLLOUT | select.EPOLLONESHOT)
+        else:
+            self.loop.add_writer(fd, self._guard, self._connected, fd)
+        return True
+
+    def _out_of_fds(self, ip, port):
+        self.requeued.appendleft((ip, port))
+        if not self.inflight:
+            raise OSError(errno.EMFILE, "out of file descriptors with no probes in flight")
+        limit = max(1, len(self.inflight) * 3 // 4)
+        if limit < self.scanner.concurrency:
+            printmsg("Out of file descriptors: concurrency lowered from %d to %d" %
+                     (self.scanner.concurrency, limit))
+            self.scanner.concurrency = limit
+
+    def _on_epoll(self):
+        self._drain()
+        self._fill()
+
+    def _drain(self):
+        while True:
+            events = self.epoll.poll(0, 1024)
+            for fd, _ in events:
+                self._connected(fd)
+            if len(events) < 1024: return
+
+    def _connected(self, fd):
+        s, ip, port, start, _ = self.inflight.pop(fd)
+        if not self.epoll:
+            self.loop.remove_writer(fd)
+            self._fill_soon()
+        err = s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        self._record(ip, port, *_connect_result(s, err, start))
+        s.close()
+
+    def _fill_soon(self):
+        if not getattr(self, "fill_pending", False):
+            self.fill_pending = True
+            self.loop.call_soon(self._guard, self._fill_now)
+
+    def _fill_now(self):
+        self.fill_pending = False
+        self._fill()
+
+    def _sweep(self):
+        # Connects that finished while the loop was busy are answers, not timeouts
+        if self.epoll: self._drain()
+        now = time.perf_counter()
+        deadlines = self.deadlines
+        while deadlines and deadlines[0][0] <= now:
+            _, seq, fd = heapq.heappop(deadlines)
+            entry = self.inflight.get(fd)
+            if entry is None or entry[4] != seq: continue   # answered; fd may be reused
+            del self.inflight[fd]
+            s, ip, port = entry[:3]
+            if not self.epoll: self.loop.remove_writer(fd)
+            s.close()                   # closing also drops it from the epoll set
+            self._record(ip, port, FILTERED, None)
+        self._fill()
+        self.ticker = self.loop.call_later(self.TICK, self._guard, self._sweep)
+
+    def _record(self, ip, port, state, rtt):
+        if rtt is not None: self.scanner.estimators[ip].update(rtt)
+        self.results[ip][port] = state
+        self.scanner.probes += 1
+
+async def udp_probe(ip, port, timeout, payload=UDP_PROBE):
+    """One UDP datagram. Reply = open, ICMP port unreachable = closed, silence = open|filtered."""
+    loop = asyncio.get_running_loop()
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    s.setblocking(False)
+    start = time.perf_counter()
+    try:
+        s.connect((ip, port))           # connected, so ICMP errors are reported on this socket
+        await loop.sock_sendall(s, payload)
+        await asyncio.wait_for(loop.sock_recv(s, 512), timeout)
+    except ConnectionRefusedError:
+        return CLOSED, time.perf_counter() - start
+    except asyncio.TimeoutError:
+        return OPEN_FILTERED, None
+    except OSError as e:
+        if e.errno in (errno.EMFILE, errno.ENFILE): raise
+        return FILTERED, None
+    else:
+        return OPEN, time.perf_counter() - start
+    finally:
+        s.close()
+
+class Scanner:
+    """Scans (target, port) pairs with at most `concurrency` probes in flight.
+
+    TCP passes run as a TcpConnectPass; UDP uses that many worker
+    coroutines.  Jobs are pulled lazily from a generator, so a /16 x 65535
+    ports scan never materialises more than `concurrency` probes at once.
+    Running out of file descriptors lowers `concurrency` instead of
+    aborting the scan.  Ports that come back filtered (TCP) or
+    open|filtered (UDP) are probed again up to `retries` times with the
+    host's timeout doubled each pass.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES):
+        self.concurrency = max(1, min(concurrency, fd_budget()))
+        self.timeout = timeout
+        self.retries = retries
+        self.estimators = {}
+        self.probes = 0
+        self.retried = 0
+        self.active = 0                 # UDP probes holding a socket
+
+    async def _worker(self, jobs, probe, backoff, results):
+        for ip, port in jobs:
+            est = self.estimators[ip]
+            while True:
+                self.active += 1
+                try:
+                    state, rtt = await probe(ip, port, min(MAX_TIMEOUT * backoff, est.timeout * backoff))
+                    break
+                except OSError as e:
+                    if e.errno not in (errno.EMFILE, errno.ENFILE): raise
+                    # Out of fds: back off until other workers' sockets close, use fewer next pass
+                    self.concurrency = max(1, min(self.concurrency, (self.active - 1) * 3 // 4))
+                    await asyncio.sleep(0.05)
+                finally:
+                    self.active -= 1
+            if rtt is not None: est.update(rtt)
+            results[ip][port] = state
+            self.probes += 1
+
+    async def _run(self, jobs, probe, backoff, results, n_jobs):
+        if probe is None:
+            return await TcpConnectPass(self, jobs, backoff, results).run()
+        workers = min(self.concurrency, n_jobs)
+        await asyncio.gather(*(self._worker(jobs, probe, backoff, results) for _ in range(workers)))
+
+    async def scan_proto(self, targets, ports, proto):
+        """Returns {ip: {port: state}} for one protocol."""
+        probe = None if proto == "tcp" else udp_probe     # None: TcpConnectPass
+        retry_state = FILTERED if proto == "tcp" else OPEN_FILTERED
+        results = {ip: {} for ip in targets}
+        for ip in targets: self.estimators.setdefault(ip, RttEstimator(self.timeout))
+        jobs = ((ip, port) for ip in targets for port in ports)
+        await self._run(jobs, probe, 1, results, len(targets) * len(ports))
+        for attempt in range(1, self.retries + 1):
+            # UDP silence from a host that never answered anything is not worth a second pass
+            pending = [(ip, port) for ip in targets for port, state in results[ip].items()
+                       if state == retry_state
+                       and (proto == "tcp" or self.estimators[ip].srtt is not None)]
+            if not pending: break
+            self.retried += len(pending)
+            await self._run(iter(pending), probe, 2 ** attempt, results, len(pending))
+        return results
+
+    async def scan(self, targets, ports, tcp=True, udp=False):
+        """Returns {ip: {"tcp": {port: state}, "udp": {port: state}}}."""
+        results = {ip: {"tcp": {}, "udp": {}} for ip in targets}
+        for proto, enabled in (("tcp", tcp), ("udp", udp)):
+            if not enabled: continue
+            for ip, states in (await self.scan_proto(targets, ports, proto)).items():
+                results[ip][proto] = states
+        return results
+
+def fd_budget(reserve=100):
+    """Raise the open-file soft limit as far as allowed; return how many sockets we may use."""
+    try:
+        import resource
+    except ImportError:
+        return DEFAULT_CONCURRENCY      # Windows: no per-process fd limit to speak of
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        want = DEFAULT_CONCURRENCY * 4 if hard == resource.RLIM_INFINITY else hard
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (want, hard))
+            soft = want
+        except (ValueError, OSError):
+            pass
+    return max(1, soft - reserve)
+
+def open_ports(states):
+    return sorted(p for p, s in states.items() if s == OPEN)
+
+#-------------------------------------------------------------------------------
+# Output
+#-------------------------------------------------------------------------------
+def write_json(results, path):
+    """Per target: open ports per protocol plus a count of every state."""
+    out = {}
+    for ip, protos in results.items():
+        entry = {}
+        for proto, states in protos.items():
+            if not states: continue
+            counts = {}
+            for s in states.values(): counts[s] = counts.get(s, 0) + 1
+            entry[proto] = {
+                "open": open_ports(states),
+                "open|filtered": sorted(p for p, s in states.items() if s == OPEN_FILTERED),
+                "filtered": sorted(p for p, s in states.items() if s == FILTERED),
+                "counts": counts,
+            }
+        out[ip] = entry
+    with open(path, "w") as f:
+        json.dump(out, f, indent=2)
+
+def write_csv(results, path):
+    """One row per port that is not closed: ip, protocol, port, state."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ip", "protocol", "port", "state"])
+        for ip, protos in results.items():
+            for proto, states in protos.items():
+                for port, state in sorted(states.items()):
+                    if state != CLOSED: writer.writerow([ip, proto, port, state])
+
+#-------------------------------------------------------------------------------
+# Legacy sequential scanner (kept for --benchmark comparison)
+#-------------------------------------------------------------------------------
 def portscan(target,ports,tcp,udp,verbose):
     #target=IPaddr,ports=list of ports,tcp=true/false,udp=true/false,verbose=true/false
     tcpports=[]
@@ -65,52 +432,111 @@ def portscan(target,ports,tcp,udp,verbose):
                 (target,time.time()-targetstarttime,len(tcpports),len(udpports))))
     return tcpports, udpports
 
+#-------------------------------------------------------------------------------
+# Self-benchmark
+#-------------------------------------------------------------------------------
+class _UdpEcho(asyncio.DatagramProtocol):
+    def connection_made(self, transport): self.transport = transport
+    def datagram_received(self, data, addr): self.transport.sendto(data, addr)
+
+async def _listener_farm(n_tcp, n_udp):
+    """Open n_tcp TCP listeners and n_udp UDP echo sockets on 127.0.0.1 ephemeral ports."""
+    loop = asyncio.get_running_loop()
+    servers, transports = [], []
+    async def accept(reader, writer): writer.close()
+    for _ in range(n_tcp):
+        servers.append(await asyncio.start_server(accept, "127.0.0.1", 0, backlog=512))
+    for _ in range(n_udp):
+        transport, _ = await loop.create_datagram_endpoint(_UdpEcho, local_addr=("127.0.0.1", 0))
+        transports.append(transport)
+    tcp_ports = {s.sockets[0].getsockname()[1] for s in servers}
+    udp_ports = {t.get_extra_info("sockname")[1] for t in transports}
+    return servers, transports, tcp_ports, udp_ports
+
+def _score(name, found, expected, scanned, elapsed):
+    hits = len(found & expected)
+    printmsg("%-22s %6d ports in %7.2fs = %8.0f ports/s   found %d/%d open, %d false positives" %
+             (name, scanned, elapsed, scanned / elapsed if elapsed else 0, hits, len(expected),
+              len(found - expected)))
+
+async def _benchmark(n_tcp, n_udp, concurrency, legacy_sample):
+    servers, transports, tcp_open, udp_open = await _listener_farm(n_tcp, n_udp)
+    try:
+        lo, hi = min(tcp_open), max(tcp_open)
+        tcp_ports = list(range(lo, hi + 1))
+        # UDP: every echo port plus as many closed ports picked from the same range
+        closed = [p for p in random.sample(range(lo, hi + 1), min(hi - lo + 1, 4 * n_udp))
+                  if p not in udp_open][:n_udp]
+        udp_ports = sorted(udp_open) + closed
+        printmsg("Listener farm: %d TCP listeners across ports %d-%d, %d UDP echo sockets" %
+                 (n_tcp, lo, hi, n_udp))
+
+        scanner = Scanner(concurrency=concurrency)
+        start = time.perf_counter()
+        tcp = await scanner.scan_proto(["127.0.0.1"], tcp_ports, "tcp")
+        _score("async tcp", set(open_ports(tcp["127.0.0.1"])), tcp_open,
+               len(tcp_ports), time.perf_counter() - start)
+        start = time.perf_counter()
+        udp = await scanner.scan_proto(["127.0.0.1"], udp_ports, "udp")
+        states = udp["127.0.0.1"]
+        _score("async udp", set(open_ports(states)), udp_open, len(udp_ports), time.perf_counter() - start)
+        printmsg("  udp closed ports reported closed: %d/%d" %
+                 (sum(1 for p in closed if states[p] == CLOSED), len(closed)))
+        printmsg("  rtt estimate 127.0.0.1: srtt %.2f ms, timeout %.0f ms, %d retried probes" %
+                 (scanner.estimators["127.0.0.1"].srtt * 1000, scanner.estimators["127.0.0.1"].timeout * 1000,
+                  scanner.retried))
+
+        # Legacy sequential scan blocks, so run it in a thread while the farm keeps accepting
+        sample = sorted(set(random.sample(tcp_ports, min(legacy_sample, len(tcp_ports)))) |
+                        set(random.sample(sorted(tcp_open), min(len(tcp_open), legacy_sample // 10))))
+        start = time.perf_counter()
+        legacy, _ = await asyncio.to_thread(portscan, "127.0.0.1", sample, True, False, False)
+        _score("legacy sequential tcp", set(legacy), tcp_open & set(sample), len(sample),
+               time.perf_counter() - start)
+        printmsg("  loopback answers in microseconds; on a real network the legacy scanner costs "
+                 "ports x RTT and its 10 ms timeout misses every port further than 10 ms away")
+    finally:
+        for s in servers: s.close()
+        for t in transports: t.close()
+
+#-------------------------------------------------------------------------------
+# Helpers
+#-------------------------------------------------------------------------------
 def errormsg(msg): print("[!] Error: %s" % (msg)); sys.exit(1)
 def printmsg(msg): print("[+] nmap.py: %s" % (msg))
 
-def iprange(addressrange): # converts a ip range into a list
-    list=[]
-    first3octets = '.'.join(addressrange.split('-')[0].split('.')[:3]) + '.'
-    for i in range(int(addressrange.split('-')[0].split('.')[3]),int(addressrange.split('-')[1])+1):
-        list.append(first3octets+str(i))
-    return list
-
-def ip2bin(ip):
-    b = ""
-    inQuads = ip.split(".")
-    outQuads = 4
-    for q in inQuads:
-        if q != "": b += dec2bin(int(q),8); outQuads -= 1
-    while outQuads > 0: b += "00000000"; outQuads -= 1
-    return b
-
-def dec2bin(n,d=None):
-    s = ""
-    while n>0:
-        if n&1: s = "1"+s
-        else: s = "0"+s
-        n >>= 1
-    if d is not None:
-        while len(s)<d: s = "0"+s
-    if s == "": s = "0"
-    return s
-
-def bin2ip(b):
-    ip = ""
-    for i in range(0,len(b),8):
-        ip += str(int(b[i:i+8],2))+"."
-    return ip[:-1]
-
-def returnCIDR(c):
-    parts = c.split("/")
-    baseIP = ip2bin(parts[0])
-    subnet = int(parts[1])
-    ips=[]
-    if subnet == 32: return bin2ip(baseIP)
-    else:
-        ipPrefix = baseIP[:-(32-subnet)]
-        for i in range(2**(32-subnet)): ips.append(bin2ip(ipPrefix+dec2bin(i, (32-subnet))))
-        return ips
+def iprange(addressrange): # converts an ip range (10.0.0.1-20 or 10.0.0.1-10.0.1.20) into a list
+    first, last = addressrange.split('-')
+    first = ipaddress.IPv4Address(first.strip())
+    last = last.strip()
+    if '.' not in last: # short form: last octet only
+        last = '.'.join(str(first).split('.')[:3] + [last])
+    last = ipaddress.IPv4Address(last)
+    if last < first: raise ValueError("range end %s is before start %s" % (last, first))
+    return [str(ipaddress.IPv4Address(i)) for i in range(int(first), int(last) + 1)]
+
+def returnCIDR(c): # every usable host address of a network (the address itself for /31 and /32)
+    return [str(ip) for ip in ipaddress.IPv4Network(c, strict=False).hosts()]
+
+def expand_targets(spec):
+    """Comma-separated CIDRs, ranges, IPs and hostnames -> de-duplicated IP list."""
+    targets = []
+    for item in (x.strip() for x in spec.split(',')):
+        if not item: continue
+        try:
+            if '/' in item: targets.extend(returnCIDR(item))
+            elif '-' in item and item.replace('-', '').replace('.', '').isdigit(): targets.extend(iprange(item))
+            else:
+                try: targets.append(str(ipaddress.IPv4Address(item)))
+                except ValueError: targets.append(socket.gethostbyname(item)) # get IP from FQDN
+        except (ValueError, socket.error) as e:
+            errormsg("Bad target %s: %s" % (item, e))
+    return list(dict.fromkeys(targets))
+
+def parse_ports(spec):
+    if spec == '-': spec = '1-65535'
+    ranges = (x.split("-") for x in spec.split(","))
+    return sorted({i for r in ranges for i in range(int(r[0]), int(r[-1]) + 1)})
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='nmap.py - Replicates limited nmap functionality in python')
@@ -118,25 +544,30 @@ if __name__ == '__main__':
     parser.add_argument('-sS', '--tcpscan', action='store_true', help='Enable this for TCP scans')
     parser.add_argument('-sU', '--udpscan', action='store_true', help='Enable this for UDP scans')
     parser.add_argument('-p', '--ports', default='1-1024', help='The ports you want to scan (21,22,80,135-139,443,445)')
-    parser.add_argument('-t', '--targets', help='The target(s) you want to scan (192.168.0.1)')
+    parser.add_argument('-t', '--targets', help='The target(s) you want to scan (192.168.0.1, 10.0.0.0/24, 10.0.0.1-50, host, ...)')
+    parser.add_argument('-c', '--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help='Probes in flight at once (default %d, capped by the open-file limit)' % DEFAULT_CONCURRENCY)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help='Initial probe timeout in seconds before RTT is measured (default %.1f)' % DEFAULT_TIMEOUT)
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help='Re-probe filtered ports this many times (default %d)' % DEFAULT_RETRIES)
+    parser.add_argument('-oJ', '--json', metavar='FILE', help='Write results as JSON')
+    parser.add_argument('-oC', '--csv', metavar='FILE', help='Write non-closed ports as CSV')
+    parser.add_argument('--benchmark', nargs='?', const=500, type=int, metavar='N',
+                        help='Scan a localhost farm of N TCP listeners (default 500) and compare with the legacy scanner')
     if len(sys.argv)==1: parser.print_help(); sys.exit(0)
     args = parser.parse_args()
 
+    if args.benchmark:
+        asyncio.run(_benchmark(args.benchmark, max(1, args.benchmark // 10), args.concurrency, 2000))
+        sys.exit(0)
+
     # Set target (and convert for FQDN)
-    targets=[]
-    if args.targets:
-        if '/' in args.targets: #found cidr target
-            targets = returnCIDR(args.targets)
-        elif '-' in args.targets:
-            targets = iprange(args.targets)
-        else:
-            try: targets.append(socket.gethostbyname(args.targets)) # get IP from FQDN
-            except: errormsg("Failed to translate hostname to IP address")
+    if args.targets: targets = expand_targets(args.targets)
     else: parser.print_help(); errormsg("You need to set a hostname")
+    if not (args.tcpscan or args.udpscan): args.tcpscan = True  # like nmap, default to a TCP scan
 
     # Set ports
-    if args.ports == '-': args.ports = '1-65535'
-    ranges = (x.split("-") for x in args.ports.split(","))
-    ports = [i for r in ranges for i in range(int(r[0]), int(r[-1]) + 1)]
+    ports = parse_ports(args.ports)
 
-    main()
+    main(args, targets, ports)
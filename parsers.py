@@ -0,0 +1,597 @@
+#!/usr/bin/env python3
+"""
+parsers.py - Shared parsers for Cisco IOS / NX-OS show command output.
+
+Pure functions only (no device connections, no logging setup at import),
+so they can be imported by the collection scripts, by worker processes
+of batch_parse.py, and by offline tools working on saved output.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+
+# ====================================================================
+# show version
+# ====================================================================
+
+IOS_VERSION_PATTERNS = {
+    'cisco_ios': [
+        re.compile(r'Cisco IOS Software.*Version\s+([0-9]+\.[0-9]+(?:\.[0-9]+)*[A-Z0-9]*)', re.IGNORECASE),
+        re.compile(r'Version\s+([0-9]+\.[0-9]+(?:\.[0-9]+)*[A-Z0-9]*)', re.IGNORECASE),
+    ],
+    'cisco_ios_xe': [
+        re.compile(r'Cisco IOS XE Software.*Version\s+([0-9]+\.[0-9]+\.[0-9]+[A-Z0-9]*)', re.IGNORECASE),
+        re.compile(r'Version\s+([0-9]+\.[0-9]+\.[0-9]+[A-Z0-9]*)', re.IGNORECASE),
+    ],
+}
+
+NXOS_VERSION_PATTERNS = [
+    re.compile(r'NXOS:\s+version\s+(\S+)', re.IGNORECASE),
+    re.compile(r'system:\s+version\s+(\S+)', re.IGNORECASE),
+    re.compile(r'NX-OS.*Version\s+(\S+)', re.IGNORECASE),
+]
+
+
+def detect_device_type(output):
+    """Detect cisco_nxos / cisco_ios_xe / cisco_ios from show version output."""
+    if re.search(r'Cisco Nexus Operating System|NX-OS', output, re.IGNORECASE):
+        return 'cisco_nxos'
+    if re.search(r'Cisco IOS XE Software', output, re.IGNORECASE):
+        return 'cisco_ios_xe'
+    return 'cisco_ios'
+
+
+def extract_version(output):
+    """Return (version, device_type) from show version output.
+
+    IOS/IOS XE versions have trailing letters stripped (15.2.4.S7 style
+    trains are left as-is); NX-OS versions are returned verbatim, e.g.
+    9.3(8).  Version is "Unknown" when nothing matches.
+    """
+    device_type = detect_device_type(output)
+
+    if device_type == 'cisco_nxos':
+        for pattern in NXOS_VERSION_PATTERNS:
+            match = pattern.search(output)
+            if match:
+                return match.group(1), device_type
+        return "Unknown", device_type
+
+    for pattern in IOS_VERSION_PATTERNS[device_type]:
+        match = pattern.search(output)
+        if match:
+            # Clean up version string (remove trailing letters/codes)
+            return re.sub(r'[A-Z]+$', '', match.group(1)), device_type
+    return "Unknown", device_type
+
+
+# ====================================================================
+# show inventory
+# ====================================================================
+
+_INV_NAME_RE = re.compile(r'NAME:\s*"([^"]*)"\s*,\s*DESCR:\s*"([^"]*)"', re.IGNORECASE)
+_INV_PID_RE = re.compile(r'PID:\s*(\S*)\s*,\s*VID:\s*(\S*)\s*,\s*SN:\s*(\S*)', re.IGNORECASE)
+
+
+def parse_inventory(output):
+    """Parse 'show inventory' into [{name, descr, pid, vid, sn}, ...]."""
+    items = []
+    current = None
+    for line in output.splitlines():
+        m = _INV_NAME_RE.search(line)
+        if m:
+            current = {'name': m.group(1), 'descr': m.group(2), 'pid': '', 'vid': '', 'sn': ''}
+            items.append(current)
+            continue
+        m = _INV_PID_RE.search(line)
+        if m and current is not None:
+            current['pid'], current['vid'], current['sn'] = m.group(1), m.group(2), m.group(3)
+            current = None
+    return items
+
+
+# ====================================================================
+# show mac address-table / show ip arp (NX-OS)
+# ====================================================================
+
+# NX-OS format (typical):
+#  [*+~G] VLAN  MAC_Address          Type   age  Secure NTFY  Ports
+#  *      10    aabb.ccdd.0001       dynamic 0   F      F     Eth1/1
+MAC_TABLE_RE = re.compile(
+    r'[\*\+~G]?\s*(\d+)\s+'                                        # VLAN
+    r'([0-9a-fA-F]{4}\.[0-9a-fA-F]{4}\.[0-9a-fA-F]{4})\s+'        # MAC
+    r'(\w+)\s+'                                                     # Type
+    r'\S+\s+'                                                       # age
+    r'\S+\s+'                                                       # Secure
+    r'\S+\s+'                                                       # NTFY
+    r'(\S+)'                                                        # Port
+)
+
+# NX-OS format:
+#  Address       Age       MAC Address          Interface    Flags
+#  10.1.1.1      00:05:32  aabb.ccdd.0001       Vlan10
+ARP_RE = re.compile(
+    r'(\d+\.\d+\.\d+\.\d+)\s+'                                     # IP
+    r'\S+\s+'                                                       # Age
+    r'([0-9a-fA-F]{4}\.[0-9a-fA-F]{4}\.[0-9a-fA-F]{4})\s+'        # MAC
+    r'(\S+)'                                                        # Interface
+)
+
+
+# ====================================================================
+# show port-channel summary
+# ====================================================================
+
+def parse_portchannel_summary(output):
+    """Map member interface -> "PoN (flag)" from 'show port-channel summary'."""
+    portchannel_map = {}
+    current_pc = None
+    dash_count = 0
+
+    for line in output.splitlines():
+        if re.match(r'^-+$', line.strip()):
+            dash_count += 1
+            continue
+
+        if dash_count < 2:
+            continue
+
+        line = line.strip()
+
+        # New Po line with optional members
+        po_match = re.match(r'^\d+\s+(Po\d+)', line)
+        if po_match:
+            current_pc = po_match.group(1)
+
+        # Always look for interfaces, even on same line as Po or wrapped line
+        if current_pc:
+            matches = re.findall(r'(Eth\d+/\d+(?:/\d+)?)\((\w)\)', line)
+            for intf, status in matches:
+                portchannel_map[intf] = f"{current_pc} ({status})"
+
+    return portchannel_map
+
+
+_PO_GROUP_RE = re.compile(r'^(\d+)\s+(Po\d+)\((\w+)\)\s+(\S+)\s+(\S+)')
+_PO_MEMBER_RE = re.compile(r'(Eth\d+/\d+(?:/\d+)?)\((\w)\)')
+
+
+def parse_portchannel_groups(output):
+    """Structured 'show port-channel summary': one dict per port-channel.
+
+    {"group": 10, "portchannel": "Po10", "flags": "SU", "type": "Eth",
+     "protocol": "LACP", "members": [("Eth1/1", "P"), ...]}
+    """
+    groups = []
+    current = None
+    dash_count = 0
+
+    for line in output.splitlines():
+        if re.match(r'^-+$', line.strip()):
+            dash_count += 1
+            continue
+        if dash_count < 2:
+            continue
+
+        m = _PO_GROUP_RE.match(line.strip())
+        if m:
+            current = {
+                "group": int(m.group(1)),
+                "portchannel": m.group(2),
+                "flags": m.group(3),
+                "type": m.group(4),
+                "protocol": m.group(5),
+                "members": [],
+            }
+            groups.append(current)
+        if current:
+            current["members"].extend(_PO_MEMBER_RE.findall(line))
+
+    return groups
+
+
+# ====================================================================
+# show vpc brief (NX-OS)
+# ====================================================================
+
+_VPC_FIELD_RE = re.compile(r'^(vPC domain id|Peer status|vPC keep-alive status|vPC role)\s*:\s*(.+?)\s*$',
+                           re.IGNORECASE)
+_VPC_ROW_RE = re.compile(r'^(\d+)\s+(Po\d+)\s+(\S+)(?:\s+(\S+))?')
+
+
+def parse_vpc_brief(output):
+    """Parse 'show vpc brief' into domain fields, peer-link and vPC rows.
+
+    {"domain_id": "10", "peer_status": "...", "keepalive_status": "...",
+     "role": "primary", "peer_link": "Po1",
+     "vpcs": [{"id": 10, "port": "Po10", "status": "up", "consistency": "success"}]}
+
+    Returns None when vPC is not configured.
+    """
+    keys = {"vpc domain id": "domain_id", "peer status": "peer_status",
+            "vpc keep-alive status": "keepalive_status", "vpc role": "role"}
+    result = {"domain_id": "", "peer_status": "", "keepalive_status": "",
+              "role": "", "peer_link": "", "vpcs": []}
+    section = None
+
+    for line in output.splitlines():
+        stripped = line.strip()
+        m = _VPC_FIELD_RE.match(stripped)
+        if m:
+            result[keys[m.group(1).lower()]] = m.group(2)
+            continue
+        low = stripped.lower()
+        if low.startswith("vpc peer-link status"):
+            section = "peer_link"
+            continue
+        if low.startswith("vpc status"):
+            section = "vpcs"
+            continue
+        m = _VPC_ROW_RE.match(stripped)
+        if not m or section is None:
+            continue
+        if section == "peer_link":
+            result["peer_link"] = m.group(2)
+        else:
+            result["vpcs"].append({"id": int(m.group(1)), "port": m.group(2),
+                                   "status": m.group(3), "consistency": m.group(4) or ""})
+
+    if not result["domain_id"] or "not configured" in result["domain_id"].lower():
+        return None
+    return result
+
+
+# ====================================================================
+# show cdp neighbors detail
+# ====================================================================
+
+@dataclass
+class CDPNeighbor:
+    """Represents a CDP neighbor entry."""
+    local_device: str
+    local_port: str
+    remote_device: str
+    remote_port: str
+    platform: str
+    ip_address: Optional[str] = None
+
+
+
+def parse_cdp_neighbors(output: str, local_device: str) -> list[CDPNeighbor]:
+    """
+    Parse 'show cdp neighbors detail' output from NX-OS or IOS-XE.
+    Returns a list of CDPNeighbor objects.
+    """
+    neighbors = []
+    
+    # Split output into neighbor blocks
+    blocks = re.split(r'-{5,}', output)
+    
+    for block in blocks:
+        if not block.strip():
+            continue
+            
+        # Extract device ID (hostname)
+        device_match = re.search(
+            r'Device ID[:\s]+([^\s\n]+)', block, re.IGNORECASE
+        )
+        if not device_match:
+            continue
+        remote_device = device_match.group(1).split('.')[0]  # Remove domain
+        
+        # Extract IP address
+        ip_match = re.search(
+            r'(?:IP address|IPv4 Address)[:\s]+(\d+\.\d+\.\d+\.\d+)', 
+            block, re.IGNORECASE
+        )
+        ip_address = ip_match.group(1) if ip_match else None
+        
+        # Extract platform
+        platform_match = re.search(
+            r'Platform[:\s]+([^,\n]+)', block, re.IGNORECASE
+        )
+        platform = platform_match.group(1).strip() if platform_match else "Unknown"
+        
+        # Extract local interface
+        # Anchor on "Port ID" so "Interface address(es):" is not mistaken for it
+        local_port_match = re.search(
+            r'Interface[:\s]+([^\s,\n]+),\s*Port ID', block, re.IGNORECASE
+        )
+        local_port = local_port_match.group(1) if local_port_match else "Unknown"
+        
+        # Extract remote port
+        remote_port_match = re.search(
+            r'Port ID \(outgoing port\)[:\s]+([^\s\n]+)', block, re.IGNORECASE
+        )
+        remote_port = remote_port_match.group(1) if remote_port_match else "Unknown"
+        
+        neighbors.append(CDPNeighbor(
+            local_device=local_device,
+            local_port=local_port,
+            remote_device=remote_device,
+            remote_port=remote_port,
+            platform=platform,
+            ip_address=ip_address
+        ))
+    
+    return neighbors
+
+
+# ====================================================================
+# show running-config
+# ====================================================================
+
+def parse_running_config(run_cfg_text):
+    """
+    Parse the output of `show running-config` into a dict keyed by
+    interface name (exactly as it appears after the `interface ` token)
+    whose value is the raw config block for that interface, including
+    the `interface <name>` header line.
+
+    Works for NX-OS native slot/port (Eth1/1) and FEX three-tuple
+    (Eth101/1/1) names, as well as port-channels and mgmt interfaces.
+    """
+    configs = {}
+    current_name = None
+    current_lines = []
+
+    iface_re = re.compile(r"^interface\s+(\S+)\s*$", re.IGNORECASE)
+
+    for line in run_cfg_text.splitlines():
+        m = iface_re.match(line)
+        if m:
+            # flush previous
+            if current_name is not None:
+                configs[current_name] = "\n".join(current_lines).rstrip()
+            current_name = m.group(1)
+            current_lines = [line.rstrip()]
+            continue
+
+        if current_name is None:
+            continue
+
+        # Interface block ends at the first non-indented, non-empty line.
+        if line and not line.startswith((" ", "\t")):
+            configs[current_name] = "\n".join(current_lines).rstrip()
+            current_name = None
+            current_lines = []
+            continue
+
+        current_lines.append(line.rstrip())
+
+    if current_name is not None:
+        configs[current_name] = "\n".join(current_lines).rstrip()
+
+    return configs
+
+
+# ====================================================================
+# show interface transceiver
+# ====================================================================
+
+def _new_transceiver(devicename, interface):
+    return {
+        'devicename': devicename,
+        'interface': interface,
+        'cisco_part_number': '',
+        'serial_number': '',
+        'type': '',
+        'cisco_product_id': '',
+        'name': ''
+    }
+
+
+def parse_nxos_transceiver(output, devicename):
+    """Parse NX-OS show interface transceiver output"""
+    transceivers = []
+
+    # NX-OS format parsing - each interface block
+    current_interface = None
+    current_data = {}
+
+    for line in output.splitlines():
+        line = line.strip()
+
+        # Interface line (e.g., "Ethernet1/1")
+        if re.match(r'^(Ethernet\d+/\d+(/\d+)?|port-channel\d+)', line, re.IGNORECASE):
+            # Save previous interface if we have data
+            if current_interface and current_data:
+                transceivers.append(current_data)
+
+            current_interface = line.split()[0]
+            current_data = _new_transceiver(devicename, current_interface)
+
+        # Parse various fields
+        elif current_interface:
+            lower = line.lower()
+            # Type/transceiver type (e.g., "transceiver is present")
+            if 'transceiver is' in lower:
+                match = re.search(r'transceiver is\s+(.+)', line, re.IGNORECASE)
+                if match:
+                    current_data['type'] = match.group(1).strip()
+
+            # Cisco part number (e.g., "cisco part number is 10-3172-01")
+            elif 'cisco part number' in lower:
+                match = re.search(r'cisco part number\s+is\s+(\S+)', line, re.IGNORECASE)
+                if match:
+                    current_data['cisco_part_number'] = match.group(1)
+
+            # Cisco product id (e.g., "cisco product id is QSFP-100G-SR4-S")
+            elif 'cisco product id' in lower:
+                match = re.search(r'cisco product id\s+is\s+(\S+)', line, re.IGNORECASE)
+                if match:
+                    current_data['cisco_product_id'] = match.group(1)
+
+            # Serial number (e.g., "serial number is ABC1234567")
+            elif 'serial number' in lower:
+                match = re.search(r'serial number\s+is\s+(\S+)', line, re.IGNORECASE)
+                if match:
+                    current_data['serial_number'] = match.group(1)
+
+            # Name/vendor (e.g., "name is CISCO-FINISAR")
+            elif 'name is' in lower:
+                match = re.search(r'name\s+is\s+(.+)', line, re.IGNORECASE)
+                if match:
+                    current_data['name'] = match.group(1).strip()
+
+    # Don't forget the last interface
+    if current_interface and current_data:
+        transceivers.append(current_data)
+
+    # Filter out entries without meaningful data
+    return [t for t in transceivers if t.get('cisco_part_number') or t.get('serial_number')]
+
+
+def parse_ios_transceiver(output, devicename):
+    """Parse IOS show interface transceiver output"""
+    transceivers = []
+
+    current_interface = None
+    current_data = {}
+
+    for line in output.splitlines():
+        line = line.strip()
+
+        # Interface patterns for IOS
+        interface_match = re.match(r'^(Gi\S+|Te\S+|Fa\S+|Eth\S+|TwoGig\S+|TenGig\S+|TwentyFiveGig\S+|FortyGig\S+|HundredGig\S+)', line, re.IGNORECASE)
+        if interface_match:
+            if current_interface and current_data:
+                transceivers.append(current_data)
+
+            current_interface = interface_match.group(1)
+            current_data = _new_transceiver(devicename, current_interface)
+
+        elif current_interface:
+            lower = line.lower()
+            # Parse various fields - IOS format
+            if 'transceiver type' in lower:
+                match = re.search(r'transceiver type[:\s]+(.+)', line, re.IGNORECASE)
+                if match:
+                    current_data['type'] = match.group(1).strip()
+
+            elif 'part number' in lower:
+                match = re.search(r'part number[:\s]+(\S+)', line, re.IGNORECASE)
+                if match:
+                    current_data['cisco_part_number'] = match.group(1)
+
+            elif 'product id' in lower:
+                match = re.search(r'product id[:\s]+(\S+)', line, re.IGNORECASE)
+                if match:
+                    current_data['cisco_product_id'] = match.group(1)
+
+            elif 'serial' in lower:
+                match = re.search(r'serial[^:]*[:\s]+(\S+)', line, re.IGNORECASE)
+                if match:
+                    current_data['serial_number'] = match.group(1)
+
+            elif 'vendor name' in lower or ('name' in lower and 'is' in lower):
+                match = re.search(r'(?:vendor )?name[:\s]+(.+)', line, re.IGNORECASE)
+                if match:
+                    current_data['name'] = match.group(1).strip()
+
+    # Don't forget the last interface
+    if current_interface and current_data:
+        transceivers.append(current_data)
+
+    # Filter out entries without meaningful data
+    return [t for t in transceivers if t.get('cisco_part_number') or t.get('serial_number')]
+
+
+# ====================================================================
+# show interface status / description (fixed-width tables)
+# ====================================================================
+
+def _col_positions(header, names):
+    """Derive (start, end) slicing positions from a fixed-width header line."""
+    positions = []
+    for i, name in enumerate(names):
+        start = header.index(name)
+        end = header.index(names[i + 1]) if i + 1 < len(names) else None
+        positions.append((start, end))
+    return positions
+
+
+def _extract(line, positions, keys):
+    """Slice one data line according to precomputed column positions."""
+    row = {}
+    for key, (start, end) in zip(keys, positions):
+        row[key] = (line[start:end] if end else line[start:]).strip()
+    return row
+
+
+def parse_interface_status(raw):
+    """
+    Parse NX-OS 'show interface <range> status'.
+
+    Expected columns (7):
+        Port  Name  Status  Vlan  Duplex  Speed  Type
+    """
+    COL_NAMES = ["Port", "Name", "Status", "Vlan", "Duplex", "Speed", "Type"]
+    KEYS      = ["port", "name", "status", "vlan", "duplex", "speed", "type"]
+    header = None
+    results = []
+    past_sep = False
+
+    for line in raw.splitlines():
+        if not header and all(c in line for c in ("Port", "Status", "Vlan")):
+            header = line
+            past_sep = False
+            continue
+        if header and line.lstrip().startswith("---"):
+            past_sep = True
+            continue
+        if past_sep and line.strip():
+            results.append(line)
+
+    if not header:
+        return []
+
+    pos = _col_positions(header, COL_NAMES)
+    return [_extract(l, pos, KEYS) for l in results]
+
+
+def parse_interface_description(raw):
+    """
+    Parse NX-OS 'show interface <range> description'.
+
+    Handles two common formats:
+      4-col:  Port  Type  Speed  Description
+      2-col:  Interface  Description
+    NX-OS prints both in one output (Ethernet ports first, then Po/Lo/Vlan),
+    so every header starts a new section with its own column positions.
+    Returns (list-of-dicts, is_four_col) where is_four_col describes the
+    first section.
+    """
+    sections = []  # [(header, [data lines]), ...]
+    past_sep = False
+
+    for line in raw.splitlines():
+        stripped = line.strip()
+        if "Description" in line and stripped.startswith(("Port", "Interface")):
+            sections.append((line, []))
+            past_sep = False
+            continue
+        if sections and stripped.startswith("---"):
+            past_sep = True
+            continue
+        if past_sep and stripped:
+            sections[-1][1].append(line)
+
+    if not sections:
+        return [], True
+
+    rows = []
+    for header, data_lines in sections:
+        if "Type" in header and "Speed" in header:
+            col_names = ["Port", "Type", "Speed", "Description"]
+            keys      = ["interface", "type", "speed", "description"]
+        else:
+            col_names = ["Interface", "Description"]
+            keys      = ["interface", "description"]
+        pos = _col_positions(header, col_names)
+        rows.extend(_extract(l, pos, keys) for l in data_lines)
+
+    first = sections[0][0]
+    return rows, "Type" in first and "Speed" in first
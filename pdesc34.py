@@ -1,9 +1,11 @@
+import argparse
 import logging
 from datetime import datetime
-from netmiko import ConnectHandler
+from fleet_snapshot import ConnectHandler, add_snapshot_argument, snapshot_hosts, use_snapshot
 from getCreds import get_netmiko_creds
 import csv
 from tools import getScriptName, setupLogging
+from textfsm_cache import prewarm, send_command_parsed
 
 def collect_data(switch, writer, summary_writer, netmikoUser, passwd):
     device = {
@@ -19,7 +21,7 @@ def collect_data(switch, writer, summary_writer, netmikoUser, passwd):
         conn = ConnectHandler(**device)
         conn.enable()
 
-        output = conn.send_command("show interface status", use_textfsm=True)
+        output = send_command_parsed(conn, "show interface status")
         connected_count = 0
 
         for entry in output:
@@ -56,7 +58,14 @@ def main():
     setupLogging(script_name, timestamp)
 
     nxos_switches = ["sw1", "sw2", "sw3", "sw4"]
+
+    parser = add_snapshot_argument(argparse.ArgumentParser(description="Interface status per switch"))
+    args = parser.parse_args()
+    if args.from_snapshot:
+        use_snapshot(args.from_snapshot)
+        nxos_switches = snapshot_hosts()
     netmikoUser, passwd = get_netmiko_creds()
+    prewarm("cisco_nxos", ["show interface status"])
 
     interfaces_file = f"{script_name}_interfaces_{timestamp}.csv"
     summary_file = f"{script_name}_summary_{timestamp}.csv"
@@ -2,9 +2,25 @@
 """
 Ping network devices loaded from a JSON inventory file.
 Pings each device by both Display Name (DNS) and IP Address concurrently,
-then writes results to a comma-delimited CSV file.
+then writes results to an Excel spreadsheet.
+
+Pinging is done in-process by icmp_ping.py (asyncio, one ICMP socket for
+all targets, names resolved once each through the shared DNS cache in
+dns_cache.py).  If no ICMP socket can be opened
+(not in net.ipv4.ping_group_range and not root) it falls back to running
+the system ping command per target.
+
+Usage: python ping_devices.py [devices.json] [ping_results.xlsx] [--count N] [--timeout S]
+       python ping_devices.py devices.json results.xlsx --monitor [--interval 1] [--duration 600]
+
+--monitor pings every device IP once per interval until Ctrl-C (or
+--duration), prints state changes as they happen plus a periodic summary,
+and at the end writes <output>_monitor.xlsx (per-target summary and every
+UP/DOWN transition) and <output>_history.csv (all retained samples).
 """
 
+import argparse
+import asyncio
 import json
 import socket
 import subprocess
@@ -15,6 +31,10 @@ from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional
 
+from dns_cache import CachedResolver
+from icmp_ping import DEFAULT_CONCURRENCY, ping_many
+from ping_monitor import Monitor
+
 try:
     from openpyxl import Workbook
     from openpyxl.styles import Font, PatternFill, Alignment
@@ -84,7 +104,8 @@ class Device:
         return cls(**resolved)
 
 
-def ping(target: str, target_type: str, count: int = 2, timeout: int = 2) -> PingResult:
+def ping(target: str, target_type: str, count: int = 2, timeout: int = 2,
+         resolver: Optional[CachedResolver] = None) -> PingResult:
     """
     Ping a target on Linux and parse the output.
     Uses -c for count and -W for per-packet timeout (seconds).
@@ -92,10 +113,13 @@ def ping(target: str, target_type: str, count: int = 2, timeout: int = 2) -> Pin
     result = PingResult(target=target, target_type=target_type)
 
     # Resolve the target to an actual IP address
-    try:
-        result.resolved_ip = socket.gethostbyname(target)
-    except socket.gaierror:
-        result.resolved_ip = "DNS_FAIL"
+    if resolver is not None:
+        result.resolved_ip = resolver.gethostbyname(target) or "DNS_FAIL"
+    else:
+        try:
+            result.resolved_ip = socket.gethostbyname(target)
+        except socket.gaierror:
+            result.resolved_ip = "DNS_FAIL"
 
     try:
         proc = subprocess.run(
@@ -136,13 +160,70 @@ def ping(target: str, target_type: str, count: int = 2, timeout: int = 2) -> Pin
     return result
 
 
-def ping_device(device: Device) -> Device:
+def ping_device(device: Device, resolver: Optional[CachedResolver] = None) -> Device:
     """Ping a device by both display name and IP address."""
-    device.ping_by_name = ping(device.display_name, "DisplayName")
-    device.ping_by_ip = ping(device.ip_address, "IP_Address")
+    device.ping_by_name = ping(device.display_name, "DisplayName", resolver=resolver)
+    device.ping_by_ip = ping(device.ip_address, "IP_Address", resolver=resolver)
     return device
 
 
+def to_ping_result(stats, target: str, target_type: str) -> PingResult:
+    """Convert icmp_ping.PingStats into the PingResult shape the report uses."""
+    result = PingResult(target=target, target_type=target_type)
+    result.resolved_ip = stats.resolved_ip or "DNS_FAIL"
+    result.reachable = stats.reachable
+    result.packet_loss = f"{stats.loss_pct:g}%"
+    if stats.rtts:
+        result.rtt_min = f"{stats.rtt_min:.3f}"
+        result.rtt_avg = f"{stats.rtt_avg:.3f}"
+        result.rtt_max = f"{stats.rtt_max:.3f}"
+    result.error = stats.error
+    return result
+
+
+def ping_all(devices: list[Device], count: int = 2, timeout: float = 2,
+             concurrency: int = DEFAULT_CONCURRENCY,
+             resolver: Optional[CachedResolver] = None) -> None:
+    """Ping every device by name and by IP in one asyncio run."""
+    targets = [t for dev in devices for t in (dev.display_name, dev.ip_address)]
+    stats = asyncio.run(ping_many(targets, count=count, timeout=timeout,
+                                  concurrency=concurrency, resolver=resolver))
+    for dev in devices:
+        dev.ping_by_name = to_ping_result(stats[dev.display_name], dev.display_name, "DisplayName")
+        dev.ping_by_ip = to_ping_result(stats[dev.ip_address], dev.ip_address, "IP_Address")
+
+
+def ping_all_subprocess(devices: list[Device], resolver: Optional[CachedResolver] = None) -> None:
+    """Fallback: fork the system ping per target on a thread pool."""
+    max_workers = min(20, len(devices))  # cap threads to avoid flooding
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for future in as_completed([pool.submit(ping_device, dev, resolver) for dev in devices]):
+            future.result()
+
+
+def run_monitor(devices: list[Device], args, output_path: str) -> None:
+    """Continuous mode: one probe per device IP (display name if no IP) per interval."""
+    targets = [(dev.display_name,
+                dev.ip_address if dev.ip_address not in ("", "UNKNOWN") else dev.display_name)
+               for dev in devices]
+    with CachedResolver() as resolver:
+        mon = Monitor(targets, interval=args.interval, capacity=args.history,
+                      down_after=args.down_after, refresh=args.refresh, resolver=resolver)
+        print(f"Monitoring {len(targets)} targets every {args.interval:g}s "
+              f"({'until Ctrl-C' if not args.duration else f'for {args.duration:g}s'})")
+        asyncio.run(mon.run(duration=args.duration))
+
+    stem = os.path.splitext(output_path)[0]
+    xlsx_path, csv_path = f"{stem}_monitor.xlsx", f"{stem}_history.csv"
+    mon.write_xlsx(xlsx_path)
+    mon.write_history_csv(csv_path)
+    down = [r["Target"] for r in mon.summary_rows() if r["Final State"] == "DOWN"]
+    print(f"\n{mon.history.rounds} rounds ({mon.mode} socket), {mon.flaps} transitions, "
+          f"{len(down)} targets DOWN at exit")
+    print(resolver.cache.summary())
+    print(f"Results saved to {xlsx_path} and {csv_path}")
+
+
 def load_devices(json_path: str) -> list[Device]:
     """Load device list from a JSON file.
 
@@ -233,8 +314,24 @@ def write_xlsx(devices: list[Device], output_path: str) -> None:
 
 
 def main():
-    json_path = sys.argv[1] if len(sys.argv) > 1 else "devices.json"
-    output_path = sys.argv[2] if len(sys.argv) > 2 else "ping_results.xlsx"
+    parser = argparse.ArgumentParser(description="Ping devices from a JSON inventory by name and IP.")
+    parser.add_argument("json_path", nargs="?", default="devices.json")
+    parser.add_argument("output_path", nargs="?", default="ping_results.xlsx")
+    parser.add_argument("--count", type=int, default=2, help="Echo requests per target (default: 2)")
+    parser.add_argument("--timeout", type=float, default=2, help="Per-request timeout in seconds (default: 2)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Maximum requests in flight (default: {DEFAULT_CONCURRENCY})")
+    monitor = parser.add_argument_group("monitor mode")
+    monitor.add_argument("--monitor", action="store_true", help="Ping continuously and track UP/DOWN transitions")
+    monitor.add_argument("--interval", type=float, default=1.0, help="Seconds between rounds (default: 1)")
+    monitor.add_argument("--duration", type=float, default=0, help="Stop after N seconds (default: until Ctrl-C)")
+    monitor.add_argument("--history", type=int, default=3600,
+                         help="Samples kept per target in the ring buffer (default: 3600)")
+    monitor.add_argument("--down-after", type=int, default=3,
+                         help="Consecutive losses before a target is DOWN (default: 3)")
+    monitor.add_argument("--refresh", type=float, default=5.0, help="Seconds between summary lines (default: 5)")
+    args = parser.parse_args()
+    json_path, output_path = args.json_path, args.output_path
 
     if not os.path.isfile(json_path):
         print(f"ERROR: File not found: {json_path}")
@@ -243,18 +340,26 @@ def main():
     devices = load_devices(json_path)
     print(f"Loaded {len(devices)} devices from {json_path}")
 
-    # Ping all devices concurrently — one thread per device
-    max_workers = min(20, len(devices))  # cap threads to avoid flooding
-    with ThreadPoolExecutor(max_workers=max_workers) as pool:
-        futures = {pool.submit(ping_device, dev): dev for dev in devices}
-        for future in as_completed(futures):
-            dev = future.result()
-            name_status = "UP" if dev.ping_by_name and dev.ping_by_name.reachable else "DOWN"
-            ip_status = "UP" if dev.ping_by_ip and dev.ping_by_ip.reachable else "DOWN"
-            print(f"  {dev.display_name:<35} name={name_status:<4}  ip={ip_status:<4}  ({dev.machine_type})")
+    if args.monitor:
+        run_monitor(devices, args, output_path)
+        return
+
+    with CachedResolver() as resolver:
+        try:
+            ping_all(devices, count=args.count, timeout=args.timeout, concurrency=args.concurrency,
+                     resolver=resolver)
+        except PermissionError:
+            print("  No ICMP socket permitted (see net.ipv4.ping_group_range); using system ping")
+            ping_all_subprocess(devices, resolver)
+
+    for dev in devices:
+        name_status = "UP" if dev.ping_by_name and dev.ping_by_name.reachable else "DOWN"
+        ip_status = "UP" if dev.ping_by_ip and dev.ping_by_ip.reachable else "DOWN"
+        print(f"  {dev.display_name:<35} name={name_status:<4}  ip={ip_status:<4}  ({dev.machine_type})")
 
     write_xlsx(devices, output_path)
-    print(f"\nResults saved to {output_path}")
+    print(f"\n{resolver.cache.summary()}")
+    print(f"Results saved to {output_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+ping_monitor.py - Continuous reachability monitor on top of icmp_ping.py
+
+Pings every target once per interval from a single ICMP socket and keeps,
+per target, a fixed-size ring buffer of RTT samples (array of float32,
+NaN = lost) plus small counters.  Memory is capacity x targets x 4 bytes
+(2,000 targets x 3,600 samples ~ 27 MB) and does not grow with run time.
+
+A target goes DOWN after `down_after` consecutive losses and UP again on
+the first reply; every transition is recorded with its timestamp.
+
+Used by ping_devices.py --monitor; see Monitor for direct use.
+"""
+
+import asyncio
+import csv
+import math
+import signal
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+
+from icmp_ping import AsyncPinger, resolve_all
+
+UP, DOWN, UNKNOWN = 1, 0, -1
+STATE_NAMES = {UP: "UP", DOWN: "DOWN", UNKNOWN: "UNKNOWN"}
+NAN = float("nan")
+
+
+def fmt_ts(epoch):
+    return datetime.fromtimestamp(epoch).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+@dataclass
+class Transition:
+    timestamp: float
+    label: str
+    ip: str
+    old: int
+    new: int
+    losses: int          # consecutive losses at the time (for DOWN)
+
+
+class RingHistory:
+    """Round-based ring buffers: one shared timestamp ring, one RTT ring per target."""
+
+    def __init__(self, n_targets, capacity):
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.rtt = [array("f", [NAN]) * capacity for _ in range(n_targets)]
+        self.rounds = 0
+
+    def record(self, timestamp, rtts):
+        pos = self.rounds % self.capacity
+        self.times[pos] = timestamp
+        for ring, value in zip(self.rtt, rtts):
+            ring[pos] = NAN if value is None else value
+        self.rounds += 1
+
+    def positions(self):
+        """Ring positions of the retained rounds, oldest first."""
+        kept = min(self.rounds, self.capacity)
+        start = self.rounds - kept
+        return [i % self.capacity for i in range(start, self.rounds)]
+
+    def window(self, i, last):
+        """RTT samples of target *i* over the last *last* rounds (NaN = lost)."""
+        kept = min(self.rounds, self.capacity, last)
+        return [self.rtt[i][j % self.capacity] for j in range(self.rounds - kept, self.rounds)]
+
+
+class Monitor:
+    """Ping *targets* every *interval* seconds until stopped or *duration* ends.
+
+    ``targets`` is a list of (label, host-or-ip) pairs.  Pass a
+    dns_cache.CachedResolver as ``resolver`` to resolve names through it.
+    """
+
+    def __init__(self, targets, interval=1.0, timeout=None, capacity=3600,
+                 down_after=3, refresh=5.0, printer=print, resolver=None):
+        self.targets = targets
+        self.resolver = resolver
+        self.interval = interval
+        self.timeout = timeout or min(1.0, interval * 0.9)
+        self.capacity = capacity
+        self.down_after = down_after
+        self.refresh = refresh
+        self.print = printer
+        self.transitions = []
+        self.flaps = 0
+        self.unresolved = []
+
+    def _setup(self, resolved):
+        self.labels, self.ips = [], []
+        for label, host in self.targets:
+            ip = resolved.get(host)
+            if ip:
+                self.labels.append(label)
+                self.ips.append(ip)
+            else:
+                self.unresolved.append(label)
+        n = len(self.ips)
+        self.history = RingHistory(n, self.capacity)
+        self.state = array("b", [UNKNOWN]) * n
+        self.losses = array("H", [0]) * n
+        self.loss_start = array("d", [0.0]) * n     # timestamp of the current streak's first loss
+        self.sent = array("L", [0]) * n
+        self.received = array("L", [0]) * n
+        self.rtt_sum = array("d", [0.0]) * n
+        self.rtt_min = array("f", [math.inf]) * n
+        self.rtt_max = array("f", [0.0]) * n
+        self.down_since = array("d", [0.0]) * n
+        self.downtime = array("d", [0.0]) * n
+
+    async def _probe(self, pinger, ip):
+        try:
+            return await pinger.ping(ip, self.timeout)
+        except OSError:
+            return None         # send buffer full / unreachable: count as loss
+
+    def _update(self, timestamp, rtts):
+        self.history.record(timestamp, rtts)
+        for i, rtt in enumerate(rtts):
+            self.sent[i] += 1
+            old = self.state[i]
+            if rtt is not None:
+                self.received[i] += 1
+                self.rtt_sum[i] += rtt
+                if rtt < self.rtt_min[i]:
+                    self.rtt_min[i] = rtt
+                if rtt > self.rtt_max[i]:
+                    self.rtt_max[i] = rtt
+                self.losses[i] = 0
+                new = UP
+            else:
+                if self.losses[i] == 0:
+                    self.loss_start[i] = timestamp
+                self.losses[i] = min(self.losses[i] + 1, 0xFFFF)
+                new = DOWN if self.losses[i] >= self.down_after else old
+            if new != old:
+                self.state[i] = new
+                when = timestamp
+                if new == DOWN:
+                    # Down from the first loss, not the down_after-th that confirmed it
+                    when = self.down_since[i] = self.loss_start[i]
+                elif old == DOWN:
+                    self.downtime[i] += timestamp - self.down_since[i]
+                t = Transition(when, self.labels[i], self.ips[i], old, new, self.losses[i])
+                self.transitions.append(t)
+                if old != UNKNOWN:
+                    self.flaps += 1
+                    self.print(f"  {fmt_ts(when)}  {t.label:<35} {STATE_NAMES[old]} -> "
+                               f"{STATE_NAMES[new]}")
+
+    def _summary_line(self, timestamp):
+        up = sum(1 for s in self.state if s == UP)
+        down = sum(1 for s in self.state if s == DOWN)
+        last = self.history.rounds - 1
+        pos = last % self.capacity
+        rtts = [r[pos] for r in self.history.rtt if not math.isnan(r[pos])]
+        avg = f"{sum(rtts) / len(rtts):.2f} ms" if rtts else "n/a"
+        return (f"[{datetime.fromtimestamp(timestamp):%H:%M:%S}] round {self.history.rounds}: "
+                f"{up} up, {down} down, {len(self.ips) - up - down} pending | "
+                f"avg rtt {avg} | {self.flaps} transitions")
+
+    async def run(self, duration=0):
+        """Monitor until *duration* seconds pass (0 = until Ctrl-C)."""
+        resolved = await resolve_all([h for _, h in self.targets], resolver=self.resolver)
+        self._setup(resolved)
+        if self.unresolved:
+            self.print(f"  {len(self.unresolved)} targets did not resolve and are skipped")
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        started = loop.time()
+        next_tick = started
+        next_summary = started + self.refresh
+        self.start_time = time.time()
+        async with AsyncPinger(self.timeout) as pinger:
+            self.mode = pinger.mode
+            while not stop.is_set():
+                timestamp = time.time()
+                rtts = await asyncio.gather(*(self._probe(pinger, ip) for ip in self.ips))
+                self._update(timestamp, rtts)
+
+                now = loop.time()
+                if now >= next_summary:
+                    self.print(self._summary_line(timestamp))
+                    next_summary = now + self.refresh
+                if duration and now - started >= duration:
+                    break
+                next_tick += self.interval
+                if next_tick < now:             # fell behind; don't burst to catch up
+                    next_tick = now
+                try:
+                    await asyncio.wait_for(stop.wait(), next_tick - now)
+                except asyncio.TimeoutError:
+                    pass
+        self.end_time = time.time()
+        for i, s in enumerate(self.state):
+            if s == DOWN:
+                self.downtime[i] += self.end_time - self.down_since[i]
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.remove_signal_handler(sig)
+            except (NotImplementedError, RuntimeError):
+                pass
+        return self
+
+    # ── Results ─────────────────────────────────────────────
+    def summary_rows(self):
+        """Per-target totals: label, ip, state, sent, received, loss %, rtt min/avg/max, downtime, flaps."""
+        flaps = {}
+        for t in self.transitions:
+            if t.old != UNKNOWN:
+                flaps[t.label] = flaps.get(t.label, 0) + 1
+        for i, label in enumerate(self.labels):
+            sent, received = self.sent[i], self.received[i]
+            yield {
+                "Target": label,
+                "IP": self.ips[i],
+                "Final State": STATE_NAMES[self.state[i]],
+                "Sent": sent,
+                "Received": received,
+                "Loss %": round(100.0 * (sent - received) / sent, 2) if sent else 100.0,
+                "RTT Min (ms)": round(self.rtt_min[i], 3) if received else "",
+                "RTT Avg (ms)": round(self.rtt_sum[i] / received, 3) if received else "",
+                "RTT Max (ms)": round(self.rtt_max[i], 3) if received else "",
+                "Downtime (s)": round(self.downtime[i], 1),
+                "Transitions": flaps.get(label, 0),
+            }
+
+    def write_history_csv(self, path):
+        """Long-format dump of every retained sample: timestamp, target, ip, rtt_ms ('' = lost)."""
+        h = self.history
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["timestamp", "target", "ip", "rtt_ms"])
+            for pos in h.positions():
+                ts = fmt_ts(h.times[pos])
+                for i, ring in enumerate(h.rtt):
+                    v = ring[pos]
+                    writer.writerow([ts, self.labels[i], self.ips[i],
+                                     "" if math.isnan(v) else f"{v:.3f}"])
+
+    def write_xlsx(self, path):
+        """Summary and Transitions sheets."""
+        from openpyxl import Workbook
+        from openpyxl.styles import Font, PatternFill, Alignment
+
+        wb = Workbook()
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+
+        def sheet(ws, headers, rows):
+            ws.append(headers)
+            for cell in ws[1]:
+                cell.font = header_font
+                cell.fill = header_fill
+                cell.alignment = Alignment(horizontal="center")
+            for row in rows:
+                ws.append(row)
+            for col in ws.columns:
+                max_len = max(len(str(cell.value or "")) for cell in col)
+                ws.column_dimensions[col[0].column_letter].width = max_len + 3
+            ws.freeze_panes = "A2"
+
+        ws = wb.active
+        ws.title = "Summary"
+        rows = list(self.summary_rows())
+        headers = list(rows[0]) if rows else ["Target"]
+        sheet(ws, headers, ([r[h] for h in headers] for r in rows))
+
+        sheet(wb.create_sheet("Transitions"),
+              ["Timestamp", "Target", "IP", "From", "To", "Consecutive Losses"],
+              ([fmt_ts(t.timestamp), t.label, t.ip, STATE_NAMES[t.old], STATE_NAMES[t.new], t.losses]
+               for t in self.transitions))
+        if self.unresolved:
+            sheet(wb.create_sheet("Unresolved"), ["Target"], ([u] for u in self.unresolved))
+        wb.save(path)
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+portchannel_fabric.py - Fabric-wide port-channel / vPC membership map
+
+Collects 'show port-channel summary', 'show cdp neighbors detail' and
+'show vpc brief' from every NX-OS switch in parallel and joins them into
+one membership graph:
+
+    switch -> port-channel -> member interface -> CDP neighbor/port
+    switch <-> vPC peer (via the peer-link's CDP neighbor)
+    port-channel <-> peer's port-channel with the same vPC id
+
+Output:
+    portchannel_fabric_<ts>.xlsx   flat tables: Members, Port-Channels, vPC Pairs
+    portchannel_fabric_<ts>.json   node-link graph of the same data
+
+Usage:
+    python portchannel_fabric.py switches.txt --workers 40
+    python portchannel_fabric.py --from-snapshot fleet_snapshot_20250911_161455.json.gz
+
+Replaces running PortChanPorts.py / pchan2.py one switch at a time for
+vPC audits.  Credentials come from tools.py.
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+from fleet_snapshot import (ConnectHandler, add_snapshot_argument, load_device_list,
+                            snapshot_hosts, use_snapshot)
+from parsers import parse_cdp_neighbors, parse_portchannel_groups, parse_vpc_brief
+
+DEFAULT_WORKERS = 20
+COMMANDS = {
+    "portchannels": "show port-channel summary",
+    "cdp": "show cdp neighbors detail",
+    "vpc": "show vpc brief",
+}
+
+MEMBER_HEADERS = ["Switch", "Port-Channel", "Po Flags", "Protocol", "Member", "Member Flag",
+                  "CDP Neighbor", "Neighbor Port", "Neighbor Platform", "vPC ID", "vPC Peer",
+                  "Peer-Link"]
+PO_HEADERS = ["Switch", "Port-Channel", "Po Flags", "Protocol", "Members", "Members Up",
+              "Neighbors", "vPC ID", "vPC Status", "vPC Consistency", "Peer-Link"]
+VPC_HEADERS = ["Domain", "Switch", "Peer", "vPC ID", "Local Po", "Local Status",
+               "Peer Po", "Peer Status", "Local Neighbors", "Peer Neighbors", "Issue"]
+
+logger = logging.getLogger(__name__)
+
+
+def short_intf(name):
+    """Ethernet1/49 -> Eth1/49, port-channel10 -> Po10 (port-channel summary style)."""
+    name = re.sub(r"(?i)^ethernet", "Eth", name.strip())
+    return re.sub(r"(?i)^port-channel", "Po", name)
+
+
+# ====================================================================
+# Collection
+# ====================================================================
+
+def collect_switch(hostname, username, password, secret):
+    """SSH to one switch and return its raw port-channel/CDP/vPC output."""
+    record = {"hostname": hostname, "status": "Failed", "error": ""}
+    start = time.perf_counter()
+    try:
+        with ConnectHandler(device_type="cisco_nxos", host=hostname, username=username,
+                            password=password, secret=secret, fast_cli=False, timeout=60) as conn:
+            for key, command in COMMANDS.items():
+                try:
+                    record[key] = conn.send_command(command, read_timeout=120)
+                except Exception as e:
+                    record[key] = ""
+                    logger.warning(f"{hostname}: '{command}' failed: {e}")
+        record["status"] = "Success"
+    except Exception as e:
+        record["error"] = str(e)
+        logger.error(f"{hostname}: {e}")
+    record["seconds"] = round(time.perf_counter() - start, 2)
+    return record
+
+
+def parse_switch(record):
+    """Parse one switch's raw output into port-channels, CDP map and vPC state."""
+    hostname = record["hostname"]
+    cdp = {}
+    for n in parse_cdp_neighbors(record.get("cdp", ""), hostname):
+        cdp[short_intf(n.local_port)] = n
+    return {
+        "hostname": hostname,
+        "portchannels": parse_portchannel_groups(record.get("portchannels", "")),
+        "cdp": cdp,
+        "vpc": parse_vpc_brief(record.get("vpc", "")),
+    }
+
+
+def collect_fabric(hostnames, username, password, secret, workers=DEFAULT_WORKERS):
+    """Collect and parse every switch concurrently; returns ({host: parsed}, [failed])."""
+    switches, failed = {}, []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(collect_switch, h, username, password, secret) for h in hostnames]
+        for done, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            host = record["hostname"]
+            if record["status"] == "Success":
+                switches[host] = parse_switch(record)
+            else:
+                failed.append(host)
+            print(f"  [{done}/{len(hostnames)}] {host}: {record['status']} ({record['seconds']}s)")
+    return switches, failed
+
+
+# ====================================================================
+# Membership graph
+# ====================================================================
+
+def build_fabric(switches):
+    """Join parsed switch data into flat tables and a node-link graph.
+
+    Returns {"members": [...], "portchannels": [...], "vpc_pairs": [...],
+             "graph": {"nodes": [...], "edges": [...]}}.
+    """
+    members, portchannels = [], []
+    nodes, edges = {}, []
+    peers = {}        # switch -> vPC peer switch (from the peer-link's CDP neighbor)
+    vpcs_of = {}      # switch -> {vpc id: (po row, vpc row)}
+
+    # CDP strips the domain from device IDs; map them back to collected hostnames
+    by_short = {h.split(".")[0].lower(): h for h in switches}
+
+    def fabric_name(device):
+        return by_short.get(device.lower(), device)
+
+    def add_node(node_id, **attrs):
+        nodes.setdefault(node_id, {"id": node_id, **attrs})
+
+    # Switch nodes first, so a fabric switch seen as a CDP neighbor stays a "switch"
+    for host in sorted(switches):
+        vpc = switches[host]["vpc"] or {}
+        add_node(host, type="switch", vpc_domain=vpc.get("domain_id", ""), vpc_role=vpc.get("role", ""))
+
+    for host in sorted(switches):
+        sw = switches[host]
+        vpc = sw["vpc"] or {}
+        peer_link = vpc.get("peer_link", "")
+        vpc_by_po = {v["port"]: v for v in vpc.get("vpcs", [])}
+        local_vpcs = vpcs_of[host] = {}
+
+        for po in sw["portchannels"]:
+            name = po["portchannel"]
+            v = vpc_by_po.get(name, {})
+            po_id = f"{host}:{name}"
+            neighbors = []
+            up = 0
+            for member, flag in po["members"]:
+                n = sw["cdp"].get(member)
+                neighbor = fabric_name(n.remote_device) if n else ""
+                up += flag == "P"
+                if n:
+                    neighbors.append(neighbor)
+                    if name == peer_link:
+                        peers[host] = neighbor
+                members.append({
+                    "Switch": host, "Port-Channel": name, "Po Flags": po["flags"],
+                    "Protocol": po["protocol"], "Member": member, "Member Flag": flag,
+                    "CDP Neighbor": neighbor,
+                    "Neighbor Port": n.remote_port if n else "",
+                    "Neighbor Platform": n.platform if n else "",
+                    "vPC ID": v.get("id", ""), "vPC Peer": "",
+                    "Peer-Link": "yes" if name == peer_link else "",
+                })
+                if n:
+                    add_node(neighbor, type="neighbor", platform=n.platform)
+                    edges.append({"source": po_id, "target": neighbor, "type": "member",
+                                  "member": member, "flag": flag, "neighbor_port": n.remote_port})
+
+            row = {
+                "Switch": host, "Port-Channel": name, "Po Flags": po["flags"],
+                "Protocol": po["protocol"], "Members": len(po["members"]), "Members Up": up,
+                "Neighbors": ", ".join(sorted(set(neighbors))),
+                "vPC ID": v.get("id", ""), "vPC Status": v.get("status", ""),
+                "vPC Consistency": v.get("consistency", ""),
+                "Peer-Link": "yes" if name == peer_link else "",
+            }
+            portchannels.append(row)
+            add_node(po_id, type="port-channel", switch=host, portchannel=name,
+                     flags=po["flags"], protocol=po["protocol"],
+                     members=[m for m, _ in po["members"]], vpc_id=v.get("id"))
+            edges.append({"source": host, "target": po_id, "type": "has"})
+            if v:
+                local_vpcs[v["id"]] = (row, v)
+
+    for m in members:
+        m["vPC Peer"] = peers.get(m["Switch"], "") if m["vPC ID"] != "" or m["Peer-Link"] else ""
+
+    vpc_pairs = []
+    for host, peer in sorted(peers.items()):
+        peer_vpcs = vpcs_of.get(peer, {})
+        domain = (switches[host]["vpc"] or {}).get("domain_id", "")
+        if host < peer or peers.get(peer) != host:
+            edges.append({"source": host, "target": peer, "type": "vpc-peer", "domain": domain})
+
+        for vid, (row, v) in sorted(vpcs_of[host].items()):
+            other = peer_vpcs.get(vid)
+            # Each healthy pair is reported once, from the lower-named switch
+            if other and peers.get(peer) == host and peer < host:
+                continue
+            issue = []
+            if not other:
+                issue.append("missing on peer" if peer in switches else "peer not collected")
+            else:
+                edges.append({"source": f"{host}:{row['Port-Channel']}",
+                              "target": f"{peer}:{other[0]['Port-Channel']}",
+                              "type": "vpc", "vpc_id": vid})
+                if other[0]["Neighbors"] != row["Neighbors"]:
+                    issue.append("neighbor mismatch")
+                if v["status"] != "up" or other[1]["status"] != "up":
+                    issue.append("vPC down")
+            vpc_pairs.append({
+                "Domain": domain, "Switch": host, "Peer": peer, "vPC ID": vid,
+                "Local Po": row["Port-Channel"], "Local Status": v["status"],
+                "Peer Po": other[0]["Port-Channel"] if other else "",
+                "Peer Status": other[1]["status"] if other else "",
+                "Local Neighbors": row["Neighbors"],
+                "Peer Neighbors": other[0]["Neighbors"] if other else "",
+                "Issue": ", ".join(issue),
+            })
+
+    return {
+        "members": members,
+        "portchannels": portchannels,
+        "vpc_pairs": vpc_pairs,
+        "graph": {"nodes": list(nodes.values()), "edges": edges},
+    }
+
+
+# ====================================================================
+# Output
+# ====================================================================
+
+def write_excel(fabric, filename):
+    wb = Workbook()
+    wb.remove(wb.active)
+    hdr_fill = PatternFill("solid", fgColor="4472C4")
+    hdr_font = Font(bold=True, color="FFFFFF")
+    issue_fill = PatternFill("solid", fgColor="F8CBAD")
+
+    for title, headers, rows in (("Members", MEMBER_HEADERS, fabric["members"]),
+                                 ("Port-Channels", PO_HEADERS, fabric["portchannels"]),
+                                 ("vPC Pairs", VPC_HEADERS, fabric["vpc_pairs"])):
+        ws = wb.create_sheet(title)
+        ws.append(headers)
+        for cell in ws[1]:
+            cell.fill = hdr_fill
+            cell.font = hdr_font
+        widths = [len(h) for h in headers]
+        for row in rows:
+            values = [row.get(h, "") for h in headers]
+            ws.append(values)
+            for i, v in enumerate(values):
+                widths[i] = max(widths[i], len(str(v)))
+            if row.get("Issue"):
+                for cell in ws[ws.max_row]:
+                    cell.fill = issue_fill
+        for i, w in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(i)].width = min(w + 2, 60)
+        ws.freeze_panes = "A2"
+        ws.auto_filter.ref = ws.dimensions
+
+    wb.save(filename)
+    logger.info(f"Saved Excel report: {filename}")
+
+
+def write_json(fabric, filename, meta):
+    with open(filename, "w") as f:
+        json.dump({"meta": meta, **fabric["graph"]}, f, indent=1)
+    logger.info(f"Saved JSON graph: {filename}")
+
+
+def main():
+    from tools import get_netmiko_creds, getScriptName, setupLogging
+
+    parser = argparse.ArgumentParser(description="Fabric-wide port-channel / vPC membership map")
+    parser.add_argument("device_file", nargs="?", help="File with one NX-OS switch per line")
+    parser.add_argument("-d", "--device", action="append", default=[], help="Switch hostname/IP (repeatable)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent SSH sessions (default: {DEFAULT_WORKERS})")
+    add_snapshot_argument(parser)
+    args = parser.parse_args()
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
+    scriptName = getScriptName()
+    setupLogging(scriptName, timestamp)
+
+    hosts = [d["host"] for d in load_device_list(args.device_file, "cisco_nxos")] if args.device_file else []
+    hosts += args.device
+    if args.from_snapshot:
+        use_snapshot(args.from_snapshot)
+        hosts = hosts or snapshot_hosts()
+        username = password = secret = None
+    elif hosts:
+        username, password, secret = get_netmiko_creds()
+    if not hosts:
+        parser.error("no switches given (device_file, -d or --from-snapshot)")
+
+    print(f"\nCollecting port-channel/vPC data from {len(hosts)} switches ({args.workers} workers)")
+    start = time.perf_counter()
+    switches, failed = collect_fabric(hosts, username, password, secret, workers=args.workers)
+    fabric = build_fabric(switches)
+    elapsed = time.perf_counter() - start
+
+    xlsx = f"{scriptName}_{timestamp}.xlsx"
+    jsn = f"{scriptName}_{timestamp}.json"
+    write_excel(fabric, xlsx)
+    write_json(fabric, jsn, {"created": timestamp, "switches": sorted(switches), "failed": sorted(failed)})
+
+    issues = sum(1 for p in fabric["vpc_pairs"] if p["Issue"])
+    print(f"\n{len(switches)}/{len(hosts)} switches, {len(fabric['portchannels'])} port-channels, "
+          f"{len(fabric['members'])} members, {len(fabric['vpc_pairs'])} vPCs ({issues} with issues) "
+          f"in {elapsed:.1f}s")
+    print(f"Report: {xlsx}")
+    print(f"Graph:  {jsn}")
+    return 0 if switches else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
-import socket
 import csv
+from dns_cache import CachedResolver
 
 # Replace this list with your actual hostnames
 deviceNames = [
@@ -10,14 +10,17 @@ deviceNames = [
 
 def resolveHostnames(hostnames):
     results = []
-    for name in hostnames:
-        try:
-            ip = socket.gethostbyname(name)
-            results.append((name, ip))
-            print(f"{name} -> {ip}")
-        except socket.gaierror:
-            results.append((name, "Resolution failed"))
-            print(f"{name} -> Resolution failed")
+    # Answers (and failures) are reused across runs from the shared DNS cache
+    with CachedResolver() as resolver:
+        for name in hostnames:
+            ip = resolver.gethostbyname(name)
+            if ip:
+                results.append((name, ip))
+                print(f"{name} -> {ip}")
+            else:
+                results.append((name, "Resolution failed"))
+                print(f"{name} -> Resolution failed")
+        print(resolver.cache.summary())
     return results
 
 def writeToCsv(data, filename="resolved_devices.csv"):
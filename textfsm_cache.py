@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+textfsm_cache.py - Process-wide cache of compiled TextFSM templates
+
+netmiko's send_command(use_textfsm=True) looks the command up in the
+ntc-templates index and compiles the template from disk on every call, in
+every thread.  Across 1,000 devices that is 1,000 compiles of the same file.
+
+This module resolves each (platform, command) pair to its template once,
+compiles it once, and hands out private copies of the compiled state
+machine to worker threads (a TextFSM object keeps parse state, so one
+instance must not be shared by two threads at the same time).
+
+Usage:
+    from textfsm_cache import prewarm, send_command_parsed
+
+    prewarm("cisco_nxos", ["show interface status", "show cdp neighbors"])
+    rows = send_command_parsed(conn, "show interface status")
+
+Like netmiko, parse results are a list of dicts with lower-case keys, and
+the raw string is returned when no template exists, the template parses
+no rows, or TextFSM is missing.
+"""
+
+import copy
+import logging
+import os
+import re
+import threading
+
+try:
+    import textfsm
+    from textfsm import clitable
+    TEXTFSM_AVAILABLE = True
+except ImportError:
+    TEXTFSM_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def get_template_dir():
+    """Locate the ntc-templates directory the same way netmiko does."""
+    try:
+        from netmiko.utilities import get_template_dir as netmiko_template_dir
+        return netmiko_template_dir()
+    except Exception:
+        pass
+    template_dir = os.environ.get("NET_TEXTFSM")
+    if template_dir:
+        return os.path.expanduser(template_dir)
+    try:
+        import ntc_templates
+        return os.path.join(os.path.dirname(ntc_templates.__file__), "templates")
+    except ImportError:
+        return None
+
+
+class TemplateCache:
+    """Thread-safe cache of compiled TextFSM templates keyed by platform+command."""
+
+    def __init__(self, template_dir=None):
+        self.template_dir = template_dir or get_template_dir()
+        self._lock = threading.Lock()
+        self._index = None
+        self._templates = {}    # (platform, command) -> template path, or None
+        self._prototypes = {}   # template path -> compiled TextFSM
+        self._idle = {}         # template path -> [TextFSM, ...] ready for reuse
+        self.compiles = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def available(self):
+        return TEXTFSM_AVAILABLE and bool(self.template_dir) and os.path.isdir(self.template_dir)
+
+    def _lookup(self, platform, command):
+        """Resolve (platform, command) to a template path via the ntc index (cached)."""
+        key = (platform, command.strip())
+        if key in self._templates:
+            return self._templates[key]
+        with self._lock:
+            if key in self._templates:
+                return self._templates[key]
+            if self._index is None:
+                self._index = clitable.CliTable("index", self.template_dir)
+            path = None
+            row = self._index.index.GetRowMatch({"Platform": platform, "Command": key[1]})
+            if row:
+                names = self._index.index.index[row]["Template"].split(":")
+                if len(names) == 1:
+                    path = os.path.join(self.template_dir, names[0].strip())
+                else:
+                    # Multi-template entries are merged by clitable; not cached
+                    path = ""
+            self._templates[key] = path
+            return path
+
+    def _borrow(self, path):
+        """Take a private TextFSM instance for *path*, compiling only the first time."""
+        with self._lock:
+            idle = self._idle.setdefault(path, [])
+            if idle:
+                self.hits += 1
+                return idle.pop()
+            proto = self._prototypes.get(path)
+            if proto is None:
+                with open(path) as f:
+                    proto = textfsm.TextFSM(f)
+                self._prototypes[path] = proto
+                self.compiles += 1
+                logger.debug(f"Compiled TextFSM template {path}")
+            else:
+                self.hits += 1
+        return copy.deepcopy(proto)
+
+    def _release(self, path, fsm):
+        fsm.Reset()
+        with self._lock:
+            self._idle[path].append(fsm)
+
+    def parse(self, platform, command, output):
+        """Parse *output* of *command* on *platform*; raw string if nothing parsed."""
+        if not self.available:
+            return output
+        path = self._lookup(platform, command)
+        if path is None:
+            self.misses += 1
+            return output
+        # Output a template cannot handle, or that yields no rows, comes back
+        # raw, as netmiko does
+        if path == "":
+            table = clitable.CliTable("index", self.template_dir)
+            try:
+                table.ParseCmd(output, {"Platform": platform, "Command": command})
+            except (textfsm.TextFSMError, clitable.CliTableError) as e:
+                self.misses += 1
+                logger.debug(f"TextFSM could not parse {platform} '{command}': {e}")
+                return output
+            if not table.size:
+                return output
+            keys = [h.lower() for h in table.header]
+            return [dict(zip(keys, row)) for row in table]
+
+        fsm = self._borrow(path)
+        try:
+            rows = fsm.ParseText(output)
+            keys = [h.lower() for h in fsm.header]
+        except textfsm.TextFSMError as e:
+            self.misses += 1
+            logger.debug(f"TextFSM could not parse {platform} '{command}': {e}")
+            return output
+        finally:
+            self._release(path, fsm)
+        if not rows:
+            return output
+        return [dict(zip(keys, row)) for row in rows]
+
+    def prewarm(self, platform, commands):
+        """Resolve and compile templates for *commands* up front.
+
+        Returns the number of commands that have a template.
+        """
+        if not self.available:
+            logger.warning("TextFSM templates not available; prewarm skipped")
+            return 0
+        found = 0
+        for command in commands:
+            path = self._lookup(platform, command)
+            if path:
+                self._release(path, self._borrow(path))
+                found += 1
+            elif path is None:
+                logger.warning(f"No TextFSM template for {platform} '{command}'")
+        logger.info(f"Prewarmed {found}/{len(commands)} TextFSM templates for {platform}")
+        return found
+
+    def stats(self):
+        return {"compiles": self.compiles, "hits": self.hits, "misses": self.misses}
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide TemplateCache, creating it on first use."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = TemplateCache()
+    return _default_cache
+
+
+def parse_output(platform, command, output):
+    """Parse command output with the shared cache (see TemplateCache.parse)."""
+    return get_cache().parse(platform, command, output)
+
+
+def prewarm(platform, commands):
+    """Compile templates for *commands* in the shared cache at startup."""
+    return get_cache().prewarm(platform, commands)
+
+
+def send_command_parsed(conn, command, platform=None, **kwargs):
+    """Drop-in for conn.send_command(command, use_textfsm=True, ...).
+
+    Fetches raw output over the connection and parses it with the shared
+    template cache instead of netmiko's per-call template compile.
+    """
+    kwargs.pop("use_textfsm", None)
+    output = conn.send_command(command, **kwargs)
+    if platform is None:
+        # netmiko strips the transport suffix before the template lookup too
+        platform = re.sub(r"_(ssh|telnet|serial)$", "", conn.device_type)
+    return parse_output(platform, command, output)
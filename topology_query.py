@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+topology_query.py - Indexed CDP topology model and query CLI
+
+Turns CDP neighbor records into a link-level model instead of a graph
+with ports pasted into an edge label:
+
+    Link          one physical link: both ends' device and port, the
+                  platform reported for the far end, and the port-channel
+                  each end belongs to (from a portchannel_fabric JSON)
+    Topology      devices, links and indexes (device -> links,
+                  (device, port) -> link) over a networkx MultiGraph keyed
+                  by link id, so parallel links stay separate
+
+A link reported from both ends is stored once.  Questions are answered
+from the indexes plus linear-time graph walks, in milliseconds on a
+few-thousand-device topology.
+
+Usage:
+    python topology_query.py -s topology.db device core1
+    python topology_query.py -s topology.db port core1 Eth1/49
+    python topology_query.py -s topology.db path acc-sw12 core1
+    python topology_query.py -s topology.db impact dist-sw3 [dist-sw4 ...] [--root core1]
+    python topology_query.py -s topology.db spof [--top 20]
+    python topology_query.py -s topology.db redundancy
+    ... --portchannels portchannel_fabric_<ts>.json   annotate port-channel membership
+
+"Impact" and "spof" are relative to the root devices: every core-role
+device (see topology_render.infer_role) unless --root is given.
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Optional
+
+import networkx as nx
+
+from parsers import CDPNeighbor
+from topology_render import infer_role
+
+# Long interface names -> the short forms used by 'show port-channel summary'
+_PORT_PREFIXES = [
+    (r"ethernet", "Eth"),
+    (r"port-channel", "Po"),
+    (r"hundredgigabitethernet|hundredgige", "Hu"),
+    (r"fortygigabitethernet", "Fo"),
+    (r"twentyfivegige", "Twe"),
+    (r"tengigabitethernet", "Te"),
+    (r"gigabitethernet", "Gi"),
+    (r"fastethernet", "Fa"),
+    (r"mgmt", "mgmt"),
+]
+_PORT_RE = [(re.compile(rf"(?i)^({p})\s*"), short) for p, short in _PORT_PREFIXES]
+
+
+def normalize_port(port: str) -> str:
+    """Ethernet1/49 -> Eth1/49, GigabitEthernet1/0/1 -> Gi1/0/1; lookups are case-insensitive."""
+    port = (port or "").strip()
+    for regex, short in _PORT_RE:
+        if regex.match(port):
+            return regex.sub(short, port, count=1)
+    return port
+
+
+@dataclass
+class Link:
+    """One physical link between two device ports."""
+    id: int
+    a: str
+    a_port: str
+    b: str
+    b_port: str
+    b_platform: str = ""
+    a_portchannel: str = ""
+    b_portchannel: str = ""
+    seen_from_both: bool = False
+
+    def other(self, device: str) -> tuple[str, str]:
+        """(device, port) at the far end from `device`."""
+        return (self.b, self.b_port) if device == self.a else (self.a, self.a_port)
+
+    def port_of(self, device: str) -> str:
+        return self.a_port if device == self.a else self.b_port
+
+    def portchannel_of(self, device: str) -> str:
+        return self.a_portchannel if device == self.a else self.b_portchannel
+
+    def describe(self, device: str) -> str:
+        far, far_port = self.other(device)
+        po = self.portchannel_of(device)
+        return f"{device} {self.port_of(device)}{f' ({po})' if po else ''} <-> {far} {far_port}"
+
+
+class Topology:
+    """Devices, links and their indexes."""
+
+    def __init__(self):
+        self.devices: dict[str, dict] = {}          # name -> platform, queried, role
+        self.links: list[Link] = []
+        self.by_device: dict[str, list[int]] = defaultdict(list)
+        self.by_port: dict[tuple[str, str], int] = {}
+        self.graph = nx.MultiGraph()                # edge keys are link ids
+        self._lower: dict[str, str] = {}
+        self._cache: dict = {}
+
+    # ── Building ─────────────────────────────────────────
+    @classmethod
+    def from_neighbors(cls, neighbors: list[CDPNeighbor]) -> "Topology":
+        topo = cls()
+        queried = {n.local_device for n in neighbors}
+        platforms = {}
+        for n in neighbors:
+            platforms.setdefault(n.remote_device, n.platform)
+        # Devices in first-seen order, as the report order of the neighbors
+        for name in dict.fromkeys(d for n in neighbors for d in (n.local_device, n.remote_device)):
+            topo._add_device(name, platforms.get(name, "Queried Device"), name in queried)
+        for n in neighbors:
+            topo._add_link(n)
+        return topo
+
+    @classmethod
+    def from_store(cls, db_file: str) -> "Topology":
+        from topology_store import TopologyStore
+        with TopologyStore(db_file) as store:
+            return cls.from_neighbors(store.all_neighbors())
+
+    def _add_device(self, name: str, platform: str, queried: bool) -> None:
+        self.devices[name] = {
+            "platform": platform,
+            "queried": queried,
+            "role": infer_role(name, platform, queried),
+        }
+        self._lower[name.lower()] = name
+        self._lower.setdefault(name.split(".")[0].lower(), name)
+        self.graph.add_node(name)
+
+    def _add_link(self, n: CDPNeighbor) -> None:
+        a_key = (n.local_device, normalize_port(n.local_port).lower())
+        b_key = (n.remote_device, normalize_port(n.remote_port).lower())
+        existing = self.by_port.get(a_key)
+        if existing is not None:
+            link = self.links[existing]
+            if link.b == n.remote_device and normalize_port(link.b_port).lower() == b_key[1]:
+                return                              # same report twice
+        existing = self.by_port.get(b_key)
+        if existing is not None:
+            link = self.links[existing]
+            if link.b == n.local_device and normalize_port(link.b_port).lower() == a_key[1]:
+                link.seen_from_both = True          # far end reported it first
+                return
+        link = Link(len(self.links), n.local_device, normalize_port(n.local_port),
+                    n.remote_device, normalize_port(n.remote_port), n.platform)
+        self.links.append(link)
+        self.by_device[link.a].append(link.id)
+        self.by_device[link.b].append(link.id)
+        self.by_port[a_key] = link.id
+        self.by_port.setdefault(b_key, link.id)
+        self.graph.add_edge(link.a, link.b, key=link.id)
+        self._cache.clear()
+
+    def annotate_portchannels(self, fabric_json: str) -> int:
+        """Set a/b_portchannel from a portchannel_fabric JSON; returns links annotated."""
+        with open(fabric_json) as f:
+            data = json.load(f)
+        count = 0
+        for node in data.get("nodes", []):
+            if node.get("type") != "port-channel":
+                continue
+            switch = self.resolve(node["switch"])
+            if not switch:
+                continue
+            for member in node.get("members", []):
+                link_id = self.by_port.get((switch, normalize_port(member).lower()))
+                if link_id is None:
+                    continue
+                link = self.links[link_id]
+                if link.a == switch:
+                    link.a_portchannel = node["portchannel"]
+                else:
+                    link.b_portchannel = node["portchannel"]
+                count += 1
+        return count
+
+    def simple_graph(self) -> nx.Graph:
+        """One edge per device pair with the links in a 'label', for drawing."""
+        G = nx.Graph()
+        for name, attrs in self.devices.items():
+            G.add_node(name, platform=attrs["platform"], queried=attrs["queried"])
+        for link in self.links:
+            label = f"{link.a_port} <-> {link.b_port}"
+            if G.has_edge(link.a, link.b):
+                G[link.a][link.b]["label"] += f"\n{label}"
+            else:
+                G.add_edge(link.a, link.b, label=label)
+        return G
+
+    # ── Lookups ──────────────────────────────────────────
+    def resolve(self, name: str) -> Optional[str]:
+        """Exact, case-insensitive or domain-less match of a device name."""
+        if name in self.devices:
+            return name
+        return self._lower.get(name.lower()) or self._lower.get(name.split(".")[0].lower())
+
+    def links_of(self, device: str) -> list[Link]:
+        return [self.links[i] for i in self.by_device.get(device, [])]
+
+    def link_at(self, device: str, port: str) -> Optional[Link]:
+        link_id = self.by_port.get((device, normalize_port(port).lower()))
+        return None if link_id is None else self.links[link_id]
+
+    def is_infra(self, device: str) -> bool:
+        return self.devices[device]["role"] != "endpoint"
+
+    def roots(self, names: Optional[list[str]] = None) -> list[str]:
+        if names:
+            return [self.resolve(n) for n in names if self.resolve(n)]
+        core = [d for d, a in self.devices.items() if a["role"] == "core"]
+        if core:
+            return core
+        return [max(self.devices, key=lambda d: len(self.by_device[d]))] if self.devices else []
+
+    # ── Queries ──────────────────────────────────────────
+    def path(self, src: str, dst: str) -> Optional[list[tuple[str, str, list[Link]]]]:
+        """Fewest-hop path as [(from, to, parallel links between them)], None if unreachable."""
+        try:
+            hops = nx.shortest_path(self.graph, src, dst)
+        except nx.NetworkXNoPath:
+            return None
+        return [
+            (u, v, [self.links[k] for k in self.graph[u][v]])
+            for u, v in zip(hops, hops[1:])
+        ]
+
+    def impact(self, failed_devices=(), failed_links=(), roots=None) -> set[str]:
+        """Devices that can no longer reach any root once the given devices/links fail."""
+        failed = set(failed_devices)
+        dead_links = set(failed_links)
+        start = [r for r in (roots or self.roots()) if r not in failed]
+        reached = set(start)
+        queue = deque(start)
+        while queue:
+            u = queue.popleft()
+            for link_id in self.by_device[u]:
+                if link_id in dead_links:
+                    continue
+                v, _ = self.links[link_id].other(u)
+                if v not in reached and v not in failed:
+                    reached.add(v)
+                    queue.append(v)
+        # Only devices that could reach a root before count as losing connectivity
+        before = self._reachable(tuple(roots or self.roots()))
+        return before - reached - failed
+
+    def _reachable(self, roots: tuple) -> set[str]:
+        key = ("reach", roots)
+        if key not in self._cache:
+            seen = set(roots)
+            queue = deque(roots)
+            while queue:
+                u = queue.popleft()
+                for v in self.graph.adj[u]:
+                    if v not in seen:
+                        seen.add(v)
+                        queue.append(v)
+            self._cache[key] = seen
+        return self._cache[key]
+
+    def single_points_of_failure(self, roots=None) -> dict[str, tuple[int, int]]:
+        """{device: (devices cut off, of which infrastructure)} for every device whose
+        failure disconnects others from the roots.
+
+        One iterative Tarjan DFS from a virtual node joined to every root:
+        a child subtree with low >= disc[v] only reaches the roots through v,
+        so its size is what v's failure cuts off.  O(V + E) for all devices.
+        """
+        roots = tuple(roots or self.roots())
+        key = ("spof", roots)
+        if key in self._cache:
+            return self._cache[key]
+        top = object()
+        adj = {n: list(self.graph.adj[n]) for n in self.graph}
+        disc, low = {top: 0}, {top: 0}
+        size, infra = {}, {}
+        cut = defaultdict(lambda: [0, 0])
+        timer = 0
+        stack = [(top, None, iter(roots))]
+        while stack:
+            v, parent, it = stack[-1]
+            for w in it:
+                if w == parent:
+                    continue
+                if w in disc:
+                    low[v] = min(low[v], disc[w])
+                    continue
+                timer += 1
+                disc[w] = low[w] = timer
+                size[w], infra[w] = 1, int(self.is_infra(w))
+                # Roots also hang off the virtual node, so they never count as cut off
+                neighbors = adj[w] + [top] if w in roots else adj[w]
+                stack.append((w, v, iter(neighbors)))
+                break
+            else:
+                stack.pop()
+                if parent is None:
+                    continue
+                low[parent] = min(low[parent], low[v])
+                if parent is not top:
+                    size[parent] += size[v]
+                    infra[parent] += infra[v]
+                    if low[v] >= disc[parent]:
+                        cut[parent][0] += size[v]
+                        cut[parent][1] += infra[v]
+        result = {d: (c[0], c[1]) for d, c in cut.items()}
+        self._cache[key] = result
+        return result
+
+    def articulation_points(self) -> list[str]:
+        """Devices whose failure splits the graph (independent of roots)."""
+        key = ("ap",)
+        if key not in self._cache:
+            self._cache[key] = sorted(nx.articulation_points(nx.Graph(self.graph)))
+        return self._cache[key]
+
+    def redundancy(self) -> dict[str, list]:
+        """Infrastructure redundancy findings (endpoints are ignored).
+
+        single_homed      device with links to only one other device
+        single_link       device pair joined by one link whose loss splits the network
+        bundle_only       device pair with parallel links but no alternate device path
+        single_member_po  port-channel with just one member link (needs --portchannels)
+        """
+        infra = [d for d in self.devices if self.is_infra(d)]
+        G = nx.Graph(self.graph.subgraph(infra))
+        findings = {"single_homed": [], "single_link": [], "bundle_only": [], "single_member_po": []}
+        for d in sorted(infra):
+            if G.degree(d) == 1:
+                (peer,) = G.adj[d]
+                findings["single_homed"].append((d, peer, self.graph.number_of_edges(d, peer)))
+        for u, v in nx.bridges(G):
+            u, v = sorted((u, v))
+            n = self.graph.number_of_edges(u, v)
+            findings["single_link" if n == 1 else "bundle_only"].append((u, v, n))
+        members = defaultdict(list)
+        for link in self.links:
+            if link.a_portchannel:
+                members[(link.a, link.a_portchannel)].append(link)
+            if link.b_portchannel:
+                members[(link.b, link.b_portchannel)].append(link)
+        for (device, po), links in sorted(members.items()):
+            if len(links) == 1:
+                findings["single_member_po"].append((device, po, links[0].describe(device)))
+        for k in ("single_link", "bundle_only"):
+            findings[k].sort()
+        return findings
+
+
+# ====================================================================
+# CLI
+# ====================================================================
+
+def _require(topo: Topology, name: str) -> str:
+    device = topo.resolve(name)
+    if not device:
+        sys.exit(f"Unknown device: {name}")
+    return device
+
+
+def cmd_device(topo, args):
+    device = _require(topo, args.name)
+    attrs = topo.devices[device]
+    print(f"{device}  role={attrs['role']}  platform={attrs['platform']}  "
+          f"{'queried' if attrs['queried'] else 'seen via CDP only'}")
+    by_peer = defaultdict(list)
+    for link in topo.links_of(device):
+        by_peer[link.other(device)[0]].append(link)
+    for peer, links in sorted(by_peer.items()):
+        print(f"  {peer}  ({len(links)} link{'s' if len(links) > 1 else ''})")
+        for link in links:
+            print(f"    {link.describe(device)}")
+
+
+def cmd_port(topo, args):
+    device = _require(topo, args.name)
+    link = topo.link_at(device, args.port)
+    if not link:
+        sys.exit(f"No CDP link on {device} {args.port}")
+    print(link.describe(device))
+    print(f"  far-end platform: {link.b_platform if device == link.a else topo.devices[link.a]['platform']}"
+          f"{'  (reported from both ends)' if link.seen_from_both else ''}")
+
+
+def cmd_path(topo, args):
+    src, dst = _require(topo, args.src), _require(topo, args.dst)
+    hops = topo.path(src, dst)
+    if hops is None:
+        print(f"No path from {src} to {dst}")
+        return
+    print(f"{src} -> {dst}: {len(hops)} hop(s)")
+    for u, v, links in hops:
+        print(f"  {u} -> {v}  [{len(links)} parallel link{'s' if len(links) > 1 else ''}]")
+        for link in links:
+            print(f"      {link.describe(u)}")
+
+
+def cmd_impact(topo, args):
+    devices, links = [], []
+    for spec in args.targets:
+        # DEVICE, or DEVICE:PORT for a single link
+        name, port = spec, ""
+        if not topo.resolve(spec) and ":" in spec:
+            name, _, port = spec.rpartition(":")
+        device = _require(topo, name)
+        if port:
+            link = topo.link_at(device, port)
+            if not link:
+                sys.exit(f"No CDP link on {device} {port}")
+            links.append(link.id)
+        else:
+            devices.append(device)
+    roots = topo.roots(args.root)
+    lost = topo.impact(devices, links, roots)
+    infra = sorted(d for d in lost if topo.is_infra(d))
+    print(f"Failing {', '.join(args.targets)} (roots: {', '.join(roots)}): "
+          f"{len(lost)} device(s) lose connectivity, {len(infra)} of them infrastructure")
+    for d in infra:
+        print(f"  {d}  [{topo.devices[d]['role']}]")
+    rest = len(lost) - len(infra)
+    if rest:
+        print(f"  ... plus {rest} endpoint(s)")
+
+
+def cmd_spof(topo, args):
+    roots = topo.roots(args.root)
+    spof = topo.single_points_of_failure(roots)
+    ranked = sorted(spof.items(), key=lambda kv: (-kv[1][1], -kv[1][0], kv[0]))
+    if not args.include_endpoint_only:
+        ranked = [(d, c) for d, c in ranked if c[1]]
+    print(f"Single points of failure relative to {', '.join(roots)}: {len(ranked)}")
+    print(f"  {'Device':<40} {'Role':<13} {'Infra lost':>10} {'Total lost':>10}")
+    for device, (total, infra) in ranked[:args.top]:
+        print(f"  {device:<40} {topo.devices[device]['role']:<13} {infra:>10} {total:>10}")
+
+
+def cmd_redundancy(topo, args):
+    findings = topo.redundancy()
+    titles = {
+        "single_homed": "Single-homed devices (one upstream neighbor)",
+        "single_link": "Single-link bridges (no link or device redundancy)",
+        "bundle_only": "Bundle-only bridges (parallel links, no alternate device path)",
+        "single_member_po": "Port-channels with one member link",
+    }
+    for key, title in titles.items():
+        rows = findings[key]
+        print(f"\n{title}: {len(rows)}")
+        for row in rows[:args.top]:
+            if key == "single_member_po":
+                print(f"  {row[0]} {row[1]}: {row[2]}")
+            elif key == "single_homed":
+                print(f"  {row[0]} -> {row[1]} ({row[2]} link{'s' if row[2] > 1 else ''})")
+            else:
+                print(f"  {row[0]} <-> {row[1]} ({row[2]} link{'s' if row[2] > 1 else ''})")
+        if len(rows) > args.top:
+            print(f"  ... {len(rows) - args.top} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query a stored CDP topology")
+    parser.add_argument("-s", "--store", default="topology.db",
+                        help="SQLite topology store written by cdp_mapper --store (default: topology.db)")
+    parser.add_argument("--portchannels", metavar="JSON",
+                        help="portchannel_fabric JSON to annotate port-channel membership")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("device", help="Links of one device, grouped by neighbor")
+    p.add_argument("name")
+    p.set_defaults(func=cmd_device)
+
+    p = sub.add_parser("port", help="What is connected to DEVICE PORT")
+    p.add_argument("name")
+    p.add_argument("port")
+    p.set_defaults(func=cmd_port)
+
+    p = sub.add_parser("path", help="Fewest-hop path with the parallel links of every hop")
+    p.add_argument("src")
+    p.add_argument("dst")
+    p.set_defaults(func=cmd_path)
+
+    p = sub.add_parser("impact", help="What loses connectivity if these devices (or DEVICE:PORT links) fail")
+    p.add_argument("targets", nargs="+")
+    p.add_argument("--root", action="append", help="Root device (repeatable; default: core devices)")
+    p.set_defaults(func=cmd_impact)
+
+    p = sub.add_parser("spof", help="Single points of failure ranked by devices cut off")
+    p.add_argument("--root", action="append", help="Root device (repeatable; default: core devices)")
+    p.add_argument("--top", type=int, default=25)
+    p.add_argument("--include-endpoint-only", action="store_true",
+                   help="Also list devices whose failure only cuts off endpoints")
+    p.set_defaults(func=cmd_spof)
+
+    p = sub.add_parser("redundancy", help="Single-homed devices, bridges and one-member port-channels")
+    p.add_argument("--top", type=int, default=50)
+    p.set_defaults(func=cmd_redundancy)
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    topo = Topology.from_store(args.store)
+    if args.portchannels:
+        topo.annotate_portchannels(args.portchannels)
+    loaded = time.perf_counter()
+    args.func(topo, args)
+    done = time.perf_counter()
+    print(f"\n({len(topo.devices)} devices, {len(topo.links)} links; "
+          f"loaded in {(loaded - start) * 1000:.0f} ms, answered in {(done - loaded) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+topology_render.py - Layout and export for large CDP topologies
+
+Replaces a force-directed layout of the whole graph (minutes, unreadable
+past a few hundred nodes) with:
+
+  role_layout     core / distribution / access / endpoint tiers inferred
+                  from platform and hostname, nodes ordered inside a tier
+                  by the mean position of their upstream neighbours
+                  (O(V + E log V)).  Coordinates from a previous run are
+                  reused, so the picture is stable night to night and only
+                  new devices need placing.
+  export_graphml  GraphML with role and x/y for yEd / Gephi
+  export_json     node-link JSON
+  export_html     one self-contained file: a canvas viewer whose edge and
+                  detail data are split into spatial tiles, each in its own
+                  <script type="application/json"> block that is only
+                  parsed when the tile first comes into view.
+
+Usage:
+    from topology_render import role_layout, load_layout_cache, save_layout_cache, export_html
+
+    cache = load_layout_cache("topology.layout.json")
+    pos = role_layout(G, cache)
+    save_layout_cache("topology.layout.json", pos)
+    export_html(G, pos, "topology.html")
+"""
+
+import html
+import json
+import math
+import os
+from collections import defaultdict
+
+import networkx as nx
+
+ROLES = ["core", "distribution", "access", "endpoint"]
+ROLE_COLORS = {
+    "core": "#FF6B6B",
+    "distribution": "#00BCEB",
+    "access": "#6CC24A",
+    "endpoint": "#9E9E9E",
+}
+
+# Checked in order; hostname hints win over platform hints
+_HOSTNAME_HINTS = [
+    ("core", ("core", "spine", "-cr", "wan")),
+    ("distribution", ("dist", "agg", "leaf", "-ds")),
+    ("access", ("acc", "idf", "-as", "fex")),
+    ("endpoint", ("sep", "-ap", "ap-", "phone")),
+]
+_PLATFORM_HINTS = [
+    ("endpoint", ("phone", "air-", "ap ", "ap-", "camera", "linux", "vmware", "windows",
+                  "meraki mr", "polycom")),
+    ("core", ("n7k", "n77", "nexus 7", "nexus7", "c7700", "n9k-c95", "c9600", "c6807", "asr")),
+    ("distribution", ("n9k", "nexus 9", "nexus9", "n5k", "n56", "nexus 5", "n3k", "c9500", "c9400",
+                      "c9410", "c9407", "ws-c45", "ws-c65", "ws-c68", "isr", "c8300")),
+    ("access", ("c9300", "c9200", "ws-c29", "ws-c35", "ws-c36", "ws-c37", "ws-c38", "c3850",
+                "c3650", "c2960", "ie-", "n2k", "fex", "catalyst", "switch")),
+]
+
+GRID = 1.0              # distance between neighbouring nodes, layout units
+TIER_GAP = 4.0          # extra vertical space between tiers
+TILE = 24.0             # HTML tile edge, layout units
+CACHE_VERSION = 1
+
+
+def infer_role(name: str, platform: str, queried: bool = False) -> str:
+    """Best-guess network role from hostname and CDP platform."""
+    name_l, platform_l = (name or "").lower(), (platform or "").lower()
+    for role, hints in _HOSTNAME_HINTS:
+        if any(h in name_l for h in hints):
+            return role
+    for role, hints in _PLATFORM_HINTS:
+        if any(h in platform_l for h in hints):
+            return role
+    # Something we could SSH to and query CDP on is a switch; the rest hangs off one
+    return "access" if queried else "endpoint"
+
+
+def assign_roles(G: nx.Graph) -> dict:
+    """Set a 'role' attribute on every node (unless already present); return {node: role}."""
+    roles = {}
+    for node, data in G.nodes(data=True):
+        role = data.get("role") or infer_role(node, data.get("platform", ""), data.get("queried", False))
+        data["role"] = role
+        roles[node] = role
+    return roles
+
+
+# ── Layout cache ──────────────────────────────────────────
+def load_layout_cache(path: str) -> dict:
+    """{node: (x, y)} from an earlier run; empty if missing or unreadable."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return {node: tuple(xy) for node, xy in data.get("positions", {}).items()}
+
+
+def save_layout_cache(path: str, pos: dict) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"version": CACHE_VERSION,
+                   "positions": {n: [round(x, 3), round(y, 3)] for n, (x, y) in pos.items()}}, f)
+    os.replace(tmp, path)
+
+
+# ── Layout ────────────────────────────────────────────────
+def _tier_rows(n_total: int) -> int:
+    """Nodes per row before a tier wraps, so very wide tiers become blocks."""
+    return max(16, int(math.ceil(math.sqrt(n_total) * 3)))
+
+
+def role_layout(G: nx.Graph, cache: dict = None) -> dict:
+    """Tiered layout; returns {node: (x, y)} with y decreasing from core to endpoint.
+
+    Cached positions are kept as-is.  A tier with no (or mostly no) cached
+    nodes is laid out afresh: nodes are sorted by the mean x of their
+    already placed neighbours (barycenter heuristic, tiers top-down) and
+    wide tiers are folded column-major into several rows so x order is
+    preserved.  Otherwise each new node takes the free grid slot of its
+    tier closest to its neighbours' mean x.
+    """
+    cache = cache or {}
+    roles = assign_roles(G)
+    pos = {n: cache[n] for n in G if n in cache}
+    row_len = _tier_rows(G.number_of_nodes())
+
+    by_role = defaultdict(list)
+    for node in G:
+        by_role[roles[node]].append(node)
+
+    def barycenter(node):
+        xs = [pos[m][0] for m in G.neighbors(node) if m in pos]
+        return sum(xs) / len(xs) if xs else None
+
+    y = 0.0
+    for role in ROLES:
+        nodes = by_role.get(role, [])
+        new = [n for n in nodes if n not in pos]
+        n_rows = max(1, math.ceil(len(nodes) / row_len))
+        if not new:
+            if nodes:
+                y = min(p[1] for p in (pos[n] for n in nodes)) - TIER_GAP
+            continue
+
+        if len(new) > len(nodes) // 2:
+            # Fresh (or mostly new) tier: barycenter order, folded column-major into n_rows rows
+            for n in nodes:
+                pos.pop(n, None)
+            keyed = []
+            for n in nodes:
+                bc = barycenter(n)
+                keyed.append((bc is None, bc if bc is not None else 0.0, -G.degree(n), n))
+            keyed.sort()
+            n_cols = math.ceil(len(nodes) / n_rows)
+            for k, (_, _, _, node) in enumerate(keyed):
+                col, row = divmod(k, n_rows)
+                pos[node] = ((col - (n_cols - 1) / 2) * GRID, y - row * GRID)
+        else:
+            # Incremental: nearest free slot on the tier's existing rows (or one more row)
+            top = max(pos[n][1] for n in nodes if n in pos)
+            rows = [top - r * GRID for r in range(n_rows + 1)]
+            taken = {(round(pos[n][0], 3), round(pos[n][1], 3)) for n in nodes if n in pos}
+            xs = [pos[n][0] for n in nodes if n in pos]
+            right = max(xs) + GRID
+            for node in sorted(new, key=lambda n: (barycenter(n) is None, barycenter(n) or 0.0, n)):
+                target = barycenter(node)
+                target = right if target is None else round(target / GRID) * GRID
+                slot = None
+                for dx in range(0, 4 * row_len):
+                    for x in ((target + dx * GRID, target - dx * GRID) if dx else (target,)):
+                        for ry in rows:
+                            if (round(x, 3), round(ry, 3)) not in taken:
+                                slot = (x, ry)
+                                break
+                        if slot:
+                            break
+                    if slot:
+                        break
+                slot = slot or (right, rows[0])
+                taken.add((round(slot[0], 3), round(slot[1], 3)))
+                right = max(right, slot[0] + GRID)
+                pos[node] = slot
+        y = min(pos[n][1] for n in nodes) - TIER_GAP
+    return pos
+
+
+# ── Exports ───────────────────────────────────────────────
+def _graph_with_positions(G: nx.Graph, pos: dict) -> nx.Graph:
+    H = G.copy()
+    for node, (x, y) in pos.items():
+        if node in H:
+            H.nodes[node]["x"] = float(x)
+            H.nodes[node]["y"] = float(y)
+    return H
+
+
+def export_graphml(G: nx.Graph, pos: dict, path: str) -> None:
+    """GraphML with platform, role and x/y node attributes."""
+    H = _graph_with_positions(G, pos)
+    # GraphML only takes scalars
+    for _, data in H.nodes(data=True):
+        for key, value in list(data.items()):
+            if not isinstance(value, (str, int, float, bool)):
+                data[key] = str(value)
+    for _, _, data in H.edges(data=True):
+        for key, value in list(data.items()):
+            if not isinstance(value, (str, int, float, bool)):
+                data[key] = str(value)
+    nx.write_graphml(H, path)
+
+
+def export_json(G: nx.Graph, pos: dict, path: str) -> None:
+    """Node-link JSON (networkx.node_link_data layout) including x/y and role."""
+    data = nx.node_link_data(_graph_with_positions(G, pos))
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1, default=str)
+
+
+def _json_block(element_id: str, obj) -> str:
+    text = json.dumps(obj, separators=(",", ":")).replace("</", "<\\/")
+    return f'<script type="application/json" id="{element_id}">{text}</script>'
+
+
+def export_html(G: nx.Graph, pos: dict, path: str, title: str = "Network Topology") -> None:
+    """Self-contained interactive viewer with lazily parsed per-tile data.
+
+    The always-loaded index holds only names, coordinates and roles.
+    Edges and node details (platform, per-link ports) live in tile blocks
+    keyed by grid cell; a tile is JSON.parse'd the first time it is drawn.
+    An edge is stored in the tiles of both of its endpoints.
+    """
+    assign_roles(G)
+    nodes = list(G.nodes())
+    index_of = {n: i for i, n in enumerate(nodes)}
+
+    def tile_key(node):
+        x, y = pos[node]
+        return f"{math.floor(x / TILE)}_{math.floor(y / TILE)}"
+
+    tiles = defaultdict(lambda: {"e": [], "d": {}})
+    for eid, (a, b, data) in enumerate(G.edges(data=True)):
+        ia, ib = index_of[a], index_of[b]
+        label = data.get("label", "")
+        for key in {tile_key(a), tile_key(b)}:
+            tiles[key]["e"].append([eid, ia, ib])
+        tiles[tile_key(a)]["d"].setdefault(ia, {"l": []})["l"].append([ib, label])
+        tiles[tile_key(b)]["d"].setdefault(ib, {"l": []})["l"].append([ia, label])
+    for node in nodes:
+        i = index_of[node]
+        detail = tiles[tile_key(node)]["d"].setdefault(i, {"l": []})
+        detail["p"] = G.nodes[node].get("platform", "")
+
+    index = {
+        "names": nodes,
+        "x": [round(pos[n][0], 3) for n in nodes],
+        "y": [round(pos[n][1], 3) for n in nodes],
+        "role": [ROLES.index(G.nodes[n]["role"]) for n in nodes],
+        "roles": ROLES,
+        "colors": [ROLE_COLORS[r] for r in ROLES],
+        "tile": TILE,
+        "edges": G.number_of_edges(),
+    }
+    blocks = "\n".join(_json_block(f"t{key}", chunk) for key, chunk in tiles.items())
+    legend = " ".join(
+        f'<span style="color:{ROLE_COLORS[r]}">&#9679;</span> {r}' for r in ROLES
+    )
+    page = (_HTML_TEMPLATE
+            .replace("%TITLE%", html.escape(title))
+            .replace("%LEGEND%", legend)
+            .replace("%INDEX%", _json_block("index", index))
+            .replace("%TILES%", blocks))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(page)
+
+
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>%TITLE%</title>
+<style>
+html, body { margin: 0; height: 100%; overflow: hidden; font: 12px sans-serif; }
+#c { display: block; width: 100%; height: 100%; background: #fafafa; cursor: grab; }
+.panel { position: absolute; top: 8px; background: #fff; border: 1px solid #ccc;
+         border-radius: 4px; padding: 6px 8px; }
+#bar { left: 8px; }
+#info { right: 8px; max-width: 380px; max-height: 90%; overflow: auto; display: none;
+        white-space: pre-wrap; font-family: monospace; }
+</style></head>
+<body>
+<canvas id="c"></canvas>
+<div id="bar" class="panel"><b>%TITLE%</b> <span id="stats"></span><br>
+<input id="q" placeholder="find device, Enter" size="28"> %LEGEND%</div>
+<div id="info" class="panel"></div>
+%INDEX%
+%TILES%
+<script>
+(function () {
+  const IDX = JSON.parse(document.getElementById("index").textContent);
+  const N = IDX.names.length, T = IDX.tile;
+  const canvas = document.getElementById("c"), ctx = canvas.getContext("2d");
+  const info = document.getElementById("info");
+  const parsed = new Map();              // tile key -> chunk, filled lazily
+  const byTile = new Map();              // tile key -> node indexes (from the index)
+  const keyOf = i => Math.floor(IDX.x[i] / T) + "_" + Math.floor(IDX.y[i] / T);
+  for (let i = 0; i < N; i++) {
+    const k = keyOf(i);
+    if (!byTile.has(k)) byTile.set(k, []);
+    byTile.get(k).push(i);
+  }
+  function tile(k) {
+    let chunk = parsed.get(k);
+    if (!chunk) {
+      const el = document.getElementById("t" + k);
+      chunk = el ? JSON.parse(el.textContent) : {e: [], d: {}};
+      parsed.set(k, chunk);
+    }
+    return chunk;
+  }
+
+  // View: screen = (world - origin) * scale, y flipped so core is on top
+  let scale = 1, ox = 0, oy = 0, selected = -1, dirty = true;
+  const sx = x => (x - ox) * scale, sy = y => (oy - y) * scale;
+  function fit() {
+    let x0 = Infinity, x1 = -Infinity, y0 = Infinity, y1 = -Infinity;
+    for (let i = 0; i < N; i++) {
+      x0 = Math.min(x0, IDX.x[i]); x1 = Math.max(x1, IDX.x[i]);
+      y0 = Math.min(y0, IDX.y[i]); y1 = Math.max(y1, IDX.y[i]);
+    }
+    if (!N) { x0 = y0 = 0; x1 = y1 = 1; }
+    scale = Math.min(canvas.width / (x1 - x0 + 4), canvas.height / (y1 - y0 + 4));
+    ox = (x0 + x1) / 2 - canvas.width / 2 / scale;
+    oy = (y0 + y1) / 2 + canvas.height / 2 / scale;
+  }
+  function resize() {
+    canvas.width = window.innerWidth; canvas.height = window.innerHeight; dirty = true;
+  }
+  function visibleTiles() {
+    const x0 = Math.floor(ox / T), x1 = Math.floor((ox + canvas.width / scale) / T);
+    const y1 = Math.floor(oy / T), y0 = Math.floor((oy - canvas.height / scale) / T);
+    const keys = [];
+    if ((x1 - x0 + 1) * (y1 - y0 + 1) > byTile.size * 4) {
+      byTile.forEach((_, k) => keys.push(k));          // zoomed far out: every occupied tile
+    } else {
+      for (let tx = x0; tx <= x1; tx++)
+        for (let ty = y0; ty <= y1; ty++)
+          if (byTile.has(tx + "_" + ty)) keys.push(tx + "_" + ty);
+    }
+    return keys;
+  }
+  function draw() {
+    dirty = false;
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    const keys = visibleTiles(), seen = new Set();
+    let shown = 0;
+    ctx.strokeStyle = "rgba(80,80,80,0.35)";
+    ctx.lineWidth = 1;
+    ctx.beginPath();
+    for (const k of keys) {
+      for (const [id, a, b] of tile(k).e) {
+        if (seen.has(id)) continue;
+        seen.add(id);
+        ctx.moveTo(sx(IDX.x[a]), sy(IDX.y[a]));
+        ctx.lineTo(sx(IDX.x[b]), sy(IDX.y[b]));
+      }
+    }
+    ctx.stroke();
+    const r = Math.max(1.5, Math.min(8, scale * 0.3));
+    const labels = scale > 18;
+    ctx.font = "11px sans-serif";
+    for (const k of keys) {
+      for (const i of byTile.get(k)) {
+        const x = sx(IDX.x[i]), y = sy(IDX.y[i]);
+        if (x < -r || y < -r || x > canvas.width + r || y > canvas.height + r) continue;
+        shown++;
+        ctx.fillStyle = IDX.colors[IDX.role[i]];
+        ctx.beginPath(); ctx.arc(x, y, i === selected ? r * 2 : r, 0, 6.2832); ctx.fill();
+        if (labels) { ctx.fillStyle = "#222"; ctx.fillText(IDX.names[i], x + r + 2, y + 4); }
+      }
+    }
+    document.getElementById("stats").textContent =
+      N + " devices, " + IDX.edges + " links (" + shown + " drawn, " +
+      parsed.size + "/" + byTile.size + " tiles loaded)";
+  }
+  function show(i) {
+    selected = i; dirty = true;
+    if (i < 0) { info.style.display = "none"; return; }
+    const d = tile(keyOf(i)).d[i] || {l: [], p: ""};
+    const lines = [IDX.names[i], "role: " + IDX.roles[IDX.role[i]], "platform: " + (d.p || "?"),
+                   "", d.l.length + " link(s):"];
+    for (const [j, label] of d.l) lines.push("  " + IDX.names[j] + "  " + label.replace(/\\n/g, "; "));
+    info.textContent = lines.join("\\n");
+    info.style.display = "block";
+  }
+  function nearest(mx, my) {
+    let best = -1, bestD = 100;
+    for (const k of visibleTiles())
+      for (const i of byTile.get(k)) {
+        const dx = sx(IDX.x[i]) - mx, dy = sy(IDX.y[i]) - my, d = dx * dx + dy * dy;
+        if (d < bestD) { bestD = d; best = i; }
+      }
+    return best;
+  }
+
+  let drag = null, moved = false;
+  canvas.addEventListener("mousedown", e => { drag = [e.clientX, e.clientY]; moved = false; });
+  window.addEventListener("mouseup", e => {
+    if (drag && !moved) show(nearest(e.clientX, e.clientY));
+    drag = null;
+  });
+  window.addEventListener("mousemove", e => {
+    if (!drag) return;
+    const dx = e.clientX - drag[0], dy = e.clientY - drag[1];
+    if (Math.abs(dx) + Math.abs(dy) > 2) moved = true;
+    ox -= dx / scale; oy += dy / scale; drag = [e.clientX, e.clientY]; dirty = true;
+  });
+  canvas.addEventListener("wheel", e => {
+    e.preventDefault();
+    const f = Math.exp(-e.deltaY * 0.0015), wx = ox + e.clientX / scale, wy = oy - e.clientY / scale;
+    scale *= f; ox = wx - e.clientX / scale; oy = wy + e.clientY / scale; dirty = true;
+  }, {passive: false});
+  document.getElementById("q").addEventListener("keydown", e => {
+    if (e.key !== "Enter") return;
+    const q = e.target.value.toLowerCase();
+    const i = IDX.names.findIndex(n => n.toLowerCase().includes(q));
+    if (i < 0) return;
+    scale = Math.max(scale, 30);
+    ox = IDX.x[i] - canvas.width / 2 / scale; oy = IDX.y[i] + canvas.height / 2 / scale;
+    show(i);
+  });
+  window.addEventListener("resize", resize);
+  resize(); fit();
+  (function loop() { if (dirty) draw(); requestAnimationFrame(loop); })();
+})();
+</script>
+</body></html>
+"""
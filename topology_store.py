@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+topology_store.py - Persistent CDP topology for incremental re-discovery
+
+Keeps every device cdp_mapper has queried, the links it reported and a
+hash of its CDP neighbor table in a small SQLite file.  On the next run
+cdp_mapper re-polls the known devices in one parallel pass and only
+expands devices whose neighbor table hash changed (or that are new), so
+a nightly refresh costs one SSH session per device instead of a full
+hop-by-hop crawl from the seeds.
+
+Links of a device are replaced as a whole when it answers; devices that
+cannot be reached keep their last known links (see last_seen).
+
+Usage:
+    from topology_store import TopologyStore
+
+    store = TopologyStore("topology.db")
+    store.device_hash("core1")            # None if never queried
+    store.save_device(device, neighbors, depth=1)
+    neighbors = store.all_neighbors()     # list[CDPNeighbor] for the graph
+"""
+
+import hashlib
+import sqlite3
+import time
+from typing import Optional
+
+from parsers import CDPNeighbor
+
+DEFAULT_DB = "topology.db"
+SCHEMA_VERSION = 1
+
+
+def neighbor_hash(neighbors: list[CDPNeighbor]) -> str:
+    """Order-independent digest of a device's CDP neighbor table."""
+    rows = sorted(
+        (n.local_port, n.remote_device, n.remote_port, n.platform, n.ip_address or "")
+        for n in neighbors
+    )
+    return hashlib.sha256(repr(rows).encode()).hexdigest()
+
+
+class TopologyStore:
+    """SQLite store of queried devices and their CDP links."""
+
+    def __init__(self, db_file: str = DEFAULT_DB):
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS devices (
+                hostname      TEXT PRIMARY KEY,
+                ip            TEXT NOT NULL,
+                device_type   TEXT NOT NULL,
+                depth         INTEGER NOT NULL,
+                neighbor_hash TEXT,
+                first_seen    REAL NOT NULL,
+                last_seen     REAL,
+                last_changed  REAL
+            );
+            CREATE TABLE IF NOT EXISTS links (
+                local_device  TEXT NOT NULL,
+                local_port    TEXT NOT NULL,
+                remote_device TEXT NOT NULL,
+                remote_port   TEXT NOT NULL,
+                platform      TEXT NOT NULL,
+                ip_address    TEXT,
+                PRIMARY KEY (local_device, local_port, remote_device, remote_port)
+            );
+            CREATE TABLE IF NOT EXISTS runs (
+                started  REAL NOT NULL,
+                finished REAL,
+                queried  INTEGER,
+                changed  INTEGER,
+                new      INTEGER,
+                failed   INTEGER
+            );
+            """
+        )
+        self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('schema', ?)", (str(SCHEMA_VERSION),))
+        self.conn.commit()
+
+    # ── Devices ─────────────────────────────────────────────
+    def known_devices(self) -> list[tuple[str, str, str, int]]:
+        """(hostname, ip, device_type, depth) of every device queried before."""
+        return self.conn.execute(
+            "SELECT hostname, ip, device_type, depth FROM devices ORDER BY depth, hostname"
+        ).fetchall()
+
+    def device_hash(self, hostname: str) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT neighbor_hash FROM devices WHERE hostname = ?", (hostname,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def save_device(self, device, neighbors: list[CDPNeighbor], depth: int,
+                    digest: Optional[str] = None) -> bool:
+        """Record a successful poll and replace the device's links.
+
+        Returns True if the neighbor table differs from the stored one
+        (always True for a device seen for the first time).
+        """
+        digest = digest or neighbor_hash(neighbors)
+        now = time.time()
+        changed = self.device_hash(device.hostname) != digest
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO devices (hostname, ip, device_type, depth, neighbor_hash,
+                                     first_seen, last_seen, last_changed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(hostname) DO UPDATE SET
+                    ip = excluded.ip,
+                    device_type = excluded.device_type,
+                    depth = MIN(depth, excluded.depth),
+                    neighbor_hash = excluded.neighbor_hash,
+                    last_seen = excluded.last_seen,
+                    last_changed = CASE WHEN neighbor_hash = excluded.neighbor_hash
+                                        THEN last_changed ELSE excluded.last_changed END
+                """,
+                (device.hostname, device.ip, device.device_type, depth, digest, now, now, now),
+            )
+            if changed:
+                self.conn.execute("DELETE FROM links WHERE local_device = ?", (device.hostname,))
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO links VALUES (?, ?, ?, ?, ?, ?)",
+                    [(n.local_device, n.local_port, n.remote_device, n.remote_port,
+                      n.platform, n.ip_address) for n in neighbors],
+                )
+        return changed
+
+    # ── Links ───────────────────────────────────────────────
+    def all_neighbors(self) -> list[CDPNeighbor]:
+        """Every stored link, as parse_cdp_neighbors would have returned it."""
+        return [
+            CDPNeighbor(*row)
+            for row in self.conn.execute(
+                "SELECT local_device, local_port, remote_device, remote_port, platform, ip_address"
+                " FROM links ORDER BY local_device, local_port"
+            )
+        ]
+
+    # ── Run bookkeeping ─────────────────────────────────────
+    def start_run(self) -> int:
+        with self.conn:
+            return self.conn.execute("INSERT INTO runs (started) VALUES (?)", (time.time(),)).lastrowid
+
+    def finish_run(self, run_id: int, queried: int, changed: int, new: int, failed: int) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE runs SET finished = ?, queried = ?, changed = ?, new = ?, failed = ?"
+                " WHERE rowid = ?",
+                (time.time(), queried, changed, new, failed, run_id),
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()